@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Inference backends for the seq2seq paraphraser
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Iterator, List
+
+# Written last into an export directory, recording the model it was exported from
+EXPORT_MANIFEST = "export.json"
+
+def model_fingerprint(model) -> dict:
+    """Identify a model well enough to tell whether an ONNX export was made from it"""
+    weights = hashlib.sha256()
+    for name, tensor in sorted(model.state_dict().items()):
+        weights.update(f"{name}:{tuple(tensor.shape)}:{tensor.dtype}".encode())
+        # The start of every tensor tells fine-tunes of one architecture apart without hashing it all
+        weights.update(tensor.detach().flatten()[:1024].float().cpu().numpy().tobytes())
+    return {
+        "repo": getattr(model, "name_or_path", None) or None,
+        "revision": getattr(model.config, "_commit_hash", None),
+        "config": hashlib.sha256(model.config.to_json_string(use_diff=False).encode()).hexdigest(),
+        "weights": weights.hexdigest(),
+    }
+
+def export_path(export_dir: str, fingerprint: dict) -> str:
+    """Directory under ``export_dir`` for the export of one model"""
+    key = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(export_dir, key)
+
+def read_export_manifest(path: str):
+    try:
+        with open(os.path.join(path, EXPORT_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class InferenceBackend:
+    """Encode, generate and decode interface used by the humanization pipeline"""
+
+    name = "base"
+
+    def __init__(self, tokenizer, model):
+        self.tokenizer = tokenizer
+        self.model = model
+
+    def encode(self, texts: List[str], max_length: int = 512):
+        """Tokenize a batch of texts into padded tensors"""
+        return self.tokenizer(
+            texts,
+            return_tensors="pt",
+            max_length=max_length,
+            truncation=True,
+            padding=True
+        )
+
+    def generate(self, inputs, **generation_kwargs):
+        """Generate output token ids for encoded inputs"""
+        raise NotImplementedError
+
+    def decode(self, outputs) -> List[str]:
+        """Turn generated token ids back into text"""
+        return [text.strip() for text in self.tokenizer.batch_decode(outputs, skip_special_tokens=True)]
+
+    def stream(self, inputs, **generation_kwargs) -> Iterator[str]:
+        """Yield text pieces for a single encoded input as they are generated.
+
+        The default yields the whole output at once; backends that can
+        stream tokens override this.
+        """
+        yield self.decode(self.generate(inputs, **generation_kwargs))[0]
+
+class TransformersBackend(InferenceBackend):
+    """Run generation with a Hugging Face PyTorch model"""
+
+    name = "torch"
+
+    def generate(self, inputs, **generation_kwargs):
+        import torch
+
+        with torch.no_grad():
+            return self.model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                **generation_kwargs
+            )
+
+    def stream(self, inputs, **generation_kwargs) -> Iterator[str]:
+        """Yield decoded text as tokens come out of generate (no beam search)"""
+        from transformers import TextIteratorStreamer
+
+        streamer = TextIteratorStreamer(self.tokenizer, skip_special_tokens=True)
+        generation_kwargs = {**generation_kwargs, "num_beams": 1, "streamer": streamer}
+        errors = []
+
+        def run():
+            try:
+                self.generate(inputs, **generation_kwargs)
+            except Exception as e:
+                # Unblock the consumer, then re-raise on its thread
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            for piece in streamer:
+                if piece:
+                    yield piece
+        finally:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+class OnnxBackend(TransformersBackend):
+    """Run the encoder and decoder with ONNX Runtime on CPU.
+
+    The PyTorch model is exported once into a directory under ``export_dir``
+    named after the model's fingerprint (repo, revision, config and weights),
+    and reused on later starts only if that directory's manifest records the
+    same fingerprint, so a different MODEL_REPO or revision exports afresh.
+    """
+
+    name = "onnx"
+
+    def __init__(self, tokenizer, model, export_dir: str = None):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("ONNX backend requires optimum[onnxruntime] (see requirements_onnx.txt)") from e
+
+        fingerprint = model_fingerprint(model)
+        export_dir = export_path(export_dir or tempfile.mkdtemp(prefix="onnx_model_"), fingerprint)
+        # An export interrupted before its manifest was written is redone
+        already_exported = (read_export_manifest(export_dir) == fingerprint
+                            and os.path.exists(os.path.join(export_dir, "encoder_model.onnx")))
+
+        if not already_exported:
+            print(f"Exporting model to ONNX in {export_dir}")
+            os.makedirs(export_dir, exist_ok=True)
+            model.save_pretrained(export_dir)
+            tokenizer.save_pretrained(export_dir)
+
+        ort_model = ORTModelForSeq2SeqLM.from_pretrained(
+            export_dir,
+            export=not already_exported,
+            provider="CPUExecutionProvider"
+        )
+        if not already_exported:
+            ort_model.save_pretrained(export_dir)
+            with open(os.path.join(export_dir, EXPORT_MANIFEST), "w") as f:
+                json.dump(fingerprint, f, indent=2)
+
+        super().__init__(tokenizer, ort_model)
+
+BACKENDS = {
+    "torch": TransformersBackend,
+    "onnx": OnnxBackend,
+}
+
+def create_backend(name: str, tokenizer, model, **kwargs) -> InferenceBackend:
+    """Build the named backend around a loaded tokenizer and float32 model"""
+    name = (name or "torch").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](tokenizer, model, **kwargs)
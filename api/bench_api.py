@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Offline latency/throughput benchmark of the /humanize endpoint
+
+Usage: python bench_api.py [--concurrency 1 4 16] [--words 50 200 800]
+                           [--presets fast balanced quality] [--requests 24]
+                           [--output results.json] [--compare baseline.json]
+
+Runs the FastAPI app in-process over ASGI (no server, no network) with the
+tiny randomly initialized T5 from tiny_model.py, so results depend only on
+this code and the machine. Every combination of preset, document length and
+concurrency is measured and reported as JSON: latency p50/p95/p99,
+requests/s, sentences/s and peak RSS. --compare prints the change against an
+earlier run's JSON. Caches are off unless --cache is given.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from presets import PRESET_ORDER
+
+SENTENCES = [
+    "The committee reviewed the quarterly budget and approved additional funding for research.",
+    "Researchers found that regular exercise improves memory and reduces stress in older adults.",
+    "It is important to note that the new policy does not apply to existing contracts.",
+    "Many companies are adopting remote work to attract talent from different regions.",
+    "The results demonstrate a significant improvement in accuracy over the previous model.",
+    "Furthermore, the survey indicates that customers value fast delivery above low prices.",
+    "Local farmers are experimenting with drought resistant crops to protect their harvests.",
+    "In conclusion, the project met its goals while staying within the original schedule.",
+]
+
+def configure_environment(cache: bool, max_concurrency: int):
+    """Settings main.py reads at import: no eager load, no shared state on disk.
+
+    The inference queue is made deep enough for the highest concurrency, so
+    scenarios measure queueing rather than 503s (set HUMANIZE_QUEUE_DEPTH to
+    benchmark load shedding instead).
+    """
+    os.environ["EAGER_MODEL_LOAD"] = "false"
+    os.environ.setdefault("HUMANIZE_QUEUE_DEPTH", str(max_concurrency))
+    os.environ["CACHE_ENABLED"] = "true" if cache else "false"
+    os.environ["SENTENCE_CACHE_BACKEND"] = "none"
+    os.environ.setdefault("JOB_STORE_PATH", os.path.join(tempfile.mkdtemp(), "jobs.sqlite"))
+
+def build_document(words: int, rng: random.Random) -> str:
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        sentences.append(rng.choice(SENTENCES))
+    return " ".join(sentences)
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def current_rss_bytes() -> int:
+    """Resident set size now, from /proc where available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is the lifetime peak (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class RssSampler:
+    """Track the peak RSS over a block by sampling in a background thread"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+async def run_scenario(client, documents, sentence_counts, preset: str, concurrency: int) -> dict:
+    """POST every document with at most ``concurrency`` requests in flight"""
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text: str):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            # The top tier, so the preset being measured isn't capped
+            response = await client.post("/humanize", json={"text": text, "preset": preset, "tier": "ultra"})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200 or not response.json().get("success"):
+                errors += 1
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(text) for text in documents))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(documents),
+        "errors": errors,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2),
+        },
+        "requestsPerSecond": round(len(documents) / elapsed, 2),
+        "sentencesPerSecond": round(sum(sentence_counts) / elapsed, 2),
+        "peakRssMb": round(rss.peak / 2 ** 20, 1),
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+async def run_suite(args) -> dict:
+    import httpx
+    import torch
+    import main
+    from backends import TransformersBackend
+    from tiny_model import build_tiny_seq2seq
+
+    main._backend_cache = TransformersBackend(*build_tiny_seq2seq(seed=args.seed))
+    main._model_status = "ready"
+
+    transport = httpx.ASGITransport(app=main.app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for preset in args.presets:
+            # Warm up the scheduler thread and this preset's generate path
+            await client.post("/humanize", json={"text": SENTENCES[0], "preset": preset, "tier": "ultra"})
+            for words in args.words:
+                for concurrency in args.concurrency:
+                    rng = random.Random(f"{args.seed}:{preset}:{words}:{concurrency}")
+                    torch.manual_seed(args.seed)
+                    # A fresh document per request, so the document cache (if on) cannot answer
+                    documents = [f"Request {i}. {build_document(words, rng)}" for i in range(args.requests)]
+                    sentence_counts = [len(main.split_into_sentences(text)) for text in documents]
+                    result = await run_scenario(client, documents, sentence_counts, preset, concurrency)
+                    result = {"preset": preset, "words": words, "concurrency": concurrency, **result}
+                    results.append(result)
+                    print(f"{preset:<10}{words:>6} words  x{concurrency:<4}"
+                          f"p50 {result['latencyMs']['p50']:>9.1f} ms  p99 {result['latencyMs']['p99']:>9.1f} ms  "
+                          f"{result['requestsPerSecond']:>7.2f} req/s  {result['sentencesPerSecond']:>8.1f} sent/s",
+                          file=sys.stderr)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "model": "tiny-random-t5",
+            "cache": args.cache,
+            "seed": args.seed,
+            "workers": main.INFERENCE_WORKERS,
+            "batchSize": main.MAX_BATCH_SIZE,
+            "chunkTokens": main.CHUNK_TOKEN_BUDGET,
+        },
+        "results": results,
+    }
+
+def compare(report: dict, baseline: dict):
+    """Print the change in p50, p99 and sentences/s for scenarios in both runs"""
+    def key(result):
+        return result["preset"], result["words"], result["concurrency"]
+
+    before = {key(result): result for result in baseline["results"]}
+    print(f"\nAgainst {baseline['meta'].get('revision', 'baseline')}:", file=sys.stderr)
+    for result in report["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        changes = []
+        for label, new_value, old_value in (
+            ("p50", result["latencyMs"]["p50"], old["latencyMs"]["p50"]),
+            ("p99", result["latencyMs"]["p99"], old["latencyMs"]["p99"]),
+            ("sent/s", result["sentencesPerSecond"], old["sentencesPerSecond"]),
+        ):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            changes.append(f"{label} {change:+.1f}%")
+        print(f"{result['preset']:<10}{result['words']:>6} words  x{result['concurrency']:<4}" + "  ".join(changes),
+              file=sys.stderr)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--words", type=int, nargs="+", default=[50, 200, 800], help="document lengths")
+    parser.add_argument("--presets", nargs="+", choices=PRESET_ORDER, default=PRESET_ORDER)
+    parser.add_argument("--requests", type=int, default=24, help="requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="leave the result caches on")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    configure_environment(args.cache, max(args.concurrency))
+    report = asyncio.run(run_suite(args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(report, json.load(baseline))
+
+if __name__ == "__main__":
+    main_cli()
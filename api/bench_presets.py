@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Measure per-sentence generation latency for each preset
+
+Usage: python bench_presets.py [--sentences 20] [--tiny]
+
+Loads the configured model (MODEL_REPO, MODEL_PRECISION, INFERENCE_BACKEND)
+and times one sentence per generate call, to compare the presets' decoding cost
+without the rest of the pipeline. --tiny uses the small offline test model.
+"""
+import argparse
+import statistics
+import time
+
+import main
+from backends import TransformersBackend
+from presets import PRESET_ORDER
+
+SENTENCES = [
+    "The committee reviewed the quarterly budget and approved additional funding for research.",
+    "Researchers found that regular exercise improves memory and reduces stress in older adults.",
+    "It is important to note that the new policy does not apply to existing contracts.",
+    "Many companies are adopting remote work to attract talent from different regions.",
+    "The results demonstrate a significant improvement in accuracy over the previous model.",
+]
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=20, help="sentences timed per preset")
+    parser.add_argument("--tiny", action="store_true", help="use the tiny offline model")
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tiny_model import build_tiny_seq2seq
+        backend = TransformersBackend(*build_tiny_seq2seq())
+    else:
+        backend = main.get_backend()
+        if backend is None:
+            raise SystemExit(f"Model failed to load: {main._model_error}")
+
+    print(f"{'preset':<10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name in PRESET_ORDER:
+        main.humanize_batch([SENTENCES[0]], backend, preset=name)  # warm up
+        timings = []
+        for i in range(args.sentences):
+            start = time.perf_counter()
+            main.humanize_batch([SENTENCES[i % len(SENTENCES)]], backend, preset=name)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:<10}{statistics.median(timings):>10.0f}{p95:>10.0f}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled rewrite engines against the previous multi-pass rule functions
+
+Usage: python bench_rewrite.py [--size-kb 256] [--repeat 5]
+
+Needs the server requirements installed, since it imports main.py.
+"""
+import argparse
+import random
+import re
+import time
+
+import main
+import main_simple
+
+SAMPLE = (
+    "In conclusion, it is important to note that we are seeing very good results. "
+    "Furthermore, the team does not utilize many tools, and they are unable to demonstrate "
+    "a big improvement. Additionally, I am sure this is an important step; it is not bad at all. "
+    "That is why we will not stop, and you are welcome to indicate a small concern. "
+    "Therefore, I would say it has been excellent, although some parts were terrible. "
+    "As previously mentioned, they have gonna wanna keep going. To summarize, the results are awesome. "
+)
+
+# Previous implementations, kept verbatim as the baseline
+
+def legacy_apply_style_adjustments(text: str, tone: str, style: str) -> str:
+    """Apply light style adjustments without destroying content"""
+    
+    # Light contractions for casual tone
+    if tone == "friendly" or style == "casual":
+        text = re.sub(r'\bdo not\b', "don't", text)
+        text = re.sub(r'\bcannot\b', "can't", text)
+        text = re.sub(r'\bwill not\b', "won't", text)
+        text = re.sub(r'\bit is\b', "it's", text)
+        text = re.sub(r'\bthat is\b', "that's", text)
+    
+    # Professional adjustments
+    if style == "professional":
+        text = re.sub(r'\bgonna\b', "going to", text)
+        text = re.sub(r'\bwanna\b', "want to", text)
+        
+    return text
+
+def legacy_advanced_humanization_pipeline(text: str, tone: str = "neutral", style: str = "professional", preserve_length: bool = True) -> str:
+    """Advanced humanization pipeline for StealthWriter-level quality"""
+    import re
+    import random
+    
+    result = text
+    original_word_count = len(text.split())
+    
+    # 1. Strategic contractions (context-aware) - length neutral transformations
+    contractions = [
+        (r"\bI am\b", "I'm"),
+        (r"\byou are\b", "you're"), 
+        (r"\bwe are\b", "we're"),
+        (r"\bthey are\b", "they're"),
+        (r"\bit is\b", "it's"),
+        (r"\bthat is\b", "that's"),
+        (r"\bdo not\b", "don't"),
+        (r"\bdoes not\b", "doesn't"),
+        (r"\bwill not\b", "won't"),
+        (r"\bcannot\b", "can't"),
+        (r"\bshould not\b", "shouldn't"),
+        (r"\bwould not\b", "wouldn't"),
+    ]
+    
+    for formal, informal in contractions:
+        # Apply contractions with 70% probability for natural variation
+        if random.random() < 0.7:
+            result = re.sub(formal, informal, result, flags=re.IGNORECASE)
+    
+    # 2. Add natural qualifiers and softeners
+    qualifiers = ["perhaps", "likely", "it seems", "apparently", "generally", "typically"]
+    sentences = result.split('. ')
+    
+    for i, sentence in enumerate(sentences):
+        if len(sentence.split()) > 8 and random.random() < 0.3:  # 30% chance for longer sentences
+            qualifier = random.choice(qualifiers)
+            if sentence.lower().startswith(('this', 'that', 'these', 'the')):
+                sentences[i] = f"{qualifier.capitalize()}, {sentence.lower()}"
+    
+    result = '. '.join(sentences)
+    
+    # 3. Vocabulary sophistication (context-aware synonyms)
+    word_replacements = {
+        "very": ["quite", "rather", "fairly", "extremely"],
+        "good": ["excellent", "great", "solid", "effective"],
+        "bad": ["poor", "problematic", "concerning", "inadequate"],
+        "big": ["large", "significant", "substantial", "considerable"],
+        "small": ["minor", "limited", "modest", "compact"],
+        "important": ["crucial", "vital", "significant", "key"],
+        "many": ["numerous", "several", "multiple", "various"],
+    }
+    
+    for word, synonyms in word_replacements.items():
+        if random.random() < 0.4:  # 40% chance to replace
+            pattern = r'\b' + re.escape(word) + r'\b'
+            replacement = random.choice(synonyms)
+            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE, count=1)
+    
+    # 4. Sentence structure variation (length-aware)
+    if preserve_length:
+        # Only do length-neutral sentence restructuring
+        sentences = result.split('. ')
+        for i in range(len(sentences)):
+            # Internal sentence restructuring without changing length
+            words = sentences[i].split()
+            if len(words) > 6 and random.random() < 0.3:
+                # Reorder clauses without adding/removing words
+                if ', ' in sentences[i] and not sentences[i].lower().startswith(('however', 'therefore', 'additionally')):
+                    parts = sentences[i].split(', ', 1)
+                    if len(parts) == 2 and len(parts[1].split()) > 3:
+                        sentences[i] = f"{parts[1].capitalize()}, {parts[0].lower()}"
+        result = '. '.join(sentences)
+    else:
+        # Original sentence combination logic
+        sentences = result.split('. ')
+        for i in range(len(sentences) - 1):
+            if len(sentences[i].split()) < 6 and len(sentences[i+1].split()) < 6:
+                if random.random() < 0.3:
+                    connector = random.choice([", and", ", but", ", so", "; however,"])
+                    sentences[i] = sentences[i] + connector + " " + sentences[i+1].lower()
+                    sentences.pop(i+1)
+                    break
+        result = '. '.join(sentences)
+    
+    # 5. Natural flow improvements based on tone and style
+    if tone == "friendly":
+        result = result.replace("Additionally", "Plus")
+        result = result.replace("Furthermore", "Also")
+        result = result.replace("Therefore", "So")
+    
+    if style == "casual":
+        result = result.replace("utilize", "use")
+        result = result.replace("demonstrate", "show")
+        result = result.replace("indicate", "suggest")
+    
+    # 6. Remove overly formal transitions
+    formal_transitions = [
+        ("In conclusion,", "Overall,"),
+        ("To summarize,", "In short,"),
+        ("It is important to note that", "Note that"),
+        ("It should be emphasized that", ""),
+        ("As previously mentioned,", "As mentioned,"),
+    ]
+    
+    for formal, casual in formal_transitions:
+        result = result.replace(formal, casual)
+    
+    # 7. Add subtle imperfections that humans make
+    if random.random() < 0.2:  # 20% chance
+        # Occasionally start sentences with "And" or "But"
+        sentences = result.split('. ')
+        for i in range(1, len(sentences)):
+            if sentences[i].lower().startswith(('however', 'additionally', 'furthermore')):
+                if random.random() < 0.5:
+                    sentences[i] = re.sub(r'^(However|Additionally|Furthermore)', 
+                                        random.choice(['And', 'But']), 
+                                        sentences[i], flags=re.IGNORECASE)
+        result = '. '.join(sentences)
+    
+    # 8. Light length balancing (NO aggressive truncation)
+    if preserve_length:
+        current_word_count = len(result.split())
+        original_word_count = len(text.split())
+        
+        # Only make very light adjustments, never destroy content
+        if current_word_count > original_word_count * 1.2:  # Only if 20% longer
+            # Remove only obvious filler words, and only a few
+            filler_words = ['really', 'very', 'quite', 'actually', 'basically']
+            words = result.split()
+            max_removals = min(3, current_word_count - original_word_count)  # Max 3 words
+            
+            for filler in filler_words:
+                if max_removals <= 0:
+                    break
+                if filler in words:
+                    words.remove(filler)
+                    max_removals -= 1
+            
+            result = ' '.join(words)
+        
+        # If much shorter, add a few light qualifiers
+        elif current_word_count < original_word_count * 0.8:  # Only if 20% shorter
+            words = result.split()
+            additions = ['also', 'really', 'actually']
+            max_additions = min(2, original_word_count - current_word_count)  # Max 2 words
+            
+            for addition in additions[:max_additions]:
+                # Insert near the middle of the text
+                insert_pos = len(words) // 2
+                if insert_pos > 0:
+                    words.insert(insert_pos, addition)
+            
+            result = ' '.join(words)
+    
+    return result.strip()
+
+def legacy_humanize_text(text: str, tone: str = "neutral", style: str = "professional") -> str:
+    """Humanize text using rule-based approach"""
+    
+    # Basic contractions
+    contractions = {
+        r'\bI am\b': "I'm",
+        r'\byou are\b': "you're",
+        r'\bwe are\b': "we're",
+        r'\bthey are\b': "they're",
+        r'\bit is\b': "it's",
+        r'\bthat is\b': "that's",
+        r'\bthis is\b': "this's",
+        r'\bthere is\b': "there's",
+        r'\bhere is\b': "here's",
+        r'\bI will\b': "I'll",
+        r'\byou will\b': "you'll",
+        r'\bwe will\b': "we'll",
+        r'\bthey will\b': "they'll",
+        r'\bit will\b': "it'll",
+        r'\bthat will\b': "that'll",
+        r'\bI would\b': "I'd",
+        r'\byou would\b': "you'd",
+        r'\bwe would\b': "we'd",
+        r'\bthey would\b': "they'd",
+        r'\bit would\b': "it'd",
+        r'\bthat would\b': "that'd",
+        r'\bI have\b': "I've",
+        r'\byou have\b': "you've",
+        r'\bwe have\b': "we've",
+        r'\bthey have\b': "they've",
+        r'\bit has\b': "it's",
+        r'\bthat has\b': "that's",
+    }
+    
+    result = text
+    
+    # Apply contractions
+    for pattern, replacement in contractions.items():
+        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+    
+    # Add natural language patterns based on tone
+    if tone == "casual":
+        # Make it more casual
+        result = re.sub(r'\bvery\b', 'really', result, flags=re.IGNORECASE)
+        result = re.sub(r'\bimportant\b', 'big', result, flags=re.IGNORECASE)
+        result = re.sub(r'\bexcellent\b', 'awesome', result, flags=re.IGNORECASE)
+        result = re.sub(r'\bterrible\b', 'awful', result, flags=re.IGNORECASE)
+    
+    elif tone == "professional":
+        # Keep it professional but natural
+        result = re.sub(r'\bawesome\b', 'excellent', result, flags=re.IGNORECASE)
+        result = re.sub(r'\bawful\b', 'poor', result, flags=re.IGNORECASE)
+    
+    # Add conversational elements
+    if style == "conversational":
+        # Add some conversational starters
+        if not result.startswith(('I', 'You', 'We', 'They', 'It', 'This', 'That')):
+            result = f"Well, {result.lower()}"
+    
+    # Fix common AI-generated patterns
+    result = re.sub(r'\bIn conclusion\b', 'So', result, flags=re.IGNORECASE)
+    result = re.sub(r'\bFurthermore\b', 'Also', result, flags=re.IGNORECASE)
+    result = re.sub(r'\bMoreover\b', 'Plus', result, flags=re.IGNORECASE)
+    result = re.sub(r'\bAdditionally\b', 'Also', result, flags=re.IGNORECASE)
+    result = re.sub(r'\bIt is important to note\b', 'Keep in mind', result, flags=re.IGNORECASE)
+    
+    # Add natural pauses and flow
+    result = re.sub(r'\.(?=\s*[A-Z])', '. ', result)
+    
+    return result
+
+def build_text(size_kb: int) -> str:
+    repeats = max(1, (size_kb * 1024) // len(SAMPLE))
+    return SAMPLE * repeats
+
+def throughput(fn, text: str, repeat: int) -> float:
+    """Best-of-N throughput in MB/s"""
+    best = float("inf")
+    for _ in range(repeat):
+        random.seed(0)
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / (1024 * 1024) / best
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=256, help="size of the generated input text")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per function, best one is reported")
+    args = parser.parse_args()
+
+    text = build_text(args.size_kb)
+    cases = [
+        ("apply_style_adjustments",
+         lambda t: legacy_apply_style_adjustments(t, "friendly", "professional"),
+         lambda t: main.apply_style_adjustments(t, "friendly", "professional")),
+        ("advanced_humanization_pipeline",
+         lambda t: legacy_advanced_humanization_pipeline(t, "friendly", "casual"),
+         lambda t: main.advanced_humanization_pipeline(t, "friendly", "casual")),
+        ("main_simple.humanize_text",
+         lambda t: legacy_humanize_text(t, "casual", "professional"),
+         lambda t: main_simple.humanize_text(t, "casual", "professional")),
+    ]
+
+    print(f"Input: {len(text.encode('utf-8')) / 1024:.0f} KiB, best of {args.repeat}")
+    print(f"{'function':<34}{'multi-pass MB/s':>16}{'single-pass MB/s':>18}{'speedup':>10}")
+    for name, legacy, compiled in cases:
+        before = throughput(legacy, text, args.repeat)
+        after = throughput(compiled, text, args.repeat)
+        print(f"{name:<34}{before:>16.2f}{after:>18.2f}{after / before:>9.1f}x")
+
+if __name__ == "__main__":
+    main_cli()
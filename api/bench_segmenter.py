@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native sentence segmenter against NLTK punkt
+
+Usage: python bench_segmenter.py [--repeat 200] [--show-disagreements]
+
+Splits the bundled corpus below with both segmenters and reports throughput
+(MB/s) and boundary agreement (precision/recall of the native boundaries
+taking punkt's as reference). Uses the pretrained English punkt model when
+its data is installed, otherwise punkt trained on the corpus itself.
+"""
+import argparse
+import time
+
+from segmenter import sentence_spans
+
+# Paragraphs with abbreviations, initials, numbers, quotes and ellipses
+CORPUS = [
+    "The committee reviewed the quarterly budget and approved additional funding for research. "
+    "Dr. Patel presented the results on Jan. 12, and Prof. Lee answered questions. "
+    "Funding rose by 3.5 percent compared with last year.",
+    "Researchers found that regular exercise improves memory. The study followed 1,200 adults "
+    "for approx. six years! Participants who walked daily scored higher on recall tests. "
+    "Why does this happen? Scientists are not yet sure.",
+    "Mr. and Mrs. Jones moved to St. Louis in 2019. They opened a bakery on Main St. near the "
+    "station. Business was slow at first... but it picked up by the summer.",
+    "It is important to note that the new policy does not apply to existing contracts "
+    "(see Sec. 4 of the agreement). Contracts signed after Oct. 1 must follow the new rules. "
+    "Questions should go to the legal dept. before signing.",
+    "J. R. R. Tolkien published The Hobbit in 1937. The book was an immediate success. "
+    "Its sequel took more than a decade to finish.",
+    "\"We are proud of the team,\" said the CEO. \"This was a hard year.\" "
+    "Analysts expected weaker numbers. Shares rose 4% after the announcement.",
+    "Many companies, e.g. Acme Inc. and Globex Corp., are adopting remote work. "
+    "Employees in the U.S. and Canada can now work from home three days a week. "
+    "Managers report fewer sick days.",
+    "Furthermore, the survey indicates that customers value fast delivery above low prices. "
+    "Only 12 percent chose price as their top concern. Delivery time came first for most "
+    "respondents, i.e. nearly two thirds of them.",
+    "Local farmers are experimenting with drought resistant crops. Yields vary widely, "
+    "from 2.1 to 4.8 tons per hectare. Some farms switched entirely; others kept a few "
+    "fields of wheat as a fallback.",
+    "In conclusion, the project met its goals while staying within the original schedule. "
+    "The final report is due on Dec. 3. A follow-up study will begin next spring.",
+    "Wait... what did you say? I said the meeting moved to 3 p.m. tomorrow. "
+    "Please tell Ms. Garcia and the rest of the team.",
+    "Vol. 2 of the series covers the years 1900 to 1950. Fig. 3 shows the population growth "
+    "in that period. The numbers come from the national census.",
+]
+
+def punkt_span_tokenizer(text: str):
+    """Pretrained English punkt if installed, else punkt trained on ``text``; returns (span_tokenize, label)"""
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+        return PunktTokenizer("english").span_tokenize, "punkt (pretrained english)"
+    except (ImportError, LookupError):
+        pass
+    try:
+        import nltk
+        return nltk.data.load("tokenizers/punkt/english.pickle").span_tokenize, "punkt (pretrained english)"
+    except LookupError:
+        from nltk.tokenize.punkt import PunktSentenceTokenizer
+        return PunktSentenceTokenizer(text).span_tokenize, "punkt (trained on corpus, no data installed)"
+
+def boundaries(spans):
+    """End offsets of every sentence but the last"""
+    return {end for _, end in spans[:-1]}
+
+def throughput(split, texts, repeat: int) -> float:
+    """MB/s of splitting every text ``repeat`` times"""
+    size = sum(len(text.encode()) for text in texts) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            split(text)
+    return size / (time.perf_counter() - start) / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--show-disagreements", action="store_true")
+    args = parser.parse_args()
+
+    punkt, label = punkt_span_tokenizer("\n\n".join(CORPUS))
+    print(f"Reference: {label}")
+
+    agreed = native_total = punkt_total = 0
+    for text in CORPUS:
+        native_spans = sentence_spans(text)
+        punkt_spans = list(punkt(text))
+        native, reference = boundaries(native_spans), boundaries(punkt_spans)
+        agreed += len(native & reference)
+        native_total += len(native)
+        punkt_total += len(reference)
+        if args.show_disagreements and native != reference:
+            print(f"\nnative: {[text[s:e] for s, e in native_spans]}")
+            print(f"punkt:  {[text[s:e] for s, e in punkt_spans]}")
+
+    precision = agreed / native_total if native_total else 1.0
+    recall = agreed / punkt_total if punkt_total else 1.0
+    print(f"Boundaries: native {native_total}, punkt {punkt_total}, shared {agreed} "
+          f"(precision {precision:.3f}, recall {recall:.3f})")
+
+    native_speed = throughput(sentence_spans, CORPUS, args.repeat)
+    punkt_speed = throughput(lambda text: list(punkt(text)), CORPUS, args.repeat)
+    print(f"Throughput: native {native_speed:.2f} MB/s, punkt {punkt_speed:.2f} MB/s "
+          f"({native_speed / punkt_speed:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shingle similarity scorer against the difflib one
+
+Usage: python bench_similarity.py [--repeat 3] [--seed 0]
+
+Reports scoring time per document length and how closely the two scorers
+agree when ranking perturbed rewrites of the same document.
+"""
+import argparse
+import random
+import time
+
+from similarity import content_similarity
+
+SENTENCES = [
+    "The committee reviewed the quarterly budget and approved additional funding for research.",
+    "Researchers found that regular exercise improves memory and reduces stress in older adults.",
+    "It is important to note that the new policy does not apply to existing contracts.",
+    "Many companies are adopting remote work to attract talent from different regions.",
+    "The results demonstrate a significant improvement in accuracy over the previous model.",
+    "Furthermore, the survey indicates that customers value fast delivery above low prices.",
+    "Local farmers are experimenting with drought resistant crops to protect their harvests.",
+    "In conclusion, the project met its goals while staying within the original schedule.",
+]
+
+SYNONYMS = {
+    "important": "crucial", "significant": "notable", "many": "numerous", "improves": "boosts",
+    "found": "discovered", "reviewed": "examined", "new": "updated", "fast": "quick",
+}
+
+def build_document(words: int, rng: random.Random) -> str:
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        sentences.append(rng.choice(SENTENCES))
+    return " ".join(sentences)
+
+def perturb(text: str, rate: float, rng: random.Random) -> str:
+    """Swap synonyms, drop words and shuffle sentences with the given intensity"""
+    words = []
+    for word in text.split():
+        roll = rng.random()
+        if roll < rate * 0.3:
+            continue
+        if roll < rate * 0.8:
+            word = SYNONYMS.get(word.lower(), word)
+        words.append(word)
+    sentences = " ".join(words).split(". ")
+    if rng.random() < rate:
+        rng.shuffle(sentences)
+    return ". ".join(sentences)
+
+def rank(values):
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    for position, index in enumerate(order):
+        ranks[index] = float(position)
+    return ranks
+
+def spearman(a, b) -> float:
+    ra, rb = rank(a), rank(b)
+    n = len(a)
+    mean = (n - 1) / 2
+    cov = sum((x - mean) * (y - mean) for x, y in zip(ra, rb))
+    var = sum((x - mean) ** 2 for x in ra)
+    return cov / var if var else 1.0
+
+def timed(scorer: str, original: str, candidate: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content_similarity(original, candidate, scorer)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'words':>8}{'difflib ms':>14}{'shingle ms':>14}{'speedup':>10}")
+    for words in (100, 500, 2000, 8000):
+        original = build_document(words, rng)
+        candidate = perturb(original, 0.3, rng)
+        before = timed("difflib", original, candidate, args.repeat) * 1000
+        after = timed("shingle", original, candidate, args.repeat) * 1000
+        print(f"{words:>8}{before:>14.2f}{after:>14.2f}{before / after:>9.1f}x")
+
+    original = build_document(300, rng)
+    candidates = [perturb(original, rate, rng) for rate in [i / 20 for i in range(21)] for _ in range(3)]
+    candidates.append(build_document(300, random.Random(args.seed + 1)))
+    difflib_scores = [content_similarity(original, c, "difflib") for c in candidates]
+    shingle_scores = [content_similarity(original, c, "shingle") for c in candidates]
+    print(f"\nRank agreement over {len(candidates)} rewrites (Spearman): {spearman(difflib_scores, shingle_scores):.3f}")
+
+if __name__ == "__main__":
+    main_cli()
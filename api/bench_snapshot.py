@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start from a model directory against a prebuilt snapshot
+
+Usage: python bench_snapshot.py [--runs 3] [--d-model 512] [--layers 6] [--precision auto]
+
+Saves a randomly initialized T5 as a plain pretrained directory (what
+MODEL_REPO resolves to once downloaded) and builds a snapshot from it. Each
+run is a fresh interpreter that imports main and loads the model the way the
+server does, once from the directory (precision conversion and self-check at
+startup) and once from MODEL_SNAPSHOT_DIR. Reports median seconds per step
+from the server's startup report, with the torch/transformers import timed
+as its own step. The download a fresh container does without a snapshot is
+not included, so real cold starts differ by more.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+# Timed on its own: both sources pay it, and it would hide the load itself
+from transformers import AutoModelForSeq2SeqLM, T5ForConditionalGeneration
+libraries = time.perf_counter()
+assert main.initialize_model(), main._model_error
+print(json.dumps({
+    "importSeconds": imported - started,
+    "libraryImportSeconds": libraries - imported,
+    "readySeconds": time.perf_counter() - started,
+    "precision": main._model_precision,
+    **main._model_startup,
+}))
+"""
+
+STEPS = ("importSeconds", "libraryImportSeconds", "loadSeconds", "backendSeconds", "warmupSeconds", "readySeconds")
+
+def run_once(env_overrides: dict) -> dict:
+    env = {
+        **os.environ,
+        "EAGER_MODEL_LOAD": "false",
+        "HF_HUB_OFFLINE": "1",
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(tempfile.mkdtemp(), "jobs.sqlite"),
+        **env_overrides,
+    }
+    completed = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise RuntimeError(f"Run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--d-model", type=int, default=512)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--precision", default="auto")
+    args = parser.parse_args()
+
+    from snapshot import build_snapshot
+    from tiny_model import build_tiny_seq2seq
+
+    directory = tempfile.mkdtemp(prefix="bench_snapshot_")
+    repo = os.path.join(directory, "repo")
+    tokenizer, model = build_tiny_seq2seq(d_model=args.d_model, d_ff=4 * args.d_model, num_layers=args.layers)
+    model.save_pretrained(repo)
+    tokenizer.save_pretrained(repo)
+    manifest = build_snapshot(repo, os.path.join(directory, "snapshot"), args.precision)
+    print(f"Snapshot: {manifest['precision']} ({manifest['dtype']} weights), built in "
+          f"{manifest['buildSeconds']['total']:.1f}s", file=sys.stderr)
+
+    sources = {
+        "repo": {"MODEL_REPO": repo, "MODEL_PRECISION": args.precision, "MODEL_SNAPSHOT_DIR": ""},
+        "snapshot": {"MODEL_REPO": os.path.join(directory, "no-such-model"),
+                     "MODEL_SNAPSHOT_DIR": os.path.join(directory, "snapshot")},
+    }
+    report = {}
+    for name, env in sources.items():
+        runs = [run_once(env) for _ in range(args.runs)]
+        report[name] = {step: round(statistics.median(r.get(step, 0.0) for r in runs), 3) for step in STEPS}
+        report[name]["precision"] = runs[0]["precision"]
+        print(f"{name:<9}" + "  ".join(f"{step[:-7]} {report[name][step]:.3f}s" for step in STEPS)
+              + f"  ({report[name]['precision']})", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
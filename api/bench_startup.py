@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start of the API: import time and the first /humanize request
+
+Usage: python bench_startup.py [--runs 5] [--modes rules neural]
+
+Each run is a fresh interpreter that imports main, starts the app and sends
+one /humanize request in-process. Neural mode runs with EAGER_MODEL_LOAD off
+and MODEL_REPO pointing nowhere, so the first request measures the rule
+fallback rather than a model download. Reports median seconds and which heavy
+modules (torch, transformers, nltk) ended up imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ("torch", "transformers", "nltk")
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    response = client.post("/humanize", json={"text": "It is important to note that the results are good."})
+    first = time.perf_counter()
+print(json.dumps({
+    "importSeconds": imported - started,
+    "startupSeconds": ready - started,
+    "firstRequestSeconds": first - ready,
+    "status": response.status_code,
+    "heavyModules": [name for name in %r if name in sys.modules],
+}))
+"""
+
+def run_once(mode: str) -> dict:
+    env = {
+        **os.environ,
+        "HUMANIZE_MODE": mode,
+        "EAGER_MODEL_LOAD": "false",
+        "MODEL_REPO": os.path.join(os.path.dirname(os.path.abspath(__file__)), "no-such-model"),
+        "HF_HUB_OFFLINE": "1",
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(tempfile.mkdtemp(), "jobs.sqlite"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE % (HEAVY_MODULES,)],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=["rules", "neural"], default=["rules", "neural"])
+    args = parser.parse_args()
+
+    report = {}
+    for mode in args.modes:
+        runs = [run_once(mode) for _ in range(args.runs)]
+        report[mode] = {
+            "importSeconds": round(statistics.median(r["importSeconds"] for r in runs), 3),
+            "startupSeconds": round(statistics.median(r["startupSeconds"] for r in runs), 3),
+            "firstRequestSeconds": round(statistics.median(r["firstRequestSeconds"] for r in runs), 3),
+            "heavyModules": sorted({name for r in runs for name in r["heavyModules"]}),
+        }
+        print(f"{mode:<8}import {report[mode]['importSeconds']:.3f}s  startup {report[mode]['startupSeconds']:.3f}s  "
+              f"first request {report[mode]['firstRequestSeconds']:.3f}s  "
+              f"heavy modules: {', '.join(report[mode]['heavyModules']) or 'none'}", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Memory report for serve.py: per-worker RSS/PSS as workers are added
+
+Usage: python bench_workers.py [--workers 1 2 4] [--d-model 512] [--layers 6] [--compare-unshared]
+
+Saves a randomly initialized T5 (about 170 MiB of float32 weights at the
+default size) to a temporary directory, starts serve.py on it with each
+worker count, sends a few requests so every worker has generated, then reads
+/proc/<pid>/smaps_rollup of the parent and each worker. With weights shared
+copy-on-write, total PSS stays close to one model however many workers run.
+--compare-unshared repeats each run with --no-preload (one copy per worker).
+Linux only.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from serve import memory_report
+
+def save_model(directory: str, d_model: int, layers: int) -> str:
+    from tiny_model import build_tiny_seq2seq
+
+    tokenizer, model = build_tiny_seq2seq(d_model=d_model, d_ff=4 * d_model, num_layers=layers)
+    model.save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+    weights = sum(p.numel() * p.element_size() for p in model.parameters())
+    print(f"Model: {weights / 2 ** 20:.0f} MiB of weights in {directory}", file=sys.stderr)
+    return directory
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def child_pids(parent: int):
+    """Processes whose parent is ``parent``, from /proc"""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return pids
+
+def post(url: str, text: str) -> int:
+    request = urllib.request.Request(url, data=json.dumps({"text": text, "preset": "fast"}).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.status
+
+def wait_ready(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/readyz", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError("serve.py did not become ready")
+
+def measure(workers: int, model_dir: str, preload: bool, requests: int) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "MODEL_REPO": model_dir,
+        "MODEL_PRECISION": os.getenv("MODEL_PRECISION", "float32"),
+        "HF_HUB_OFFLINE": "1",
+        "CACHE_ENABLED": "false",
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(tempfile.mkdtemp(), "jobs.sqlite"),
+    }
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1",
+               "--port", str(port), "--threads-per-worker", "1", "--log-level", "warning"]
+    if not preload:
+        command.append("--no-preload")
+    server = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, timeout=300)
+        # Concurrent requests spread over the workers so each one generates
+        text = "The quick brown fox jumps over the lazy dog. Machine learning can process data fast."
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            statuses = list(pool.map(lambda _: post(f"{base_url}/humanize", text), range(requests * workers)))
+        time.sleep(1.0)
+        report = memory_report(server.pid, child_pids(server.pid))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    worker_usage = list(report["workers"].values())
+    return {
+        "workers": workers,
+        "preload": preload,
+        "errors": sum(status != 200 for status in statuses),
+        "meanWorkerRssMb": round(sum(u["rss"] for u in worker_usage) / len(worker_usage), 1),
+        "meanWorkerPssMb": round(sum(u["pss"] for u in worker_usage) / len(worker_usage), 1),
+        "meanWorkerPrivateMb": round(sum(u["private"] for u in worker_usage) / len(worker_usage), 1),
+        "totalPssMb": report["totalPss"],
+        "processes": report,
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--d-model", type=int, default=512)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--requests", type=int, default=4, help="requests per worker before measuring")
+    parser.add_argument("--compare-unshared", action="store_true")
+    args = parser.parse_args()
+
+    model_dir = save_model(tempfile.mkdtemp(prefix="bench_workers_"), args.d_model, args.layers)
+    results = []
+    for preload in ([True, False] if args.compare_unshared else [True]):
+        for workers in args.workers:
+            result = measure(workers, model_dir, preload, args.requests)
+            results.append(result)
+            print(f"{'shared' if preload else 'unshared':<9}{workers:>3} workers  "
+                  f"worker RSS {result['meanWorkerRssMb']:>7.1f} MiB  PSS {result['meanWorkerPssMb']:>7.1f} MiB  "
+                  f"private {result['meanWorkerPrivateMb']:>7.1f} MiB  total PSS {result['totalPssMb']:>7.1f} MiB",
+                  file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
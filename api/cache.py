@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+LRU/TTL caches for humanization results
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+def estimate_size(value) -> int:
+    """Approximate memory used by a cached string or JSON-like value"""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    return sys.getsizeof(json.dumps(value, default=str))
+
+def normalize_text(text: str) -> str:
+    """Collapse spaces within lines so trivially different submissions share a cache key.
+
+    Line breaks are kept: the output follows the input's paragraphs, so texts
+    that differ only in them must not share a cached response.
+    """
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines())
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count, total bytes and age.
+
+    Each entry's size is measured once on insert so the byte total stays
+    accurate as entries are evicted or replaced.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024,
+                 ttl_seconds: float = 3600, size_fn: Callable = estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size_fn = size_fn
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        """Return a cached value and mark it recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value):
+        """Store a value, evicting least recently used entries to stay in budget"""
+        size = self.size_fn(value)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Entry, byte and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+class ParaphraseCache:
+    """Per-sentence paraphrases: an in-process LRU in front of an optional shared backend.
+
+    Lookups and stores are batched so a whole document costs at most one
+    round trip to the shared backend. Shared backend errors are logged and
+    treated as misses so caching never fails a request.
+    """
+
+    def __init__(self, local: LRUCache, shared=None):
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    @staticmethod
+    def key(sentence: str, model_key: str) -> str:
+        """Stable key shared by every worker and restart"""
+        return hashlib.sha1(f"{model_key}\0{sentence}".encode("utf-8")).hexdigest()
+
+    def get_many(self, sentences: List[str], model_key: str) -> Dict[str, str]:
+        """Return cached paraphrases for whichever sentences are known"""
+        found = {}
+        missing = {}
+        for sentence in sentences:
+            key = self.key(sentence, model_key)
+            cached = self.local.get(key)
+            if cached is not None:
+                found[sentence] = cached
+            else:
+                missing[key] = sentence
+
+        if missing and self.shared is not None:
+            try:
+                shared_found = self.shared.get_many(list(missing))
+            except Exception as e:
+                print(f"Shared paraphrase cache read error: {e}")
+                self.shared_errors += 1
+                shared_found = {}
+
+            self.shared_hits += len(shared_found)
+            self.shared_misses += len(missing) - len(shared_found)
+            for key, value in shared_found.items():
+                # Promote shared hits into the local tier
+                self.local.set(key, value)
+                found[missing[key]] = value
+
+        return found
+
+    def set_many(self, paraphrases: Dict[str, str], model_key: str):
+        """Store new paraphrases in both tiers"""
+        if not paraphrases:
+            return
+
+        items = {self.key(sentence, model_key): value for sentence, value in paraphrases.items()}
+        for key, value in items.items():
+            self.local.set(key, value)
+
+        if self.shared is not None:
+            try:
+                self.shared.set_many(items)
+            except Exception as e:
+                print(f"Shared paraphrase cache write error: {e}")
+                self.shared_errors += 1
+
+    def clear(self):
+        """Drop the local tier (the shared backend is left alone)"""
+        self.local.clear()
+
+    def stats(self) -> dict:
+        """Local LRU counters plus shared backend hits, misses and errors"""
+        stats = self.local.stats()
+        stats["shared"] = {
+            "backend": getattr(self.shared, "name", "none"),
+            "hits": self.shared_hits,
+            "misses": self.shared_misses,
+            "errors": self.shared_errors
+        }
+        return stats
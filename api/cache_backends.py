@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Shared paraphrase cache backends that survive restarts and span workers
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+class CacheBackend:
+    """Batched key/value store for sentence paraphrases"""
+
+    name = "base"
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return the cached values for whichever keys are present"""
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, str]):
+        """Store several values in one round trip"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def after_fork(self):
+        """Drop connections inherited from the parent process without closing them"""
+
+class NullCacheBackend(CacheBackend):
+    """Backend that stores nothing"""
+
+    name = "none"
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        return {}
+
+    def set_many(self, items: Dict[str, str]):
+        pass
+
+class SQLiteCacheBackend(CacheBackend):
+    """File-backed store shared by every worker process on a host.
+
+    WAL mode lets readers and a writer run concurrently, and the database is
+    memory-mapped so hot pages are shared through the OS page cache.
+    """
+
+    name = "sqlite"
+
+    # SQLite limits the number of bound parameters per statement
+    MAX_VARIABLES = 500
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS paraphrases "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        connection.commit()
+        self.prune()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite connections must not be shared across threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found = {}
+        now = time.time()
+        connection = self._connection()
+        for start in range(0, len(keys), self.MAX_VARIABLES):
+            chunk = keys[start:start + self.MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT key, value FROM paraphrases WHERE key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, now)
+            )
+            found.update(rows)
+        return found
+
+    def set_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO paraphrases (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, value in items.items()]
+            )
+
+    def prune(self):
+        """Delete expired rows"""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM paraphrases WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def after_fork(self):
+        # An sqlite connection must not be used across fork; the parent keeps its own
+        self._local = threading.local()
+
+class RedisProtocolError(Exception):
+    """Error reply or malformed data from a Redis-protocol server"""
+
+class RedisCacheBackend(CacheBackend):
+    """Minimal Redis (RESP) client: MGET for reads, pipelined SET EX for writes"""
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl_seconds: float = 7 * 24 * 3600,
+                 timeout: float = 1.0, key_prefix: str = "notecraft:para:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.ttl_seconds = int(ttl_seconds)
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", str(self.db)))
+        try:
+            if setup:
+                self._pipeline(setup)
+        except BaseException:
+            # A failed AUTH or SELECT must not leave a half set up connection behind
+            self._disconnect()
+            raise
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(command) -> bytes:
+        parts = [f"*{len(command)}\r\n".encode()]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            # Returned, not raised, so the caller can still read the replies after it
+            return RedisProtocolError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unexpected reply type {kind!r}")
+
+    def _pipeline(self, commands) -> list:
+        """Send every command in one write and read all replies.
+
+        Every reply is read before an error reply is raised, so none is left
+        on the connection to be mistaken for the reply to the next command.
+        """
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisProtocolError):
+                raise reply
+        return replies
+
+    def _execute(self, commands) -> list:
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._pipeline(commands)
+                except (OSError, ConnectionError):
+                    # Reconnect once after a dropped connection
+                    self._disconnect()
+                    if attempt:
+                        raise
+                except BaseException:
+                    # The connection state is unknown after anything else; start over next time
+                    self._disconnect()
+                    raise
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            return {}
+        values = self._execute([("MGET", *[self.key_prefix + key for key in keys])])[0]
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        commands = []
+        for key, value in items.items():
+            if self.ttl_seconds:
+                commands.append(("SET", self.key_prefix + key, value, "EX", self.ttl_seconds))
+            else:
+                commands.append(("SET", self.key_prefix + key, value))
+        self._execute(commands)
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def after_fork(self):
+        # The socket is shared with the parent, so forget it rather than close it
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+def create_cache_backend(name: str, path: str = None, url: str = None, ttl_seconds: float = 7 * 24 * 3600) -> CacheBackend:
+    """Build the configured shared cache backend"""
+    name = (name or "none").lower()
+    if name == "sqlite":
+        return SQLiteCacheBackend(path or "/tmp/model_cache/paraphrases.sqlite", ttl_seconds=ttl_seconds)
+    if name == "redis":
+        return RedisCacheBackend(url or "redis://localhost:6379/0", ttl_seconds=ttl_seconds)
+    if name == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown cache backend '{name}', expected sqlite, redis or none")
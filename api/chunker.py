@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pack sentences into token-budgeted chunks for generation
+"""
+import re
+from typing import Callable, Container, List, NamedTuple
+
+CLAUSE_BREAK_RE = re.compile(r'(?<=[,;:])\s+')
+WORD_BREAK_RE = re.compile(r'\s+')
+
+class Chunk(NamedTuple):
+    """Text sent to the model as one sequence, and the sentences it came from.
+
+    ``first`` and ``last`` are inclusive sentence indices. A sentence too
+    long for the budget is split into several chunks that share the same
+    index, numbered by ``part`` out of ``parts``.
+    """
+    text: str
+    first: int
+    last: int
+    part: int = 0
+    parts: int = 1
+
+def token_counter(tokenizer) -> Callable[[List[str]], List[int]]:
+    """Count tokens per text with the model's tokenizer, without special tokens"""
+    def count(texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+    return count
+
+def _greedy_join(pieces: List[str], counts: List[int], budget: int) -> List[str]:
+    """Join adjacent pieces with spaces while they fit the budget"""
+    joined = []
+    current, current_tokens = [], 0
+    for piece, tokens in zip(pieces, counts):
+        if current and current_tokens + tokens > budget:
+            joined.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        joined.append(" ".join(current))
+    return joined
+
+def _slice_word(word: str, tokens: int, budget: int) -> List[str]:
+    """Cut a single token-heavy word into character slices of roughly budget tokens"""
+    size = max(1, len(word) * budget // tokens)
+    return [word[i:i + size] for i in range(0, len(word), size)]
+
+def split_oversized(sentence: str, count_tokens: Callable[[List[str]], List[int]], budget: int) -> List[str]:
+    """Split a sentence over the budget at clause breaks, then between words.
+
+    Nothing is dropped: the pieces hold every character of the sentence
+    apart from the whitespace they were split on.
+    """
+    pieces = [sentence]
+    counts = count_tokens(pieces)
+    for splitter in (CLAUSE_BREAK_RE, WORD_BREAK_RE):
+        if max(counts) <= budget:
+            break
+        split_pieces = []
+        for piece, tokens in zip(pieces, counts):
+            if tokens > budget:
+                split_pieces.extend(p for p in splitter.split(piece) if p)
+            else:
+                split_pieces.append(piece)
+        pieces = split_pieces
+        counts = count_tokens(pieces)
+
+    if max(counts) <= budget:
+        return _greedy_join(pieces, counts, budget)
+
+    # Single words beyond the budget (e.g. long URLs) are cut by characters;
+    # their slices stay separate so no space is inserted inside the word
+    result = []
+    start = 0
+    for i, (piece, tokens) in enumerate(zip(pieces, counts)):
+        if tokens > budget:
+            result.extend(_greedy_join(pieces[start:i], counts[start:i], budget))
+            result.extend(_slice_word(piece, tokens, budget))
+            start = i + 1
+    result.extend(_greedy_join(pieces[start:], counts[start:], budget))
+    return result
+
+def pack_sentences(sentences: List[str], count_tokens: Callable[[List[str]], List[int]], budget: int,
+                   breaks: Container[int] = ()) -> List[Chunk]:
+    """Group adjacent sentences into chunks of at most ``budget`` tokens.
+
+    A budget of 0 or less gives one chunk per sentence. A chunk never
+    continues across a sentence index in ``breaks`` (sentences that start a
+    line or paragraph, whose break a chunk's paraphrase couldn't keep).
+    """
+    if budget <= 0:
+        return [Chunk(sentence, i, i) for i, sentence in enumerate(sentences)]
+
+    chunks = []
+    current, current_first, current_tokens = [], 0, 0
+
+    def flush():
+        if current:
+            chunks.append(Chunk(" ".join(current), current_first, current_first + len(current) - 1))
+
+    for i, (sentence, tokens) in enumerate(zip(sentences, count_tokens(sentences))):
+        if tokens > budget:
+            flush()
+            current, current_tokens = [], 0
+            pieces = split_oversized(sentence, count_tokens, budget)
+            chunks.extend(Chunk(piece, i, i, part, len(pieces)) for part, piece in enumerate(pieces))
+            continue
+
+        if current and (current_tokens + tokens > budget or i in breaks):
+            flush()
+            current, current_tokens = [], 0
+        if not current:
+            current_first = i
+        current.append(sentence)
+        current_tokens += tokens
+
+    flush()
+    return chunks
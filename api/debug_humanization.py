@@ -10,7 +10,7 @@ from main import (
     advanced_humanization_pipeline, 
     sentence_by_sentence_humanization,
     split_into_sentences,
-    get_model
+    get_backend
 )
 
 # Fix NLTK data
@@ -51,16 +51,16 @@ def debug_functions():
     
     # Test 3: Model loading
     print("3. Testing model loading:")
-    tokenizer, model = get_model()
-    if tokenizer is None or model is None:
+    backend = get_backend()
+    if backend is None:
         print("Model loading failed - will use fallback")
     else:
-        print("Model loaded successfully")
+        print(f"Model loaded successfully ({backend.name} backend)")
         
         # Test 4: Sentence-by-sentence humanization
         print("4. Testing sentence_by_sentence_humanization:")
         try:
-            result = sentence_by_sentence_humanization(test_text, tokenizer, model, "neutral", "professional")
+            result = sentence_by_sentence_humanization(test_text, backend, "neutral", "professional")
             print(f"Result ({len(result.split())} words): {result}")
         except Exception as e:
             print(f"Error: {e}")
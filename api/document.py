@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Documents as one text buffer with sentence and word spans computed on first use
+"""
+import re
+from functools import cached_property
+from typing import List, Optional, Sequence, Tuple, Union
+
+from segmenter import sentence_spans
+
+WORD_RE = re.compile(r'\S+')
+
+# Sentence-final punctuation and closing quotes at the end of a sentence
+TERMINAL_RE = re.compile(r'[.!?…]+["\'”’)\]]*$')
+
+def separator_for(gap: str) -> str:
+    """Whitespace to put between two sentences that were separated by ``gap``.
+
+    Paragraph breaks and line breaks survive; anything else becomes one space.
+    """
+    newlines = gap.count("\n")
+    if newlines >= 2:
+        return "\n\n"
+    return "\n" if newlines else " "
+
+def join_sentences(sentences: Sequence[str], separators: Sequence[str]) -> str:
+    """Join sentences with ``separators[i]`` between sentence i and i + 1"""
+    if not sentences:
+        return ""
+    parts = [sentences[0]]
+    for separator, sentence in zip(separators, sentences[1:]):
+        parts.append(separator)
+        parts.append(sentence)
+    return "".join(parts)
+
+def split_terminal(sentence: str) -> Tuple[str, str]:
+    """Split a sentence into its body and its final punctuation (possibly empty)"""
+    match = TERMINAL_RE.search(sentence)
+    if match is None:
+        return sentence, ""
+    return sentence[:match.start()], match.group()
+
+class Document:
+    """Text with sentence spans, separators and word counts, each computed once.
+
+    Nothing is split until it is asked for: a validator that only needs the
+    word count never runs the sentence segmenter, and sentence strings are
+    only sliced out of the buffer when ``sentences`` is read.
+    """
+
+    def __init__(self, text: str, spans: Optional[List[Tuple[int, int]]] = None):
+        self.text = text
+        if spans is not None:
+            self.spans = spans
+
+    @cached_property
+    def spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each sentence, see ``segmenter.sentence_spans``"""
+        return sentence_spans(self.text)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        return [self.text[start:end] for start, end in self.spans]
+
+    @cached_property
+    def separators(self) -> List[str]:
+        """Whitespace to put after each sentence but the last when rejoining"""
+        spans = self.spans
+        return [separator_for(self.text[spans[i][1]:spans[i + 1][0]]) for i in range(len(spans) - 1)]
+
+    @cached_property
+    def paragraph_starts(self) -> frozenset:
+        """Indices of sentences that begin a new paragraph (after a blank line)"""
+        return frozenset(i + 1 for i, separator in enumerate(self.separators) if separator == "\n\n")
+
+    @cached_property
+    def line_starts(self) -> frozenset:
+        """Indices of sentences that begin a new line or paragraph"""
+        return frozenset(i + 1 for i, separator in enumerate(self.separators) if separator != " ")
+
+    @cached_property
+    def words(self) -> List[str]:
+        return self.text.split()
+
+    @cached_property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @cached_property
+    def word_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each whitespace-separated word"""
+        return [match.span() for match in WORD_RE.finditer(self.text)]
+
+    def remove_word(self, index: int) -> str:
+        """The text without word ``index`` and the whitespace on one side of it.
+
+        The whitespace after the word goes unless it holds a line break and
+        the whitespace before does not, so breaks survive.
+        """
+        spans = self.word_spans
+        start, end = spans[index]
+        after = spans[index + 1][0] if index + 1 < len(spans) else None
+        before = spans[index - 1][1] if index > 0 else None
+        if after is not None and (before is None or "\n" not in self.text[end:after] or "\n" in self.text[before:start]):
+            end = after
+        elif before is not None:
+            start = before
+        return self.text[:start] + self.text[end:]
+
+    def insert_word(self, index: int, word: str) -> str:
+        """The text with ``word`` and a space inserted before word ``index``"""
+        start = self.word_spans[index][0]
+        return self.text[:start] + word + " " + self.text[start:]
+
+    def join(self, pieces: Sequence[str], last: Sequence[int] = None) -> str:
+        """Rebuild a text from replacement pieces, keeping this document's breaks.
+
+        ``last[k]`` is the index of the final sentence that piece k replaces
+        (by default piece k replaces sentence k). Consecutive pieces of the
+        same sentence are joined with a space.
+        """
+        if last is None:
+            last = range(len(pieces))
+        separators = [
+            " " if previous == current else self.separators[previous]
+            for previous, current in zip(last, last[1:])
+        ]
+        return join_sentences(pieces, separators)
+
+def find_spans(text: str, sentences: Sequence[str]) -> List[Tuple[int, int]]:
+    """Offsets of ``sentences`` found in order in ``text``; raises ValueError if one is missing"""
+    spans, position = [], 0
+    for sentence in sentences:
+        start = text.index(sentence, position)
+        position = start + len(sentence)
+        spans.append((start, position))
+    return spans
+
+def as_document(text: Union[str, Document]) -> Document:
+    return text if isinstance(text, Document) else Document(text)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Bounded executor that keeps blocking inference off the asyncio event loop
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class InferenceQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+class BoundedExecutor:
+    """Thread pool with a hard cap on running plus queued jobs.
+
+    Threads are used rather than processes so every job shares the one
+    cached model; torch releases the GIL inside generate.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn in the pool, raising InferenceQueueFull instead of queueing without bound"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue fn without waiting for it; raises InferenceQueueFull immediately when full"""
+        if not self._slots.acquire(blocking=False):
+            raise InferenceQueueFull()
+
+        with self._lock:
+            self._pending += 1
+        try:
+            # Run in a copy of the caller's context, as asyncio.to_thread does
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+
+        # Free the slot when the job really finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def pending(self) -> int:
+        """Jobs currently running or waiting for a worker"""
+        return self._pending
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and release worker threads"""
+        self._executor.shutdown(wait=wait)
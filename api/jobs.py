@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Asynchronous humanization jobs with a persistent SQLite store and a worker pool
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+class JobStore:
+    """SQLite-backed job table shared by every worker process on a host.
+
+    Jobs are claimed with an atomic status update, so several processes can
+    poll the same file without running a job twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "result TEXT, error TEXT, owner TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "sentences_done INTEGER NOT NULL DEFAULT 0, sentences_total INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite connections must not be shared across threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def create(self, payload: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, json.dumps(payload), now, now)
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim_next(self, owner: str) -> Optional[dict]:
+        """Atomically move the oldest queued job to running for this owner"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (owner, time.time(), row["id"])
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        job = dict(row)
+        job["status"] = "running"
+        job["attempts"] += 1
+        return job
+
+    def update_progress(self, job_id: str, done: int, total: int):
+        self._connection().execute(
+            "UPDATE jobs SET sentences_done = ?, sentences_total = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+            (done, total, time.time(), job_id)
+        )
+
+    def heartbeat(self, owner: str):
+        """Mark this owner's running jobs as still alive"""
+        self._connection().execute(
+            "UPDATE jobs SET updated_at = ? WHERE owner = ? AND status = 'running'",
+            (time.time(), owner)
+        )
+
+    def complete(self, job_id: str, result: dict):
+        now = time.time()
+        self._connection().execute(
+            "UPDATE jobs SET status = 'completed', result = ?, sentences_done = sentences_total, "
+            "updated_at = ?, finished_at = ? WHERE id = ?",
+            (json.dumps(result), now, now, job_id)
+        )
+
+    def fail(self, job_id: str, error: str):
+        now = time.time()
+        self._connection().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+            (error, now, now, job_id)
+        )
+
+    def requeue_stale(self, stale_seconds: float, max_attempts: int) -> int:
+        """Recover running jobs whose worker stopped heartbeating (e.g. it was restarted)"""
+        cutoff = time.time() - stale_seconds
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker stopped too many times', updated_at = ?, finished_at = ? "
+            "WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+            (now, now, cutoff, max_attempts)
+        )
+        return connection.execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL, updated_at = ? WHERE status = 'running' AND updated_at < ?",
+            (now, cutoff)
+        ).rowcount
+
+    def prune(self, retention_seconds: float, max_finished: int) -> int:
+        """Delete finished jobs older than the retention period or beyond the newest max_finished"""
+        connection = self._connection()
+        removed = connection.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (time.time() - retention_seconds,)
+        ).rowcount
+        removed += connection.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND id NOT IN "
+            "(SELECT id FROM jobs WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?)",
+            (max_finished,)
+        ).rowcount
+        return removed
+
+    def count_queued(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+class JobManager:
+    """Pool of worker threads that claim jobs from a JobStore and run them.
+
+    ``run_fn(payload, progress)`` does the work; ``progress(done, total)``
+    is persisted (throttled) so clients can poll it.
+    """
+
+    def __init__(self, store: JobStore, run_fn: Callable, workers: int = 1, max_queued: int = 1000,
+                 retention_seconds: float = 24 * 3600, max_finished: int = 10000,
+                 stale_seconds: float = 60, max_attempts: int = 3, poll_interval: float = 1.0):
+        self.store = store
+        self.run_fn = run_fn
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Recover jobs left behind by a previous process and start the workers"""
+        recovered = self.store.requeue_stale(self.stale_seconds, self.max_attempts)
+        if recovered:
+            print(f"Requeued {recovered} interrupted jobs")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        thread = threading.Thread(target=self._maintain, name="job-maintenance", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, payload: dict) -> str:
+        """Queue a job and return its id"""
+        if self.store.count_queued() >= self.max_queued:
+            raise JobQueueFull()
+        job_id = self.store.create(payload)
+        self._wake.set()
+        return job_id
+
+    def _work(self):
+        while not self._stopped.is_set():
+            job = self.store.claim_next(self.owner)
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: dict):
+        job_id = job["id"]
+        last_write = [0.0]
+
+        def progress(done: int, total: int):
+            # Throttle writes, but always record the final count
+            now = time.monotonic()
+            if done >= total or now - last_write[0] >= 0.5:
+                last_write[0] = now
+                self.store.update_progress(job_id, done, total)
+
+        print(f"Running job {job_id} (attempt {job['attempts']})")
+        try:
+            result = self.run_fn(json.loads(job["payload"]), progress)
+            self.store.complete(job_id, result)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.fail(job_id, str(e))
+
+    def _maintain(self):
+        """Heartbeat running jobs, recover stale ones and prune old results"""
+        interval = max(1.0, self.stale_seconds / 3)
+        while not self._stopped.wait(interval):
+            try:
+                self.store.heartbeat(self.owner)
+                self.store.requeue_stale(self.stale_seconds, self.max_attempts)
+                self.store.prune(self.retention_seconds, self.max_finished)
+            except Exception as e:
+                print(f"Job maintenance error: {e}")
+
+def job_status(job: dict) -> dict:
+    """Public view of a stored job"""
+    status = {
+        "jobId": job["id"],
+        "status": job["status"],
+        "progress": {
+            "sentencesDone": job["sentences_done"],
+            "sentencesTotal": job["sentences_total"]
+        },
+        "attempts": job["attempts"],
+        "createdAt": job["created_at"],
+        "updatedAt": job["updated_at"]
+    }
+    if job["status"] == "completed":
+        status["result"] = json.loads(job["result"])
+    if job["status"] == "failed":
+        status["error"] = job["error"]
+    return status
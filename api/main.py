@@ -1,21 +1,62 @@
 import os
+import asyncio
 import functools
-import torch
-import re
-import nltk
-from typing import List
+import json
+import threading
+import time
+import concurrent.futures
+import contextlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, PegasusTokenizer, PegasusForConditionalGeneration
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, PrivateAttr, ValidationError, field_validator
+from scheduler import InferenceScheduler
+from executor import BoundedExecutor, InferenceQueueFull
+from backends import InferenceBackend, TransformersBackend, create_backend
+from cache import LRUCache, ParaphraseCache, normalize_text
+from cache_backends import create_cache_backend
+from registry import ModelRegistry, model_size, parse_model_sources
+from jobs import JobManager, JobQueueFull, JobStore, job_status
+from rewrite import RewriteEngine, RewriteRule
+from similarity import SCORERS, content_similarity
+from document import Document, as_document, find_spans, join_sentences, split_terminal
+from segmenter import sentence_spans
+from chunker import Chunk, pack_sentences, token_counter
+from tracing import span, start_trace
+from profiling import ProfilerBusy, capture as capture_profile, profile_generate
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS, counter, gauge, histogram
+from presets import DEFAULT_PRESET, PRESET_ORDER, PRESETS, TIER_PRESETS, preset_generation_kwargs, resolve_preset
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading the model at startup and release workers on shutdown"""
+    global _model_status, _scheduler, _executor, _job_manager
+    
+    if EAGER_MODEL_LOAD and NEURAL_MODE:
+        # Load in the background so /healthz answers while /readyz reports loading
+        _model_status = "loading"
+        threading.Thread(target=initialize_model, name="model-loader", daemon=True).start()
+    
+    # Resume jobs interrupted by the last restart
+    get_job_manager()
+    
+    yield
+    
+    if _scheduler is not None:
+        _scheduler.stop()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    if _shared_sentence_cache is not None:
+        _shared_sentence_cache.close()
+    if _job_manager is not None:
+        _job_manager.stop()
+    _model_registry.clear()
+    # A later startup in the same process (tests, embedding) builds fresh workers
+    _scheduler = _executor = _job_manager = None
 
-app = FastAPI(title="Notecraft Pro Humanizer API", version="1.0.0")
+app = FastAPI(title="Notecraft Pro Humanizer API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -31,43 +72,573 @@ class Payload(BaseModel):
     tone: str = "neutral"
     style: str = "professional"
     length: str = "maintain"
+    # Generation speed/quality preset ("fast", "balanced" or "quality"), capped by the account tier
+    preset: Optional[str] = None
+    tier: Optional[str] = None
+    # Time limit for model generation; unfinished sentences use the rule pipeline
+    deadline_ms: Optional[int] = None
+    # DEFAULT_MODEL_NAME (the default) or a MODEL_REGISTRY name
+    model: Optional[str] = None
+    
+    # Sentence and word spans of ``text``, built on first use and shared by every stage
+    _document: Optional[Document] = PrivateAttr(default=None)
+    
+    @property
+    def document(self) -> Document:
+        if self._document is None:
+            self._document = split_document(self.text)
+        return self._document
+    
+    @field_validator("preset")
+    @classmethod
+    def known_preset(cls, value):
+        if value is not None and value.lower() not in PRESETS:
+            raise ValueError(f"Unknown preset '{value}', expected one of {', '.join(PRESET_ORDER)}")
+        return value.lower() if value is not None else None
+    
+    @field_validator("model")
+    @classmethod
+    def known_model(cls, value):
+        if value is not None and value != DEFAULT_MODEL_NAME and value not in MODEL_SOURCES:
+            raise ValueError(f"Unknown model '{value}', expected one of {', '.join([DEFAULT_MODEL_NAME, *MODEL_SOURCES])}")
+        return value
 
-# Global variables to cache model
-_model_cache = None
-_tokenizer_cache = None
+class BatchPayload(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the whole batch
+    items: List[Any]
 
-def get_model():
-    """Load and cache the PEGASUS paraphraser model with error handling"""
-    global _model_cache, _tokenizer_cache
+# Default per-request time limit in milliseconds (0 = none); requests can set a
+# shorter one with the X-Deadline-Ms header or the deadline_ms field
+DEFAULT_DEADLINE_MS = int(os.getenv("HUMANIZE_DEADLINE_MS", "0"))
+
+# Maximum documents accepted by /humanize/batch
+BATCH_MAX_ITEMS = int(os.getenv("HUMANIZE_BATCH_MAX_ITEMS", "1000"))
+
+# Maximum number of sentences sent through model.generate in one padded batch
+MAX_BATCH_SIZE = int(os.getenv("HUMANIZE_MAX_BATCH_SIZE", "16"))
+
+# How long the scheduler waits for other requests' sentences before flushing a batch
+BATCH_WAIT_MS = float(os.getenv("HUMANIZE_BATCH_WAIT_MS", "10"))
+
+# Adjacent sentences are packed into chunks of up to this many tokens per
+# generate sequence (0 sends one sentence per sequence); capped to stay
+# under the 512-token encoder limit
+CHUNK_TOKEN_BUDGET = min(int(os.getenv("HUMANIZE_CHUNK_TOKENS", "128")), 480)
+
+# Concurrent humanization jobs, and how many more may wait before we return 503
+INFERENCE_WORKERS = int(os.getenv("HUMANIZE_WORKERS", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("HUMANIZE_QUEUE_DEPTH", "8"))
+RETRY_AFTER_SECONDS = int(os.getenv("HUMANIZE_RETRY_AFTER", "5"))
+
+# "neural" paraphrases with the model (torch and transformers are imported
+# when it first loads); "rules" only runs the rule-based pipeline and never
+# imports them
+HUMANIZE_MODE = os.getenv("HUMANIZE_MODE", "neural").lower()
+if HUMANIZE_MODE not in ("neural", "rules"):
+    print(f"Unknown HUMANIZE_MODE '{HUMANIZE_MODE}', using neural")
+    HUMANIZE_MODE = "neural"
+NEURAL_MODE = HUMANIZE_MODE == "neural"
+
+# Eager model loading and retry backoff after failed loads
+EAGER_MODEL_LOAD = os.getenv("EAGER_MODEL_LOAD", "true").lower() in ("1", "true", "yes")
+MODEL_RETRY_BASE_SECONDS = float(os.getenv("MODEL_RETRY_BASE_SECONDS", "30"))
+MODEL_RETRY_MAX_SECONDS = float(os.getenv("MODEL_RETRY_MAX_SECONDS", "900"))
+
+# Model precision: auto, float32, bfloat16 or int8 (dynamic quantization of Linear layers)
+MODEL_PRECISION = os.getenv("MODEL_PRECISION", "auto")
+PRECISION_SELF_CHECK = os.getenv("MODEL_PRECISION_SELF_CHECK", "true").lower() in ("1", "true", "yes")
+
+# Prebuilt snapshot from `python snapshot.py build`; loaded with mmap and no
+# network instead of downloading MODEL_REPO when the directory holds one
+MODEL_SNAPSHOT_DIR = os.getenv("MODEL_SNAPSHOT_DIR", "")
+
+# More models a request can pick with "model": comma-separated name=source
+# pairs, each source a Hugging Face repo or a snapshot directory. They load on
+# first use and the least recently used idle ones are evicted to keep every
+# loaded model, the always-loaded MODEL_REPO one included, within
+# MODEL_MEMORY_BUDGET_MB (0 = no limit)
+MODEL_SOURCES = parse_model_sources(os.getenv("MODEL_REGISTRY", ""))
+DEFAULT_MODEL_NAME = os.getenv("DEFAULT_MODEL_NAME", "default")
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Inference engine: "torch" (PyTorch) or "onnx" (ONNX Runtime on CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", "/tmp/model_cache/onnx")
+
+# Result caches: whole responses and per-sentence paraphrases
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "1000"))
+DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SENTENCE_CACHE_MAX_ENTRIES = int(os.getenv("SENTENCE_CACHE_MAX_ENTRIES", "20000"))
+SENTENCE_CACHE_MAX_BYTES = int(os.getenv("SENTENCE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+_document_cache = LRUCache(DOCUMENT_CACHE_MAX_ENTRIES, DOCUMENT_CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+
+# Shared sentence cache across workers and restarts: sqlite, redis or none
+SENTENCE_CACHE_BACKEND = os.getenv("SENTENCE_CACHE_BACKEND", "none")
+SENTENCE_CACHE_PATH = os.getenv("SENTENCE_CACHE_PATH", "/tmp/model_cache/paraphrases.sqlite")
+SENTENCE_CACHE_REDIS_URL = os.getenv("SENTENCE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+SENTENCE_CACHE_SHARED_TTL_SECONDS = float(os.getenv("SENTENCE_CACHE_SHARED_TTL_SECONDS", str(7 * 24 * 3600)))
+
+try:
+    _shared_sentence_cache = create_cache_backend(
+        SENTENCE_CACHE_BACKEND,
+        path=SENTENCE_CACHE_PATH,
+        url=SENTENCE_CACHE_REDIS_URL,
+        ttl_seconds=SENTENCE_CACHE_SHARED_TTL_SECONDS
+    )
+except Exception as e:
+    print(f"Shared sentence cache unavailable, using in-process cache only: {e}")
+    _shared_sentence_cache = None
+
+_sentence_cache = ParaphraseCache(
+    LRUCache(SENTENCE_CACHE_MAX_ENTRIES, SENTENCE_CACHE_MAX_BYTES, CACHE_TTL_SECONDS),
+    shared=_shared_sentence_cache
+)
+
+# Asynchronous jobs for long documents, persisted so they survive restarts
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "/tmp/model_cache/jobs.sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "10000"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+
+# Request tracing: X-Debug-Trace: 1 returns a Server-Timing header, and
+# /humanize requests slower than TRACE_SLOW_MS (0 = never) log their spans
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+
+# On-demand profiling at /admin/profile, enabled only when ADMIN_SECRET is set
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# Prometheus metrics, served at /metrics (per worker process)
+STAGE_SECONDS = histogram(
+    "humanize_stage_seconds", "Time spent in each humanization stage", ["stage"]
+)
+FALLBACKS = counter(
+    "humanize_fallbacks_total", "Documents (or parts of them) answered by the rule-based pipeline", ["reason"]
+)
+BATCH_SIZES = histogram(
+    "humanize_generate_batch_size", "Sequences per model.generate call", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+GENERATED_TOKENS = counter(
+    "humanize_generated_tokens_total", "Tokens produced by model.generate"
+)
+TOKENS_PER_SECOND = histogram(
+    "humanize_generate_tokens_per_second", "Generation throughput per generate call",
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+QUEUE_DEPTH = gauge(
+    "humanize_queue_depth", "Work waiting in each queue", ["queue"]
+)
+CACHE_HIT_RATIO = gauge(
+    "humanize_cache_hit_ratio", "Cache hits as a share of lookups since start", ["cache"]
+)
+MODEL_LOADS = counter(
+    "humanize_model_loads_total", "MODEL_REGISTRY models loaded", ["model"]
+)
+MODEL_EVICTIONS = counter(
+    "humanize_model_evictions_total", "MODEL_REGISTRY models evicted to stay within the memory budget", ["model"]
+)
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the stage histogram and the request's trace"""
+    with STAGE_SECONDS.time(stage=name), span(name):
+        yield
+
+def hit_ratio(cache) -> float:
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return stats["hits"] / lookups if lookups else 0.0
+
+CACHE_HIT_RATIO.set_function(lambda: hit_ratio(_document_cache), cache="document")
+CACHE_HIT_RATIO.set_function(lambda: hit_ratio(_sentence_cache), cache="sentence")
+# Queues that do not exist yet report nothing until first use
+QUEUE_DEPTH.set_function(lambda: _scheduler.queue_depth() if _scheduler is not None else None, queue="scheduler")
+QUEUE_DEPTH.set_function(lambda: _executor.pending() if _executor is not None else None, queue="executor")
+QUEUE_DEPTH.set_function(lambda: _job_manager.store.count_queued() if _job_manager is not None else None, queue="jobs")
+
+# Order-aware part of the quality similarity score: "difflib" (quadratic) or "shingle" (linear).
+# The validation thresholds are calibrated on difflib; shingle scores paraphrases lower
+SIMILARITY_SCORER = os.getenv("SIMILARITY_SCORER", "difflib").lower()
+if SIMILARITY_SCORER not in SCORERS:
+    print(f"Unknown SIMILARITY_SCORER '{SIMILARITY_SCORER}', using difflib")
+    SIMILARITY_SCORER = "difflib"
+
+# Sentence splitting: "native" (segmenter.py) or "nltk" (punkt, downloaded on first use)
+SENTENCE_SEGMENTER = os.getenv("SENTENCE_SEGMENTER", "native").lower()
+if SENTENCE_SEGMENTER not in ("native", "nltk"):
+    print(f"Unknown SENTENCE_SEGMENTER '{SENTENCE_SEGMENTER}', using native")
+    SENTENCE_SEGMENTER = "native"
+
+# Global variable to cache the loaded model behind its inference backend
+_backend_cache = None
+
+# Model load state: "not_loaded", "loading", "ready", "failed" or "disabled" (rules mode)
+_model_status = "not_loaded" if NEURAL_MODE else "disabled"
+_model_error = None
+_model_load_failures = 0
+_model_retry_at = None
+_model_precision = None
+_model_snapshot = None
+_model_startup = None
+_model_lock = threading.Lock()
+
+def model_repo() -> str:
+    """Name of the loaded model: the snapshot's source repo, else MODEL_REPO"""
+    if _model_snapshot is not None:
+        return _model_snapshot["repo"]
+    return os.getenv("MODEL_REPO", "Vamsi/T5_Paraphrase_Paws")
+
+def load_model_snapshot():
+    """Load the MODEL_SNAPSHOT_DIR snapshot, already in its precision"""
+    global _model_snapshot
+    from snapshot import load_snapshot
     
-    if _model_cache is not None and _tokenizer_cache is not None:
-        return _tokenizer_cache, _model_cache
+    # ONNX export needs the float weights, so leave int8 snapshots unquantized
+    tokenizer, model, manifest, timings = load_snapshot(MODEL_SNAPSHOT_DIR, quantize=INFERENCE_BACKEND != "onnx")
+    _model_snapshot = manifest
+    print(f"Model snapshot {MODEL_SNAPSHOT_DIR} ({manifest['repo']}, {manifest['precision']}) loaded in {timings['total']:.2f}s")
+    return tokenizer, model
+
+def load_model():
+    """Load the T5 paraphraser tokenizer and model, raising on failure"""
+    from snapshot import is_snapshot
     
-    try:
-        # Use T5 paraphraser model for better content preservation
-        repo = os.getenv("MODEL_REPO", "Vamsi/T5_Paraphrase_Paws")
-        print(f"Loading T5 paraphraser model: {repo}")
-        
-        # Load T5 tokenizer and model
-        _tokenizer_cache = AutoTokenizer.from_pretrained(
-            repo,
-            cache_dir="/tmp/model_cache"
-        )
+    if is_snapshot(MODEL_SNAPSHOT_DIR):
+        return load_model_snapshot()
+    if MODEL_SNAPSHOT_DIR:
+        print(f"No model snapshot in {MODEL_SNAPSHOT_DIR}, loading MODEL_REPO")
+    
+    # Use T5 paraphraser model for better content preservation
+    return load_pretrained(os.getenv("MODEL_REPO", "Vamsi/T5_Paraphrase_Paws"))
+
+def load_pretrained(repo: str):
+    """Load a seq2seq tokenizer and float32 model from a Hugging Face repo or directory"""
+    # Imported here so the rule path and startup don't pay for torch
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    
+    print(f"Loading T5 paraphraser model: {repo}")
+    
+    # Load T5 tokenizer and model
+    tokenizer = AutoTokenizer.from_pretrained(
+        repo,
+        cache_dir="/tmp/model_cache"
+    )
+    
+    # Load in float32; float16 is slow or unsupported for many ops on CPU
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        repo,
+        torch_dtype=torch.float32,
+        low_cpu_mem_usage=True,
+        cache_dir="/tmp/model_cache"
+    )
+    model.eval()
+    
+    print(f"T5 paraphraser model {repo} loaded successfully")
+    return tokenizer, model
+
+def wrap_model(tokenizer, model, snapshot: dict = None, export_dir: str = ONNX_EXPORT_DIR) -> Tuple[InferenceBackend, str]:
+    """Wrap a loaded model in the configured INFERENCE_BACKEND; returns (backend, precision)"""
+    if INFERENCE_BACKEND == "onnx":
+        return create_backend("onnx", tokenizer, model.float(), export_dir=export_dir), "float32"
+    
+    if snapshot is not None:
+        # The precision was chosen when the snapshot was built, possibly on another CPU
+        from precision import bf16_supported
         
-        _model_cache = AutoModelForSeq2SeqLM.from_pretrained(
-            repo,
-            torch_dtype=torch.float16,  # Use float16 to reduce memory
-            low_cpu_mem_usage=True,
-            cache_dir="/tmp/model_cache"
-        )
+        precision = snapshot["precision"]
+        if precision == "bfloat16" and not bf16_supported():
+            print("Snapshot is bfloat16 but this CPU has no native bfloat16 support, using float32")
+            model, precision = model.float(), "float32"
+        print(f"Model precision: {precision} (from snapshot)")
+        return create_backend(INFERENCE_BACKEND, tokenizer, model), precision
+    
+    # Convert to the configured precision, falling back if it is slower or broken
+    from precision import select_precision
+    
+    model, precision, report = select_precision(tokenizer, model, MODEL_PRECISION, self_check=PRECISION_SELF_CHECK)
+    print(f"Model precision: {precision} ({report})")
+    return create_backend(INFERENCE_BACKEND, tokenizer, model), precision
+
+def create_model_backend(tokenizer, model) -> InferenceBackend:
+    """Wrap the loaded MODEL_REPO model and record its precision"""
+    global _model_precision
+    
+    backend, _model_precision = wrap_model(tokenizer, model, _model_snapshot)
+    return backend
+
+def warmup_model(backend: InferenceBackend):
+    """Run one short generate so the first real request doesn't pay for lazy init"""
+    humanize_batch(["This is a short warmup sentence."], backend, max_length=32)
+    print(f"Model warmup complete ({backend.name} backend)")
+
+def load_backend(warmup: bool = True) -> InferenceBackend:
+    """Load the model into its backend, recording how long each step took"""
+    global _model_startup
+    
+    timings = {}
+    started = time.perf_counter()
+    tokenizer, model = load_model()
+    timings["loadSeconds"] = time.perf_counter() - started
+    
+    mark = time.perf_counter()
+    backend = create_model_backend(tokenizer, model)
+    timings["backendSeconds"] = time.perf_counter() - mark
+    
+    if warmup:
+        mark = time.perf_counter()
+        warmup_model(backend)
+        timings["warmupSeconds"] = time.perf_counter() - mark
+    timings["totalSeconds"] = time.perf_counter() - started
+    
+    _model_startup = {
+        "source": "snapshot" if _model_snapshot is not None else "repo",
+        **{name: round(seconds, 3) for name, seconds in timings.items()},
+    }
+    print(f"Model startup: {json.dumps(_model_startup)}")
+    return backend
+
+def initialize_model() -> bool:
+    """Load, warm up and cache the model once; remember failures and schedule retries"""
+    global _backend_cache, _model_status, _model_error, _model_load_failures, _model_retry_at
+    
+    with _model_lock:
+        if _model_status == "ready":
+            return True
+        _model_status = "loading"
         
-        print(f"T5 paraphraser model {repo} loaded successfully")
-        return _tokenizer_cache, _model_cache
+        try:
+            backend = load_backend()
+        except Exception as e:
+            print(f"Error loading T5 model: {e}")
+            # Remember the failure so requests don't retry the expensive load themselves
+            _model_load_failures += 1
+            _model_error = str(e)
+            _model_status = "failed"
+            delay = min(MODEL_RETRY_BASE_SECONDS * 2 ** (_model_load_failures - 1), MODEL_RETRY_MAX_SECONDS)
+            _model_retry_at = time.time() + delay
+            print(f"Retrying model load in {delay:.0f}s (attempt {_model_load_failures + 1})")
+            retry = threading.Timer(delay, initialize_model)
+            retry.daemon = True
+            retry.start()
+            return False
         
-    except Exception as e:
-        print(f"Error loading T5 model: {e}")
-        # Return None to indicate model loading failed
+        _backend_cache = backend
+        _model_status = "ready"
+        _model_error = None
+        _model_retry_at = None
+        return True
+
+def get_backend():
+    """Return the cached inference backend, or None while loading or after a failed load"""
+    if _backend_cache is not None:
+        return _backend_cache
+    
+    # Failed loads are retried in the background with backoff, and an eager
+    # load in progress shouldn't block requests; both use the rule-based fallback,
+    # as does rules mode
+    if _model_status in ("loading", "failed", "disabled"):
+        return None
+    
+    # Lazy load when eager loading is disabled
+    initialize_model()
+    return _backend_cache
+
+def get_model():
+    """Return the cached (tokenizer, model), or (None, None) if unavailable"""
+    backend = get_backend()
+    if backend is None:
         return None, None
+    return backend.tokenizer, backend.model
+
+# Shared cross-request batching scheduler for the cached model
+_scheduler = None
+
+def get_scheduler():
+    """Return the inference scheduler for the cached model, or None if unavailable"""
+    global _scheduler
+    
+    if _scheduler is not None:
+        return _scheduler
+    
+    backend = get_backend()
+    if backend is None:
+        return None
+    
+    _scheduler = InferenceScheduler(
+        lambda requests: humanize_preset_batch(requests, backend),
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=BATCH_WAIT_MS
+    )
+    return _scheduler
+
+# Bounded pool that runs blocking inference off the event loop
+_executor = None
+
+def get_executor() -> BoundedExecutor:
+    """Return the shared inference executor"""
+    global _executor
+    
+    if _executor is None:
+        _executor = BoundedExecutor(max_workers=INFERENCE_WORKERS, max_queue=INFERENCE_QUEUE_DEPTH)
+    return _executor
+
+class RegisteredModel(NamedTuple):
+    """A MODEL_REGISTRY model loaded with its own batching scheduler"""
+    backend: InferenceBackend
+    scheduler: InferenceScheduler
+    repo: str
+    precision: str
+
+# Precision each registered model last loaded with, kept across evictions so
+# cache keys stay stable while the model is not loaded
+_registered_precisions = {}
+
+def load_registered_model(name: str) -> RegisteredModel:
+    """Load, wrap and warm up the MODEL_REGISTRY model ``name``"""
+    from snapshot import is_snapshot, load_snapshot
+    
+    source = MODEL_SOURCES[name]
+    snapshot = None
+    if is_snapshot(source):
+        tokenizer, model, snapshot, _ = load_snapshot(source, quantize=INFERENCE_BACKEND != "onnx")
+    else:
+        tokenizer, model = load_pretrained(source)
+    backend, precision = wrap_model(tokenizer, model, snapshot, export_dir=os.path.join(ONNX_EXPORT_DIR, name))
+    warmup_model(backend)
+    
+    _registered_precisions[name] = precision
+    MODEL_LOADS.inc(model=name)
+    scheduler = InferenceScheduler(
+        lambda requests: humanize_preset_batch(requests, backend),
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=BATCH_WAIT_MS
+    )
+    return RegisteredModel(backend, scheduler, snapshot["repo"] if snapshot else source, precision)
+
+def estimate_registered_model(name: str) -> int:
+    """Weight bytes of a source before loading it: a snapshot's manifest, else its config"""
+    from snapshot import is_snapshot, read_manifest
+    
+    source = MODEL_SOURCES[name]
+    if is_snapshot(source):
+        files = read_manifest(source)["files"]
+        return sum(size for file_name, size in files.items() if file_name.endswith(".safetensors"))
+    
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+    
+    # Only config.json is fetched; modules built on the meta device have shapes but no storage.
+    # Repos load in float32 before any conversion, so that's the size to make room for
+    config = AutoConfig.from_pretrained(source, cache_dir="/tmp/model_cache")
+    with torch.device("meta"):
+        model = AutoModelForSeq2SeqLM.from_config(config)
+    return sum(tensor.numel() * tensor.element_size() for tensor in [*model.parameters(), *model.buffers()])
+
+def evict_registered_model(name: str, registered: RegisteredModel):
+    MODEL_EVICTIONS.inc(model=name)
+    registered.scheduler.stop()
+
+def default_model_bytes() -> int:
+    """Memory held by the always-loaded MODEL_REPO model"""
+    backend = _backend_cache
+    return model_size(backend.model) if backend is not None else 0
+
+_model_registry = ModelRegistry(
+    load_registered_model,
+    budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 2 ** 20),
+    estimate_fn=estimate_registered_model,
+    reserved=default_model_bytes,
+    on_evict=evict_registered_model
+)
+
+def is_default_model(name: Optional[str]) -> bool:
+    return name is None or name == DEFAULT_MODEL_NAME
+
+@contextlib.contextmanager
+def serving_model(name: Optional[str] = None):
+    """(backend, scheduler) for a request's model; backend is None while the default is unavailable.
+
+    Registered models load on first use (one load however many requests
+    ask) and stay leased, so they can't be evicted, until the block exits.
+    """
+    if is_default_model(name):
+        yield get_backend(), get_scheduler()
+        return
+    with _model_registry.lease(name) as registered:
+        yield registered.backend, registered.scheduler
+
+def current_model_key(name: Optional[str] = None) -> str:
+    """Identify the model, engine and precision that produce cached outputs"""
+    if is_default_model(name):
+        return f"{model_repo()}:{INFERENCE_BACKEND}:{_model_precision}"
+    return f"{name}={MODEL_SOURCES[name]}:{INFERENCE_BACKEND}:{_registered_precisions.get(name)}"
+
+def payload_preset(payload: Payload) -> str:
+    """Generation preset for a request, after applying its tier's cap"""
+    return resolve_preset(payload.preset, payload.tier)
+
+def document_cache_key(payload: Payload) -> tuple:
+    """Cache key for a whole /humanize response"""
+    return (normalize_text(payload.text), payload.tone, payload.style, payload.length, current_model_key(payload.model), payload_preset(payload))
+
+def get_cached_response(payload: Payload, deadline: float = None):
+    """Return a cached response for this document and settings, or None.
+
+    With a deadline the response reports ``degradedSentences`` like a
+    generated one; nothing is degraded when it comes from the cache.
+    """
+    if not CACHE_ENABLED:
+        return None
+    cached = _document_cache.get(document_cache_key(payload))
+    if cached is None:
+        return None
+    response = {**cached, "originalText": payload.text, "cached": True}
+    if deadline is not None:
+        response["degradedSentences"] = []
+    return response
+
+def store_cached_response(payload: Payload, result: dict):
+    """Cache a response unless it came from a transient fallback"""
+    # Responses with a note came from a transient fallback (model unavailable or an error)
+    if CACHE_ENABLED and "note" not in result:
+        # Whether a deadline applied belongs to the request, not to the cached document
+        _document_cache.set(document_cache_key(payload),
+                            {key: value for key, value in result.items() if key != "degradedSentences"})
+
+def server_busy() -> HTTPException:
+    """503 returned when the inference queue is full"""
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+# Job worker pool, started on first use or at startup
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Return the started job manager"""
+    global _job_manager
+    
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                JobStore(JOB_STORE_PATH),
+                run_job,
+                workers=JOB_WORKERS,
+                max_queued=JOB_MAX_QUEUED,
+                retention_seconds=JOB_RETENTION_SECONDS,
+                max_finished=JOB_MAX_FINISHED,
+                stale_seconds=JOB_STALE_SECONDS
+            )
+            _job_manager.start()
+    return _job_manager
 
 def verify(req: Request):
     """Verify API authentication"""
@@ -80,144 +651,426 @@ def verify(req: Request):
     if not auth_header or auth_header != f"Bearer {api_secret}":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+@functools.lru_cache(maxsize=1)
+def sentence_tokenizer() -> Callable[[str], List[str]]:
+    """NLTK's sent_tokenize, imported and its punkt data fetched on first use"""
+    import nltk
+    for resource in ('punkt', 'punkt_tab'):
+        try:
+            nltk.data.find(f'tokenizers/{resource}')
+        except LookupError:
+            # Without network this fails quietly and sent_tokenize raises below
+            nltk.download(resource, quiet=True)
+    return nltk.sent_tokenize
+
+@stage("split")
+def split_document(text: str) -> Document:
+    """Split text into a Document of sentence spans with SENTENCE_SEGMENTER"""
+    if SENTENCE_SEGMENTER == "nltk":
+        try:
+            sentences = [s.strip() for s in sentence_tokenizer()(text) if s.strip()]
+            return Document(text, spans=find_spans(text, sentences))
+        except Exception as e:
+            print(f"Error splitting sentences with NLTK: {e}")
+    # Segmented here rather than lazily so the split stage times it
+    return Document(text, spans=sentence_spans(text))
+
 def split_into_sentences(text: str) -> List[str]:
-    """Split text into sentences using NLTK"""
-    try:
-        sentences = nltk.sent_tokenize(text)
-        return [s.strip() for s in sentences if s.strip()]
-    except Exception as e:
-        print(f"Error splitting sentences: {e}")
-        # Fallback to simple split
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() + '.' if s.strip() and not s.strip().endswith(('.', '!', '?')) else s.strip() 
-                for s in sentences if s.strip()]
+    """Split text into sentences with SENTENCE_SEGMENTER"""
+    return split_document(text).sentences
 
 def humanize_with_t5(text: str, tokenizer, model, max_length: int = 512) -> str:
     """Use T5 model to paraphrase/humanize text"""
-    try:
-        # T5 needs a task prefix for paraphrasing
-        task_prompt = f"paraphrase: {text}"
-        inputs = tokenizer(
-            task_prompt,
-            return_tensors="pt",
-            max_length=max_length,
-            truncation=True,
-            padding=True
-        )
+    return humanize_batch([text], TransformersBackend(tokenizer, model), max_length=max_length)[0]
+
+def generation_kwargs(batch: List[str], max_length: int = 512, preset: str = DEFAULT_PRESET) -> dict:
+    """Generation settings for a batch of sentences under a speed/quality preset"""
+    return preset_generation_kwargs(preset, batch, max_length)
+
+def humanize_batch(texts: List[str], backend: InferenceBackend, max_length: int = 512,
+                   batch_size: int = MAX_BATCH_SIZE, progress: Callable[[List[str]], None] = None,
+                   preset: str = DEFAULT_PRESET, deadline: float = None) -> List[Optional[str]]:
+    """Paraphrase several texts with padded, batched generate calls on a backend.
+
+    Returns one output per input, in the same order as ``texts``. Texts
+    whose batch fails are returned unchanged. ``progress`` is called with the
+    texts finished in each batch. Once ``deadline`` (a
+    time.monotonic() value) passes, no further batches start and their texts
+    are returned as None.
+    """
+    results = list(texts)
+    
+    # Group similar lengths together so each batch pads as little as possible,
+    # and remember each text's original index to map outputs back
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    
+    for start in range(0, len(order), max(1, batch_size)):
+        batch_indices = order[start:start + max(1, batch_size)]
+        batch = [texts[i] for i in batch_indices]
         
-        # Generate paraphrase
-        with torch.no_grad():
-            outputs = model.generate(
-                inputs.input_ids,
-                attention_mask=inputs.attention_mask,
-                max_length=max_length,
-                min_length=int(len(text.split()) * 0.8),  # At least 80% of original length
-                num_beams=4,
-                early_stopping=True,
-                do_sample=True,
-                temperature=0.7,
-                top_p=0.9,
-                repetition_penalty=1.1,
-                length_penalty=1.0
-            )
+        if deadline is not None and time.monotonic() >= deadline:
+            for index in order[start:]:
+                results[index] = None
+            break
         
-        # Decode the output
-        humanized = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        return humanized.strip()
+        try:
+            # T5 needs a task prefix for paraphrasing
+            with stage("tokenize"):
+                inputs = backend.encode([f"paraphrase: {text}" for text in batch], max_length=max_length)
+            
+            # Generate paraphrases for the whole batch
+            BATCH_SIZES.observe(len(batch))
+            generate_started = time.perf_counter()
+            with span("generate"), profile_generate():
+                outputs = backend.generate(inputs, **generation_kwargs(batch, max_length, preset))
+            generate_seconds = time.perf_counter() - generate_started
+            STAGE_SECONDS.observe(generate_seconds, stage="generate")
+            record_generated_tokens(backend, outputs, generate_seconds)
+            
+            # Decode the outputs back onto their original positions
+            with stage("decode"):
+                decoded = backend.decode(outputs)
+            for index, humanized in zip(batch_indices, decoded):
+                results[index] = humanized
+                
+        except Exception as e:
+            print(f"T5 batch humanization error: {e}")
+            # Keep original texts for this batch if humanization fails
         
-    except Exception as e:
-        print(f"T5 humanization error: {e}")
-        return text  # Return original text if humanization fails
+        if progress is not None:
+            progress(batch)
+    
+    return results
+
+def record_generated_tokens(backend: InferenceBackend, outputs, seconds: float):
+    """Count generated (non-padding) tokens and the batch's tokens per second"""
+    try:
+        pad_token_id = backend.tokenizer.pad_token_id
+        tokens = int((outputs != pad_token_id).sum()) if pad_token_id is not None else int(outputs.numel())
+    except Exception:
+        # Backends without tensor outputs only report batch sizes and timings
+        return
+    GENERATED_TOKENS.inc(tokens)
+    if seconds > 0:
+        TOKENS_PER_SECOND.observe(tokens / seconds)
+
+def humanize_preset_batch(requests: List[Tuple[str, str]], backend: InferenceBackend) -> List[str]:
+    """Generate for (text, preset) pairs collected by the scheduler, one batch per preset"""
+    results = [text for text, _ in requests]
+    by_preset = {}
+    for index, (_, preset) in enumerate(requests):
+        by_preset.setdefault(preset, []).append(index)
+    
+    for preset, indices in by_preset.items():
+        outputs = humanize_batch([requests[i][0] for i in indices], backend, preset=preset)
+        for index, output in zip(indices, outputs):
+            results[index] = output
+    return results
+
+def wait_for_outputs(futures: List[concurrent.futures.Future], deadline: float = None) -> List[Optional[str]]:
+    """Collect scheduler results, giving up on those not finished by the deadline.
+
+    Unfinished futures are cancelled (the scheduler skips them if they are
+    still queued) and come back as None.
+    """
+    if deadline is None:
+        return [future.result() for future in futures]
+    
+    concurrent.futures.wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    outputs = []
+    for future in futures:
+        if future.done() and not future.cancelled():
+            outputs.append(future.result())
+        else:
+            future.cancel()
+            outputs.append(None)
+    return outputs
+
+def deadline_passed(deadline: float = None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+def check_sentence_output(sentence: str, humanized: str, index: int) -> str:
+    """Quality check: keep the original sentence if the paraphrase is far too short or long"""
+    if len(humanized.split()) < len(sentence.split()) * 0.5:
+        # If humanized sentence is too short, use original
+        print(f"Warning: Humanized sentence {index+1} too short, using original")
+        return sentence
+    if len(humanized.split()) > len(sentence.split()) * 2:
+        # If humanized sentence is too long, use original
+        print(f"Warning: Humanized sentence {index+1} too long, using original")
+        return sentence
+    return humanized
+
+def chunk_sentences(document: Document, backend: InferenceBackend) -> List[Chunk]:
+    """Pack a document's adjacent sentences into chunks that fit CHUNK_TOKEN_BUDGET.
+
+    Sentences longer than the budget are split at clause or word breaks
+    rather than truncated by the encoder, and chunks stop at line and
+    paragraph breaks. Each chunk records the sentence indices it covers.
+    """
+    return pack_sentences(document.sentences, token_counter(backend.tokenizer), CHUNK_TOKEN_BUDGET,
+                          breaks=document.line_starts)
+
+def is_eligible_sentence(sentence: str) -> bool:
+    """Very short sentences are kept as they are"""
+    return len(sentence.strip()) >= 10
 
-def sentence_by_sentence_humanization(text: str, tokenizer, model, tone: str = "neutral", style: str = "professional") -> str:
-    """Humanize text sentence by sentence to preserve content structure"""
+def paraphrase_sentences(sentences: List[str], backend: InferenceBackend,
+                         scheduler: InferenceScheduler = None, cache: ParaphraseCache = None,
+                         progress: Callable[[List[str]], None] = None, preset: str = DEFAULT_PRESET,
+                         deadline: float = None, model: str = None) -> Dict[str, str]:
+    """Paraphrase unique sentences, from the cache where possible and in batches otherwise.
+
+    Returns a mapping from each sentence to its raw model output.
+    ``progress`` is called with unique sentences as they finish. Sentences
+    not generated before ``deadline`` are left out of the mapping. ``model``
+    names the registered model behind ``backend`` for the cache key.
+    """
+    unique = list(dict.fromkeys(sentences))
     
-    # Split into sentences
-    sentences = split_into_sentences(text)
-    print(f"Processing {len(sentences)} sentences")
+    paraphrases = {}
+    if cache is not None:
+        model_key = f"{current_model_key(model)}:{preset}"
+        with span("sentence_cache"):
+            paraphrases = cache.get_many(unique, model_key)
+        print(f"Sentence cache hits: {len(paraphrases)}/{len(unique)}")
     
-    humanized_sentences = []
+    missing = [sentence for sentence in unique if sentence not in paraphrases]
     
-    for i, sentence in enumerate(sentences):
-        if len(sentence.strip()) < 10:  # Skip very short sentences
-            humanized_sentences.append(sentence)
+    def finished(sentences: List[str]):
+        if progress is not None:
+            progress(sentences)
+    
+    # Cached sentences count as done straight away
+    finished(list(paraphrases))
+    
+    if not missing:
+        generated = []
+    elif deadline_passed(deadline):
+        print("Deadline passed before generation, skipping the model")
+        generated = [None] * len(missing)
+    elif scheduler is not None:
+        futures = scheduler.submit([(sentence, preset) for sentence in missing])
+        for sentence, future in zip(missing, futures):
+            future.add_done_callback(lambda _, sentence=sentence: finished([sentence]))
+        # Batches mix requests, so a trace sees queueing plus generation as one span
+        with span("scheduler"):
+            generated = wait_for_outputs(futures, deadline)
+    else:
+        generated = humanize_batch(missing, backend, progress=finished, preset=preset, deadline=deadline)
+    
+    new_paraphrases = {}
+    for sentence, humanized in zip(missing, generated):
+        if humanized is None:
             continue
-            
-        print(f"Humanizing sentence {i+1}: {sentence[:50]}...")
-        
-        # Humanize individual sentence
-        humanized = humanize_with_t5(sentence, tokenizer, model)
-        
-        # Quality check: ensure the humanized sentence makes sense
-        if len(humanized.split()) < len(sentence.split()) * 0.5:
-            # If humanized sentence is too short, use original
-            print(f"Warning: Humanized sentence too short, using original")
-            humanized_sentences.append(sentence)
-        elif len(humanized.split()) > len(sentence.split()) * 2:
-            # If humanized sentence is too long, use original
-            print(f"Warning: Humanized sentence too long, using original")
-            humanized_sentences.append(sentence)
+        paraphrases[sentence] = humanized
+        # Unchanged output means generation failed, so don't pin it in the cache
+        if humanized != sentence:
+            new_paraphrases[sentence] = humanized
+    
+    if cache is not None:
+        cache.set_many(new_paraphrases, model_key)
+    
+    return paraphrases
+
+def assemble_humanized_text(document: Document, chunks: List[Chunk], paraphrases: Dict[str, str],
+                            tone: str, style: str) -> str:
+    """Rebuild a document from its chunks' paraphrases and apply style adjustments.
+
+    Eligible chunks without a paraphrase (the deadline ran out before they
+    were generated) go through the rule-based pipeline instead.
+    """
+    humanized_chunks = []
+    
+    for i, chunk in enumerate(chunks):
+        if not is_eligible_sentence(chunk.text):
+            humanized_chunks.append(chunk.text)
+        elif chunk.text in paraphrases:
+            humanized_chunks.append(check_sentence_output(chunk.text, paraphrases[chunk.text], i))
         else:
-            humanized_sentences.append(humanized)
+            humanized_chunks.append(advanced_humanization_pipeline(chunk.text, tone, style))
     
-    # Reconstruct the text maintaining paragraph structure
-    result = ' '.join(humanized_sentences)
+    # Reconstruct the text with the original paragraph and line breaks
+    result = document.join(humanized_chunks, [chunk.last for chunk in chunks])
     
     # Apply light style adjustments based on tone and style
-    result = apply_style_adjustments(result, tone, style)
+    return apply_style_adjustments(result, tone, style)
+
+def degraded_sentences(chunks: List[Chunk], paraphrases: Dict[str, str]) -> List[int]:
+    """Indices of the original sentences whose chunks fell back to the rule pipeline"""
+    degraded = set()
+    for chunk in chunks:
+        if is_eligible_sentence(chunk.text) and chunk.text not in paraphrases:
+            degraded.update(range(chunk.first, chunk.last + 1))
+    return sorted(degraded)
+
+def chunk_progress(chunks: List[Chunk], sentence_count: int,
+                   progress: Callable[[int, int], None]) -> Callable[[List[str]], None]:
+    """Turn finished chunk texts into ``progress(done, total)`` over a document's sentences.
+
+    A sentence is done once every eligible chunk holding it has finished;
+    sentences only in chunks too short to paraphrase are done from the start.
+    """
+    pending = [0] * sentence_count
+    chunks_by_text = {}
+    for chunk in chunks:
+        if is_eligible_sentence(chunk.text):
+            chunks_by_text.setdefault(chunk.text, []).append(chunk)
+            for index in range(chunk.first, chunk.last + 1):
+                pending[index] += 1
     
-    return result
+    done = [pending.count(0)]
+    lock = threading.Lock()
+    
+    def finished(texts: List[str]):
+        with lock:
+            # Repeated chunk texts are paraphrased once, so one finish covers them all
+            for text in texts:
+                for chunk in chunks_by_text.pop(text, []):
+                    for index in range(chunk.first, chunk.last + 1):
+                        pending[index] -= 1
+                        if pending[index] == 0:
+                            done[0] += 1
+            progress(done[0], sentence_count)
+    
+    return finished
 
-def apply_style_adjustments(text: str, tone: str, style: str) -> str:
-    """Apply light style adjustments without destroying content"""
+def chunked_humanization(text: Union[str, Document], backend: InferenceBackend, tone: str = "neutral", style: str = "professional",
+                         scheduler: InferenceScheduler = None, cache: ParaphraseCache = None,
+                         progress: Callable[[int, int], None] = None, preset: str = DEFAULT_PRESET,
+                         deadline: float = None, model: str = None) -> Tuple[str, List[int], int]:
+    """Humanize text chunk by chunk, within an optional deadline.
+
+    ``progress(done, total)`` counts the document's sentences, not its chunks.
+    Returns (humanized_text, degraded_sentence_indices, sentence_count).
+    """
     
-    # Light contractions for casual tone
-    if tone == "friendly" or style == "casual":
-        text = re.sub(r'\bdo not\b', "don't", text)
-        text = re.sub(r'\bcannot\b', "can't", text)
-        text = re.sub(r'\bwill not\b', "won't", text)
-        text = re.sub(r'\bit is\b', "it's", text)
-        text = re.sub(r'\bthat is\b', "that's", text)
+    # Split into sentences and pack neighbours into token-budgeted chunks
+    document = text if isinstance(text, Document) else split_document(text)
+    chunks = chunk_sentences(document, backend)
+    print(f"Processing {len(document.spans)} sentences in {len(chunks)} chunks")
+    
+    # Skip very short chunks, humanize the rest in batches
+    eligible = [chunk.text for chunk in chunks if is_eligible_sentence(chunk.text)]
+    print(f"Humanizing {len(eligible)} chunks in batches of up to {MAX_BATCH_SIZE}")
+    
+    if progress is not None:
+        progress = chunk_progress(chunks, len(document.spans), progress)
     
+    paraphrases = paraphrase_sentences(eligible, backend, scheduler=scheduler, cache=cache, progress=progress,
+                                       preset=preset, deadline=deadline, model=model)
+    humanized_text = assemble_humanized_text(document, chunks, paraphrases, tone, style)
+    return humanized_text, degraded_sentences(chunks, paraphrases), len(document.spans)
+
+def sentence_by_sentence_humanization(text: str, backend: InferenceBackend, tone: str = "neutral", style: str = "professional",
+                                      scheduler: InferenceScheduler = None, cache: ParaphraseCache = None,
+                                      progress: Callable[[int, int], None] = None, preset: str = DEFAULT_PRESET) -> str:
+    """Humanize text sentence by sentence to preserve content structure.
+
+    Adjacent sentences are packed into chunks of up to CHUNK_TOKEN_BUDGET
+    tokens so each generate sequence carries more text.
+
+    When a scheduler is given, sentences are batched together with those of
+    other in-flight requests instead of in a per-document batch. When a cache
+    is given, previously paraphrased sentences skip the model.
+    """
+    humanized_text, _, _ = chunked_humanization(
+        text, backend, tone, style, scheduler=scheduler, cache=cache, progress=progress, preset=preset
+    )
+    return humanized_text
+
+# Rule tables for the rule-based pipeline, compiled once into single-scan engines
+STYLE_REWRITES = RewriteEngine([
+    # Light contractions for casual tone
+    RewriteRule("do not", "don't", group="casual"),
+    RewriteRule("cannot", "can't", group="casual"),
+    RewriteRule("will not", "won't", group="casual"),
+    RewriteRule("it is", "it's", group="casual"),
+    RewriteRule("that is", "that's", group="casual"),
     # Professional adjustments
+    RewriteRule("gonna", "going to", group="professional"),
+    RewriteRule("wanna", "want to", group="professional"),
+])
+
+# Strategic contractions (70% per rule) and vocabulary swaps (40% per word, first use only)
+CONTRACTIONS = [
+    ("I am", "I'm"),
+    ("you are", "you're"),
+    ("we are", "we're"),
+    ("they are", "they're"),
+    ("it is", "it's"),
+    ("that is", "that's"),
+    ("do not", "don't"),
+    ("does not", "doesn't"),
+    ("will not", "won't"),
+    ("cannot", "can't"),
+    ("should not", "shouldn't"),
+    ("would not", "wouldn't"),
+]
+
+WORD_REPLACEMENTS = {
+    "very": ["quite", "rather", "fairly", "extremely"],
+    "good": ["excellent", "great", "solid", "effective"],
+    "bad": ["poor", "problematic", "concerning", "inadequate"],
+    "big": ["large", "significant", "substantial", "considerable"],
+    "small": ["minor", "limited", "modest", "compact"],
+    "important": ["crucial", "vital", "significant", "key"],
+    "many": ["numerous", "several", "multiple", "various"],
+}
+
+LEXICAL_REWRITES = RewriteEngine(
+    [RewriteRule(formal, informal, ignore_case=True, probability=0.7) for formal, informal in CONTRACTIONS] +
+    [RewriteRule(term, synonyms, ignore_case=True, probability=0.4, count=1)
+     for term, synonyms in WORD_REPLACEMENTS.items()]
+)
+
+# Tone/style flow improvements and formal transitions, as plain substring replacements
+FLOW_REWRITES = RewriteEngine([
+    RewriteRule("Additionally", "Plus", whole_word=False, group="friendly"),
+    RewriteRule("Furthermore", "Also", whole_word=False, group="friendly"),
+    RewriteRule("Therefore", "So", whole_word=False, group="friendly"),
+    RewriteRule("utilize", "use", whole_word=False, group="casual"),
+    RewriteRule("demonstrate", "show", whole_word=False, group="casual"),
+    RewriteRule("indicate", "suggest", whole_word=False, group="casual"),
+    RewriteRule("In conclusion,", "Overall,", whole_word=False, group="transitions"),
+    RewriteRule("To summarize,", "In short,", whole_word=False, group="transitions"),
+    RewriteRule("It is important to note that", "Note that", whole_word=False, group="transitions"),
+    RewriteRule("It should be emphasized that", "", whole_word=False, group="transitions"),
+    RewriteRule("As previously mentioned,", "As mentioned,", whole_word=False, group="transitions"),
+])
+
+def apply_style_adjustments(text: str, tone: str, style: str) -> str:
+    """Apply light style adjustments without destroying content"""
+    groups = []
+    if tone == "friendly" or style == "casual":
+        groups.append("casual")
     if style == "professional":
-        text = re.sub(r'\bgonna\b', "going to", text)
-        text = re.sub(r'\bwanna\b', "want to", text)
-        
-    return text
+        groups.append("professional")
+    if not groups:
+        return text
+    return STYLE_REWRITES.apply(text, groups=groups)
 
-def advanced_humanization_pipeline(text: str, tone: str = "neutral", style: str = "professional", preserve_length: bool = True) -> str:
+@stage("rules")
+def advanced_humanization_pipeline(text: Union[str, Document], tone: str = "neutral", style: str = "professional",
+                                   preserve_length: bool = True) -> str:
     """Advanced humanization pipeline for StealthWriter-level quality"""
     import re
     import random
     
-    result = text
-    original_word_count = len(text.split())
-    
-    # 1. Strategic contractions (context-aware) - length neutral transformations
-    contractions = [
-        (r"\bI am\b", "I'm"),
-        (r"\byou are\b", "you're"), 
-        (r"\bwe are\b", "we're"),
-        (r"\bthey are\b", "they're"),
-        (r"\bit is\b", "it's"),
-        (r"\bthat is\b", "that's"),
-        (r"\bdo not\b", "don't"),
-        (r"\bdoes not\b", "doesn't"),
-        (r"\bwill not\b", "won't"),
-        (r"\bcannot\b", "can't"),
-        (r"\bshould not\b", "shouldn't"),
-        (r"\bwould not\b", "wouldn't"),
-    ]
+    original = as_document(text)
+    original_word_count = original.word_count
+    
+    # 1. Strategic contractions and 3. vocabulary sophistication, in one scan.
+    # Step 2 only prepends qualifiers and lowercases, so running the swaps first is equivalent.
+    document = Document(LEXICAL_REWRITES.apply(original.text))
     
-    for formal, informal in contractions:
-        # Apply contractions with 70% probability for natural variation
-        if random.random() < 0.7:
-            result = re.sub(formal, informal, result, flags=re.IGNORECASE)
+    # Sentences are edited in place and joined once at the end with the
+    # original paragraph and line breaks
+    sentences = list(document.sentences)
+    separators = list(document.separators)
     
     # 2. Add natural qualifiers and softeners
     qualifiers = ["perhaps", "likely", "it seems", "apparently", "generally", "typically"]
-    sentences = result.split('. ')
     
     for i, sentence in enumerate(sentences):
         if len(sentence.split()) > 8 and random.random() < 0.3:  # 30% chance for longer sentences
@@ -225,186 +1078,123 @@ def advanced_humanization_pipeline(text: str, tone: str = "neutral", style: str
             if sentence.lower().startswith(('this', 'that', 'these', 'the')):
                 sentences[i] = f"{qualifier.capitalize()}, {sentence.lower()}"
     
-    result = '. '.join(sentences)
-    
-    # 3. Vocabulary sophistication (context-aware synonyms)
-    word_replacements = {
-        "very": ["quite", "rather", "fairly", "extremely"],
-        "good": ["excellent", "great", "solid", "effective"],
-        "bad": ["poor", "problematic", "concerning", "inadequate"],
-        "big": ["large", "significant", "substantial", "considerable"],
-        "small": ["minor", "limited", "modest", "compact"],
-        "important": ["crucial", "vital", "significant", "key"],
-        "many": ["numerous", "several", "multiple", "various"],
-    }
-    
-    for word, synonyms in word_replacements.items():
-        if random.random() < 0.4:  # 40% chance to replace
-            pattern = r'\b' + re.escape(word) + r'\b'
-            replacement = random.choice(synonyms)
-            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE, count=1)
-    
     # 4. Sentence structure variation (length-aware)
     if preserve_length:
         # Only do length-neutral sentence restructuring
-        sentences = result.split('. ')
         for i in range(len(sentences)):
             # Internal sentence restructuring without changing length
             words = sentences[i].split()
             if len(words) > 6 and random.random() < 0.3:
-                # Reorder clauses without adding/removing words
-                if ', ' in sentences[i] and not sentences[i].lower().startswith(('however', 'therefore', 'additionally')):
-                    parts = sentences[i].split(', ', 1)
+                # Reorder clauses without adding/removing words, keeping the final punctuation last
+                body, terminal = split_terminal(sentences[i])
+                if ', ' in body and not body.lower().startswith(('however', 'therefore', 'additionally')):
+                    parts = body.split(', ', 1)
                     if len(parts) == 2 and len(parts[1].split()) > 3:
-                        sentences[i] = f"{parts[1].capitalize()}, {parts[0].lower()}"
-        result = '. '.join(sentences)
+                        sentences[i] = f"{parts[1].capitalize()}, {parts[0].lower()}{terminal}"
     else:
-        # Original sentence combination logic
-        sentences = result.split('. ')
+        # Original sentence combination logic, within a paragraph
         for i in range(len(sentences) - 1):
-            if len(sentences[i].split()) < 6 and len(sentences[i+1].split()) < 6:
+            if len(sentences[i].split()) < 6 and len(sentences[i+1].split()) < 6 and separators[i] == " ":
                 if random.random() < 0.3:
                     connector = random.choice([", and", ", but", ", so", "; however,"])
-                    sentences[i] = sentences[i] + connector + " " + sentences[i+1].lower()
+                    body, _ = split_terminal(sentences[i])
+                    sentences[i] = body + connector + " " + sentences[i+1].lower()
                     sentences.pop(i+1)
+                    separators.pop(i)
                     break
-        result = '. '.join(sentences)
     
-    # 5. Natural flow improvements based on tone and style
-    if tone == "friendly":
-        result = result.replace("Additionally", "Plus")
-        result = result.replace("Furthermore", "Also")
-        result = result.replace("Therefore", "So")
+    result = join_sentences(sentences, separators)
     
+    # 5. Natural flow improvements based on tone and style, and
+    # 6. removal of overly formal transitions, in one scan
+    flow_groups = ["transitions"]
+    if tone == "friendly":
+        flow_groups.append("friendly")
     if style == "casual":
-        result = result.replace("utilize", "use")
-        result = result.replace("demonstrate", "show")
-        result = result.replace("indicate", "suggest")
-    
-    # 6. Remove overly formal transitions
-    formal_transitions = [
-        ("In conclusion,", "Overall,"),
-        ("To summarize,", "In short,"),
-        ("It is important to note that", "Note that"),
-        ("It should be emphasized that", ""),
-        ("As previously mentioned,", "As mentioned,"),
-    ]
-    
-    for formal, casual in formal_transitions:
-        result = result.replace(formal, casual)
+        flow_groups.append("casual")
+    result = FLOW_REWRITES.apply(result, groups=flow_groups)
     
     # 7. Add subtle imperfections that humans make
     if random.random() < 0.2:  # 20% chance
         # Occasionally start sentences with "And" or "But"
-        sentences = result.split('. ')
+        document = Document(result)
+        sentences = list(document.sentences)
         for i in range(1, len(sentences)):
             if sentences[i].lower().startswith(('however', 'additionally', 'furthermore')):
                 if random.random() < 0.5:
                     sentences[i] = re.sub(r'^(However|Additionally|Furthermore)', 
                                         random.choice(['And', 'But']), 
                                         sentences[i], flags=re.IGNORECASE)
-        result = '. '.join(sentences)
+        result = join_sentences(sentences, document.separators)
     
     # 8. Light length balancing (NO aggressive truncation)
     if preserve_length:
-        current_word_count = len(result.split())
-        original_word_count = len(text.split())
+        current = Document(result)
+        current_word_count = current.word_count
         
         # Only make very light adjustments, never destroy content
         if current_word_count > original_word_count * 1.2:  # Only if 20% longer
             # Remove only obvious filler words, and only a few
             filler_words = ['really', 'very', 'quite', 'actually', 'basically']
-            words = result.split()
             max_removals = min(3, current_word_count - original_word_count)  # Max 3 words
             
             for filler in filler_words:
                 if max_removals <= 0:
                     break
-                if filler in words:
-                    words.remove(filler)
+                if filler in current.words:
+                    current = Document(current.remove_word(current.words.index(filler)))
                     max_removals -= 1
             
-            result = ' '.join(words)
+            result = current.text
         
         # If much shorter, add a few light qualifiers
         elif current_word_count < original_word_count * 0.8:  # Only if 20% shorter
-            words = result.split()
             additions = ['also', 'really', 'actually']
             max_additions = min(2, original_word_count - current_word_count)  # Max 2 words
             
             for addition in additions[:max_additions]:
                 # Insert near the middle of the text
-                insert_pos = len(words) // 2
+                insert_pos = current.word_count // 2
                 if insert_pos > 0:
-                    words.insert(insert_pos, addition)
+                    current = Document(current.insert_word(insert_pos, addition))
             
-            result = ' '.join(words)
+            result = current.text
     
     return result.strip()
 
 def calculate_content_similarity(original: str, humanized: str) -> float:
     """Calculate semantic similarity to ensure content preservation"""
-    import difflib
-    from collections import Counter
-    import re
-    
-    # Extract key content words (nouns, verbs, adjectives)
-    def extract_key_words(text):
-        # Simple keyword extraction - remove common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'}
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        return [w for w in words if w not in stop_words and len(w) > 2]
-    
-    original_words = extract_key_words(original)
-    humanized_words = extract_key_words(humanized)
-    
-    if not original_words or not humanized_words:
-        return 0.5  # Neutral score if no content words
-    
-    # Calculate word overlap
-    original_counter = Counter(original_words)
-    humanized_counter = Counter(humanized_words)
-    
-    common_words = sum((original_counter & humanized_counter).values())
-    total_words = sum(original_counter.values())
-    
-    if total_words == 0:
-        return 0.5
-    
-    overlap_ratio = common_words / total_words
-    
-    # Also check sequence similarity
-    sequence_similarity = difflib.SequenceMatcher(None, original.lower(), humanized.lower()).ratio()
-    
-    # Weighted combination: 70% content overlap, 30% sequence similarity
-    final_score = (overlap_ratio * 0.7) + (sequence_similarity * 0.3)
-    
-    return min(final_score, 1.0)
+    return content_similarity(original, humanized, SIMILARITY_SCORER)
 
-def validate_humanization_quality(original: str, humanized: str, min_similarity: float = 0.6) -> dict:
+@stage("validation")
+def validate_humanization_quality(original: Union[str, Document], humanized: Union[str, Document],
+                                  min_similarity: float = 0.6) -> dict:
     """Validate that humanization meets StealthWriter-level quality standards"""
+    original, humanized = as_document(original), as_document(humanized)
     
     # 1. Content preservation check
-    similarity_score = calculate_content_similarity(original, humanized)
+    similarity_score = calculate_content_similarity(original.text, humanized.text)
     
     # 2. Strict length check (StealthWriter-level: exact word count)
-    original_length = len(original.split())
-    humanized_length = len(humanized.split())
+    original_length = original.word_count
+    humanized_length = humanized.word_count
     
     # For StealthWriter-level quality, lengths should be exactly the same
     length_match = original_length == humanized_length
     length_ratio = min(original_length, humanized_length) / max(original_length, humanized_length) if max(original_length, humanized_length) > 0 else 0
     
     # 3. Structural improvements check
-    has_contractions = "'" in humanized and "'m" in humanized or "'re" in humanized or "'ve" in humanized
-    has_variety = len(set(humanized.split())) / len(humanized.split()) > 0.7 if humanized.split() else False
+    humanized_text = humanized.text
+    has_contractions = "'" in humanized_text and "'m" in humanized_text or "'re" in humanized_text or "'ve" in humanized_text
+    has_variety = len(set(humanized.words)) / humanized_length > 0.7 if humanized_length else False
     
     # 4. Human-like patterns
     human_patterns = [
         'perhaps', 'likely', 'it seems', 'apparently', 'generally', 'typically',
         'quite', 'rather', 'fairly', 'really', 'actually', 'basically'
     ]
-    has_human_patterns = any(pattern in humanized.lower() for pattern in human_patterns)
+    humanized_lower = humanized_text.lower()
+    has_human_patterns = any(pattern in humanized_lower for pattern in human_patterns)
     
     # 5. Overall quality score (enhanced for StealthWriter-level requirements)
     quality_score = (
@@ -439,141 +1229,628 @@ def simple_humanize_fallback(text: str) -> str:
     """Simple fallback when advanced pipeline fails"""
     return advanced_humanization_pipeline(text)
 
-@app.post("/humanize")
-async def humanize(req: Request, payload: Payload):
-    """Humanize AI-generated text using Hugging Face model"""
-    verify(req)
+def build_response(payload: Payload, humanized_text: str, quality_metrics: dict, note: str = None,
+                   degraded: List[int] = None) -> dict:
+    """Build the /humanize response body.
+
+    ``degraded`` lists sentence indices that used the rule pipeline because
+    the request's deadline ran out; it is only reported when a deadline applied.
+    """
+    response = {
+        "success": True,
+        "originalText": payload.text,
+        "humanizedText": humanized_text,
+        "wordCount": quality_metrics['humanized_word_count'],
+        "characterCount": len(humanized_text),
+        "settings": {
+            "tone": payload.tone,
+            "style": payload.style,
+            "length": payload.length,
+            "preset": payload_preset(payload),
+            "model": payload.model or DEFAULT_MODEL_NAME
+        },
+        "qualityMetrics": {
+            "contentSimilarity": round(quality_metrics['content_similarity'], 3),
+            "overallQuality": round(quality_metrics['overall_quality'], 3),
+            "lengthMatch": quality_metrics['length_match'],
+            "originalWordCount": quality_metrics['original_word_count'],
+            "humanizedWordCount": quality_metrics['humanized_word_count'],
+            "hasContractions": quality_metrics['has_contractions'],
+            "hasHumanPatterns": quality_metrics['has_human_patterns'],
+            "passesValidation": quality_metrics['passes_validation']
+        }
+    }
+    if note:
+        response["note"] = note
+    if degraded is not None:
+        response["degradedSentences"] = degraded
+    return response
+
+def validate_model_output(payload: Payload, humanized_text: str):
+    """Fall back to the rule pipeline if model output is too short or fails validation.
+
+    Returns (humanized_text, quality_metrics).
+    """
+    # If the output is empty or too short, use fallback
+    if not humanized_text.strip() or len(humanized_text.strip()) < len(payload.text.strip()) * 0.5:
+        print("T5 output too short, using rule-based fallback")
+        FALLBACKS.inc(reason="too_short")
+        humanized_text = advanced_humanization_pipeline(payload.document, payload.tone, payload.style)
     
-    if not payload.text or not payload.text.strip():
-        raise HTTPException(status_code=400, detail="Text is required")
+    # Validate quality (StealthWriter-level standards)
+    quality_metrics = validate_humanization_quality(payload.document, humanized_text)
+    
+    # If quality is insufficient, try advanced pipeline on original text
+    if not quality_metrics['passes_validation']:
+        print(f"Quality insufficient (score: {quality_metrics['overall_quality']:.2f}), using advanced pipeline")
+        FALLBACKS.inc(reason="failed_validation")
+        humanized_text = advanced_humanization_pipeline(payload.document, payload.tone, payload.style)
+        quality_metrics = validate_humanization_quality(payload.document, humanized_text)
+    
+    return humanized_text, quality_metrics
+
+def rule_based_response(payload: Payload, note: str, reason: str) -> dict:
+    """Humanize with the rule-based pipeline only, counting ``reason`` in the fallbacks metric"""
+    FALLBACKS.inc(reason=reason)
+    humanized_text = advanced_humanization_pipeline(
+        payload.document, 
+        tone=payload.tone, 
+        style=payload.style
+    )
+    
+    # Validate quality even for fallback
+    quality_metrics = validate_humanization_quality(payload.document, humanized_text)
+    return build_response(payload, humanized_text, quality_metrics, note=note)
+
+def model_unavailable() -> Tuple[str, str]:
+    """Response note and fallback reason for documents answered without the model"""
+    if _model_status == "disabled":
+        return "Rule-based mode (HUMANIZE_MODE=rules)", "rules_mode"
+    return "Using rule-based fallback (T5 not available)", "model_unavailable"
+
+def request_deadline(header_ms: Optional[str] = None, payload: Payload = None, started: float = None) -> Optional[float]:
+    """time.monotonic() value by which generation must finish, or None for no limit.
+
+    The shortest of the server default, the X-Deadline-Ms header and the
+    payload's deadline_ms wins.
+    """
+    limits = []
+    if DEFAULT_DEADLINE_MS > 0:
+        limits.append(DEFAULT_DEADLINE_MS)
+    if header_ms:
+        try:
+            limits.append(int(header_ms))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Deadline-Ms must be an integer number of milliseconds")
+    if payload is not None and payload.deadline_ms is not None:
+        limits.append(payload.deadline_ms)
+    
+    if not limits:
+        return None
+    started = started if started is not None else time.monotonic()
+    return started + max(0, min(limits)) / 1000.0
+
+def finish_document(payload: Payload, humanized_text: str, degraded: List[int], sentence_count: int,
+                    deadline: float = None) -> dict:
+    """Validate assembled model output and build the response, reporting deadline fallbacks"""
+    assembled = humanized_text
+    humanized_text, quality_metrics = validate_model_output(payload, humanized_text)
+    
+    note = None
+    if degraded:
+        note = f"Deadline reached: {len(degraded)} of {sentence_count} sentences used the rule-based pipeline"
+        print(note)
+        FALLBACKS.inc(reason="deadline")
+    if humanized_text != assembled:
+        # Validation replaced the whole document with the rule pipeline
+        degraded = list(range(sentence_count))
     
+    return build_response(payload, humanized_text, quality_metrics, note=note,
+                          degraded=degraded if deadline is not None else None)
+
+def humanize_document(payload: Payload, progress: Callable[[int, int], None] = None, deadline: float = None) -> dict:
+    """Run the full blocking humanization pipeline and build the response body.
+
+    ``progress(done, total)`` reports sentences paraphrased so far. Sentences
+    not generated before ``deadline`` use the rule pipeline and are listed in
+    ``degradedSentences``.
+    """
     try:
-        tokenizer, model = get_model()
-        
-        # If model loading failed, use rule-based fallback
-        if tokenizer is None or model is None:
-            print("T5 model not available, using rule-based fallback")
-            humanized_text = advanced_humanization_pipeline(
-                payload.text, 
-                tone=payload.tone, 
-                style=payload.style
-            )
+        with serving_model(payload.model) as (backend, scheduler):
+            # If model loading failed, use rule-based fallback
+            if backend is None:
+                print("T5 model not available, using rule-based fallback")
+                return rule_based_response(payload, *model_unavailable())
             
-            # Validate quality even for fallback
-            quality_metrics = validate_humanization_quality(payload.text, humanized_text)
+            # Use sentence-by-sentence T5 humanization for better content preservation
+            print("Using T5 sentence-by-sentence humanization")
+            humanized_text, degraded, sentence_count = chunked_humanization(
+                payload.document,
+                backend,
+                tone=payload.tone,
+                style=payload.style,
+                scheduler=scheduler,
+                cache=_sentence_cache if CACHE_ENABLED else None,
+                progress=progress,
+                preset=payload_preset(payload),
+                deadline=deadline,
+                model=payload.model
+            )
+        
+        return finish_document(payload, humanized_text, degraded, sentence_count, deadline)
+        
+    except Exception as e:
+        print(f"Humanization error: {e}")
+        # Use advanced fallback on any error
+        return rule_based_response(payload, f"Using fallback due to error: {str(e)}", "exception")
+
+def humanize_documents(payloads: List[Payload], deadline: float = None,
+                       deadlines: List[Optional[float]] = None) -> List[dict]:
+    """Humanize several documents, sending all of their sentences through the model together.
+
+    Returns one response body per payload; a failure in one document only
+    affects that document. Sentences not generated before their document's
+    deadline (``deadlines[i]``, or ``deadline`` for all) use the rule
+    pipeline. Documents for different models are batched per model.
+    """
+    if deadlines is None:
+        deadlines = [deadline] * len(payloads)
+    results = [None] * len(payloads)
+    by_model = {}
+    for index, payload in enumerate(payloads):
+        by_model.setdefault(payload.model, []).append(index)
+    
+    for model, indices in by_model.items():
+        group = [payloads[index] for index in indices]
+        try:
+            with serving_model(model) as (backend, scheduler):
+                outputs = humanize_model_documents(group, backend, scheduler, model,
+                                                   deadlines=[deadlines[index] for index in indices])
+        except Exception as e:
+            print(f"Batch humanization error: {e}")
+            outputs = [humanize_with_rules_or_error(payload, f"Using fallback due to error: {str(e)}", "exception") for payload in group]
+        for index, result in zip(indices, outputs):
+            results[index] = result
+    return results
+
+def humanize_model_documents(payloads: List[Payload], backend: Optional[InferenceBackend],
+                             scheduler: Optional[InferenceScheduler], model: Optional[str],
+                             deadlines: List[Optional[float]]) -> List[dict]:
+    """Humanize documents that all use one model, see ``humanize_documents``"""
+    if backend is None:
+        print("T5 model not available, using rule-based fallback")
+        return [humanize_with_rules_or_error(payload, *model_unavailable()) for payload in payloads]
+    
+    try:
+        documents = [payload.document for payload in payloads]
+        chunks_per_document = [chunk_sentences(document, backend) for document in documents]
+        groups = [(payload_preset(payload), deadline) for payload, deadline in zip(payloads, deadlines)]
+        
+        # Documents with the same preset and deadline share batches, the earliest deadline
+        # first so the groups run after it have the most time left
+        paraphrases_by_group = {}
+        for preset, deadline in sorted(set(groups), key=lambda group: (group[1] is None, group[1] or 0, group[0])):
+            eligible = [
+                chunk.text
+                for chunks, document_group in zip(chunks_per_document, groups) if document_group == (preset, deadline)
+                for chunk in chunks if is_eligible_sentence(chunk.text)
+            ]
+            print(f"Batch of {len(payloads)} documents with {len(eligible)} chunks to humanize ({preset})")
             
-            return {
-                "success": True,
-                "originalText": payload.text,
-                "humanizedText": humanized_text,
-                "wordCount": len(humanized_text.split()),
-                "characterCount": len(humanized_text),
-                "settings": {
-                    "tone": payload.tone,
-                    "style": payload.style,
-                    "length": payload.length
-                },
-                "qualityMetrics": {
-                    "contentSimilarity": round(quality_metrics['content_similarity'], 3),
-                    "overallQuality": round(quality_metrics['overall_quality'], 3),
-                    "lengthMatch": quality_metrics['length_match'],
-                    "originalWordCount": quality_metrics['original_word_count'],
-                    "humanizedWordCount": quality_metrics['humanized_word_count'],
-                    "hasContractions": quality_metrics['has_contractions'],
-                    "hasHumanPatterns": quality_metrics['has_human_patterns'],
-                    "passesValidation": quality_metrics['passes_validation']
-                },
-                "note": "Using rule-based fallback (T5 not available)"
-            }
+            paraphrases_by_group[preset, deadline] = paraphrase_sentences(
+                eligible,
+                backend,
+                scheduler=scheduler,
+                cache=_sentence_cache if CACHE_ENABLED else None,
+                preset=preset,
+                deadline=deadline,
+                model=model
+            )
+    except Exception as e:
+        print(f"Batch humanization error: {e}")
+        return [humanize_with_rules_or_error(payload, f"Using fallback due to error: {str(e)}", "exception") for payload in payloads]
+    
+    results = []
+    for payload, document, chunks, group in zip(payloads, documents, chunks_per_document, groups):
+        try:
+            paraphrases = paraphrases_by_group[group]
+            humanized_text = assemble_humanized_text(document, chunks, paraphrases, payload.tone, payload.style)
+            degraded = degraded_sentences(chunks, paraphrases)
+            results.append(finish_document(payload, humanized_text, degraded, len(document.spans), group[1]))
+        except Exception as e:
+            print(f"Humanization error: {e}")
+            results.append(humanize_with_rules_or_error(payload, f"Using fallback due to error: {str(e)}", "exception"))
+    
+    return results
+
+def humanize_with_rules_or_error(payload: Payload, note: str, reason: str) -> dict:
+    """Rule-based response for one batch item, or an error entry if even that fails"""
+    try:
+        return rule_based_response(payload, note, reason)
+    except Exception as e:
+        print(f"Rule-based humanization error: {e}")
+        return {"success": False, "error": str(e)}
+
+def run_job(payload_data: dict, progress: Callable[[int, int], None]) -> dict:
+    """Run one stored job through the regular pipeline"""
+    payload = Payload(**payload_data)
+    
+    cached = get_cached_response(payload)
+    if cached is not None:
+        return cached
+    
+    result = humanize_document(payload, progress=progress)
+    store_cached_response(payload, result)
+    return result
+
+def stream_humanization(payload: Payload, emit, stream_tokens: bool = False, cancelled: threading.Event = None):
+    """Humanize a document sentence by sentence, emitting an event as each one finishes.
+
+    Events are dicts: "start", optional "token" pieces, one "sentence" per
+    sentence in order, and a final "done" carrying the full response body
+    (including qualityMetrics). The "done" text is authoritative: if the
+    joined sentences fail validation it holds the rule-based result instead.
+    """
+    try:
+        with serving_model(payload.model) as (backend, model_scheduler):
+            if backend is None:
+                print("T5 model not available, using rule-based fallback")
+                emit({"type": "start", "sentenceCount": 0})
+                emit({"type": "done", **rule_based_response(payload, *model_unavailable())})
+                return
         
-        # Use sentence-by-sentence T5 humanization for better content preservation
-        print("Using T5 sentence-by-sentence humanization")
-        humanized_text = sentence_by_sentence_humanization(
-            payload.text,
-            tokenizer,
-            model,
-            tone=payload.tone,
-            style=payload.style
-        )
+            document = payload.document
+            sentences = document.sentences
+            emit({"type": "start", "sentenceCount": len(sentences)})
         
-        # If the output is empty or too short, use fallback
-        if not humanized_text.strip() or len(humanized_text.strip()) < len(payload.text.strip()) * 0.5:
-            print("T5 output too short, using rule-based fallback")
-            humanized_text = advanced_humanization_pipeline(payload.text, payload.tone, payload.style)
+            eligible = {i for i, sentence in enumerate(sentences) if is_eligible_sentence(sentence)}
+            cache = _sentence_cache if CACHE_ENABLED else None
+            preset = payload_preset(payload)
+            model_key = f"{current_model_key(payload.model)}:{preset}"
+            cached = cache.get_many([sentences[i] for i in sorted(eligible)], model_key) if cache is not None else {}
         
-        # Validate quality (StealthWriter-level standards)
-        quality_metrics = validate_humanization_quality(payload.text, humanized_text)
+            # Queue every uncached sentence up front so they still batch, then emit in order
+            futures = {}
+            scheduler = None if stream_tokens else model_scheduler
+            if scheduler is not None:
+                missing = [i for i in sorted(eligible) if sentences[i] not in cached]
+                futures = dict(zip(missing, scheduler.submit([(sentences[i], preset) for i in missing])))
         
-        # If quality is insufficient, try advanced pipeline on original text
-        if not quality_metrics['passes_validation']:
-            print(f"Quality insufficient (score: {quality_metrics['overall_quality']:.2f}), using advanced pipeline")
-            humanized_text = advanced_humanization_pipeline(payload.text, payload.tone, payload.style)
-            quality_metrics = validate_humanization_quality(payload.text, humanized_text)
+            humanized_sentences = []
+            new_paraphrases = {}
+            for i, sentence in enumerate(sentences):
+                if cancelled is not None and cancelled.is_set():
+                    print("Stream cancelled by client")
+                    for future in futures.values():
+                        future.cancel()
+                    return
+            
+                if i not in eligible:
+                    humanized, source = sentence, "original"
+                elif sentence in cached:
+                    humanized, source = check_sentence_output(sentence, cached[sentence], i), "cache"
+                else:
+                    if i in futures:
+                        generated = futures[i].result()
+                    elif stream_tokens:
+                        inputs = backend.encode([f"paraphrase: {sentence}"])
+                        pieces = []
+                        for piece in backend.stream(inputs, **generation_kwargs([sentence], preset=preset)):
+                            pieces.append(piece)
+                            emit({"type": "token", "index": i, "text": piece})
+                        generated = "".join(pieces).strip() or sentence
+                    else:
+                        generated = humanize_batch([sentence], backend, preset=preset)[0]
+                
+                    if generated != sentence:
+                        new_paraphrases[sentence] = generated
+                    humanized, source = check_sentence_output(sentence, generated, i), "model"
+            
+                humanized = apply_style_adjustments(humanized, payload.tone, payload.style)
+                humanized_sentences.append(humanized)
+                emit({"type": "sentence", "index": i, "text": humanized, "source": source})
         
-        return {
-            "success": True,
-            "originalText": payload.text,
-            "humanizedText": humanized_text,
-            "wordCount": len(humanized_text.split()),
-            "characterCount": len(humanized_text),
-            "settings": {
-                "tone": payload.tone,
-                "style": payload.style,
-                "length": payload.length
-            },
-            "qualityMetrics": {
-                "contentSimilarity": round(quality_metrics['content_similarity'], 3),
-                "overallQuality": round(quality_metrics['overall_quality'], 3),
-                "lengthMatch": quality_metrics['length_match'],
-                "originalWordCount": quality_metrics['original_word_count'],
-                "humanizedWordCount": quality_metrics['humanized_word_count'],
-                "hasContractions": quality_metrics['has_contractions'],
-                "hasHumanPatterns": quality_metrics['has_human_patterns'],
-                "passesValidation": quality_metrics['passes_validation']
-            }
-        }
+            if cache is not None:
+                cache.set_many(new_paraphrases, model_key)
+        
+            streamed_text = document.join(humanized_sentences)
+            humanized_text, quality_metrics = validate_model_output(payload, streamed_text)
+            note = None if humanized_text == streamed_text else "Streamed sentences replaced by rule-based pipeline after validation"
+            emit({"type": "done", **build_response(payload, humanized_text, quality_metrics, note=note)})
         
     except Exception as e:
-        print(f"Humanization error: {e}")
-        # Use advanced fallback on any error
-        humanized_text = advanced_humanization_pipeline(
-            payload.text, 
-            tone=payload.tone, 
-            style=payload.style
-        )
+        print(f"Streaming humanization error: {e}")
+        emit({"type": "done", **rule_based_response(payload, f"Using fallback due to error: {str(e)}", "exception")})
+
+@app.post("/humanize")
+async def humanize(req: Request, payload: Payload, response: Response):
+    """Humanize AI-generated text using Hugging Face model"""
+    verify(req)
+    
+    if not payload.text or not payload.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    
+    # The deadline counts from arrival, so time spent queued is included
+    deadline = request_deadline(req.headers.get("x-deadline-ms"), payload)
+    
+    # The executor copies this context, so stages in the worker thread join the trace
+    with start_trace("/humanize") as trace:
+        try:
+            # Resubmitted documents are answered from the cache without touching the model
+            with span("document_cache"):
+                result = get_cached_response(payload, deadline)
+            if result is None:
+                # Model loading, generation, NLTK and scoring all block, so run them in the
+                # bounded inference pool to keep the event loop (and /healthz) responsive
+                try:
+                    result = await get_executor().run(humanize_document, payload, deadline=deadline)
+                except InferenceQueueFull:
+                    raise server_busy()
+                store_cached_response(payload, result)
+        finally:
+            report_trace(trace, req, response)
+    
+    return result
+
+def report_trace(trace, req: Request, response: Response):
+    """Add the trace to the response when asked for, and log it when slow"""
+    if req.headers.get("x-debug-trace") == "1":
+        response.headers["Server-Timing"] = trace.server_timing()
+    if TRACE_SLOW_MS > 0 and trace.elapsed_ms() >= TRACE_SLOW_MS:
+        print(f"Slow request trace: {json.dumps(trace.record())}")
+
+@app.post("/humanize/batch")
+async def humanize_batch_request(req: Request, batch: BatchPayload):
+    """Humanize many documents in one request, scheduling all their sentences together.
+
+    Each item is validated on its own, so one bad item only fails itself.
+    """
+    verify(req)
+    
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    
+    # Each item's deadline is the shortest of the header, the server default and its own
+    # deadline_ms, all counted from when the batch arrived
+    started = time.monotonic()
+    header_ms = req.headers.get("x-deadline-ms")
+    request_deadline(header_ms)  # rejects a malformed header before any work
+    
+    results = [None] * len(batch.items)
+    pending = []
+    
+    for index, item in enumerate(batch.items):
+        try:
+            payload = Payload.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+            results[index] = {"index": index, "success": False, "error": errors}
+            continue
         
-        # Validate quality even for error fallback
-        quality_metrics = validate_humanization_quality(payload.text, humanized_text)
+        if not payload.text.strip():
+            results[index] = {"index": index, "success": False, "error": "Text is required"}
+            continue
         
-        return {
-            "success": True,
-            "originalText": payload.text,
-            "humanizedText": humanized_text,
-            "wordCount": len(humanized_text.split()),
-            "characterCount": len(humanized_text),
-            "settings": {
-                "tone": payload.tone,
-                "style": payload.style,
-                "length": payload.length
-            },
-            "qualityMetrics": {
-                "contentSimilarity": round(quality_metrics['content_similarity'], 3),
-                "overallQuality": round(quality_metrics['overall_quality'], 3),
-                "lengthMatch": quality_metrics['length_match'],
-                "originalWordCount": quality_metrics['original_word_count'],
-                "humanizedWordCount": quality_metrics['humanized_word_count'],
-                "hasContractions": quality_metrics['has_contractions'],
-                "hasHumanPatterns": quality_metrics['has_human_patterns'],
-                "passesValidation": quality_metrics['passes_validation']
+        deadline = request_deadline(header_ms, payload, started)
+        cached = get_cached_response(payload, deadline)
+        if cached is not None:
+            results[index] = {"index": index, **cached}
+        else:
+            pending.append((index, payload, deadline))
+    
+    if pending:
+        try:
+            outputs = await get_executor().run(humanize_documents, [payload for _, payload, _ in pending],
+                                               deadlines=[deadline for _, _, deadline in pending])
+        except InferenceQueueFull:
+            raise server_busy()
+        
+        for (index, payload, _), result in zip(pending, outputs):
+            if result.get("success"):
+                store_cached_response(payload, result)
+            results[index] = {"index": index, **result}
+    
+    succeeded = sum(1 for result in results if result.get("success"))
+    return {
+        "success": True,
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+@app.post("/humanize/stream")
+async def humanize_stream(req: Request, payload: Payload, tokens: bool = False):
+    """Stream humanized sentences as newline-delimited JSON as soon as each is ready.
+
+    Pass ``?tokens=true`` to also receive token pieces within each sentence
+    (uses sampling without beam search).
+    """
+    verify(req)
+    
+    if not payload.text or not payload.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def emit(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def produce():
+        try:
+            stream_humanization(payload, emit, stream_tokens=tokens, cancelled=cancelled)
+        finally:
+            emit(None)
+    
+    # Reserve an inference slot before the response starts so a full queue is still a 503
+    try:
+        get_executor().submit(produce)
+    except InferenceQueueFull:
+        raise server_busy()
+    
+    async def event_lines():
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield json.dumps(event) + "\n"
+        finally:
+            # Stop generating if the client disconnects
+            cancelled.set()
+    
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def create_job(req: Request, payload: Payload):
+    """Queue a document for background humanization and return its job id"""
+    verify(req)
+    
+    if not payload.text or not payload.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    
+    try:
+        job_id = get_job_manager().submit(payload.model_dump())
+    except JobQueueFull:
+        raise server_busy()
+    
+    return {"jobId": job_id, "status": "queued", "statusUrl": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(req: Request, job_id: str):
+    """Report a job's status, progress (sentences done out of total) and result"""
+    verify(req)
+    
+    job = get_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/cache/stats")
+async def cache_stats(req: Request):
+    """Hit/miss, entry and byte counters for both cache tiers"""
+    verify(req)
+    return {
+        "enabled": CACHE_ENABLED,
+        "document": _document_cache.stats(),
+        "sentence": _sentence_cache.stats()
+    }
+
+@app.get("/presets")
+async def presets():
+    """Generation presets, their measured p50 latencies and the tier that unlocks each"""
+    return {
+        "default": DEFAULT_PRESET,
+        "presets": [
+            {
+                "name": name,
+                "numBeams": PRESETS[name].num_beams,
+                "sampling": PRESETS[name].do_sample,
+                "p50MsByWords": PRESETS[name].p50_ms_by_words
+            }
+            for name in PRESET_ORDER
+        ],
+        "tiers": TIER_PRESETS
+    }
+
+@app.get("/models")
+async def models():
+    """Models a request can name, which are loaded, and the memory budget they share"""
+    registry = _model_registry.stats()
+    loaded = {entry["name"]: entry for entry in registry.pop("loaded")}
+    default_size = default_model_bytes()
+    return {
+        "default": DEFAULT_MODEL_NAME,
+        "models": [
+            {
+                "name": DEFAULT_MODEL_NAME,
+                "source": model_repo(),
+                "loaded": _backend_cache is not None,
+                "sizeMb": round(default_size / 2 ** 20, 1) if default_size else None,
+                "pinned": True
             },
-            "note": f"Using fallback due to error: {str(e)}"
-        }
+            *(
+                {
+                    "name": name,
+                    "source": source,
+                    "loaded": name in loaded,
+                    "sizeMb": loaded[name]["sizeMb"] if name in loaded else None,
+                    "pinned": False,
+                    **({"inUse": loaded[name]["inUse"], "idleSeconds": loaded[name]["idleSeconds"]} if name in loaded else {})
+                }
+                for name, source in MODEL_SOURCES.items()
+            )
+        ],
+        "registry": registry
+    }
 
 @app.get("/healthz")
 async def health():
     """Health check endpoint"""
     return {"status": "ok", "message": "Notecraft Pro Humanizer API is running"}
 
+@app.get("/readyz")
+async def ready():
+    """Readiness check: only ready once the model is loaded and warmed up"""
+    if _model_status == "disabled":
+        return {"status": "ready", "mode": "rules"}
+    if _model_status == "ready":
+        return {
+            "status": "ready",
+            "model": model_repo(),
+            "precision": _model_precision,
+            "startup": _model_startup
+        }
+    
+    body = {"status": _model_status}
+    if _model_status == "failed":
+        body["error"] = _model_error
+        body["failedAttempts"] = _model_load_failures
+        body["retryInSeconds"] = max(0, round(_model_retry_at - time.time())) if _model_retry_at else None
+    return JSONResponse(status_code=503, content=body)
+
+def verify_admin(req: Request):
+    """Admin endpoints need ADMIN_SECRET; without it they do not exist"""
+    admin_secret = os.getenv("ADMIN_SECRET")
+    if not admin_secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if req.headers.get("authorization") != f"Bearer {admin_secret}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+@app.post("/admin/profile")
+async def profile(req: Request, seconds: float = 10.0, torch_profile: bool = True):
+    """Sample every thread for a few seconds and return folded stacks for a flamegraph.
+
+    Generate calls that run during the capture are also profiled with the
+    torch profiler (``torch_profile=false`` turns that off).
+    """
+    verify_admin(req)
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {PROFILE_MAX_SECONDS:g}")
+    
+    # Not the inference pool: profiling must not take a slot from the work it observes
+    loop = asyncio.get_running_loop()
+    try:
+        session = await loop.run_in_executor(None, functools.partial(capture_profile, seconds, torch_enabled=torch_profile))
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already being captured")
+    
+    return Response(
+        content=session.folded(),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="profile-{int(time.time())}.folded"'}
+    )
+
+@app.get("/metrics")
+async def metrics(req: Request):
+    """Prometheus metrics for this worker process"""
+    verify(req)
+    return Response(content=METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -582,7 +1859,14 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "humanize": "/humanize",
-            "health": "/healthz"
+            "health": "/healthz",
+            "ready": "/readyz",
+            "stream": "/humanize/stream",
+            "batch": "/humanize/batch",
+            "jobs": "/jobs",
+            "presets": "/presets",
+            "models": "/models",
+            "metrics": "/metrics"
         }
     }
 
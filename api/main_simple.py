@@ -3,6 +3,7 @@ import re
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from rewrite import RewriteEngine, RewriteRule
 
 app = FastAPI(title="Notecraft Pro Humanizer API", version="1.0.0")
 
@@ -31,58 +32,65 @@ def verify(req: Request):
     if not auth_header or auth_header != f"Bearer {api_secret}":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+# Rule tables compiled once at startup into single-scan engines
+CONTRACTIONS = [
+    ("I am", "I'm"),
+    ("you are", "you're"),
+    ("we are", "we're"),
+    ("they are", "they're"),
+    ("it is", "it's"),
+    ("that is", "that's"),
+    ("this is", "this's"),
+    ("there is", "there's"),
+    ("here is", "here's"),
+    ("I will", "I'll"),
+    ("you will", "you'll"),
+    ("we will", "we'll"),
+    ("they will", "they'll"),
+    ("it will", "it'll"),
+    ("that will", "that'll"),
+    ("I would", "I'd"),
+    ("you would", "you'd"),
+    ("we would", "we'd"),
+    ("they would", "they'd"),
+    ("it would", "it'd"),
+    ("that would", "that'd"),
+    ("I have", "I've"),
+    ("you have", "you've"),
+    ("we have", "we've"),
+    ("they have", "they've"),
+    ("it has", "it's"),
+    ("that has", "that's"),
+]
+
+TONE_REPLACEMENTS = {
+    # Make it more casual
+    "casual": [("very", "really"), ("important", "big"), ("excellent", "awesome"), ("terrible", "awful")],
+    # Keep it professional but natural
+    "professional": [("awesome", "excellent"), ("awful", "poor")],
+}
+
+WORD_REWRITES = RewriteEngine(
+    [RewriteRule(formal, informal, ignore_case=True, group="contractions")
+     for formal, informal in CONTRACTIONS] +
+    [RewriteRule(term, replacement, ignore_case=True, group=tone)
+     for tone, replacements in TONE_REPLACEMENTS.items() for term, replacement in replacements]
+)
+
+# Common AI-generated patterns
+AI_PATTERN_REWRITES = RewriteEngine([
+    RewriteRule("In conclusion", "So", ignore_case=True),
+    RewriteRule("Furthermore", "Also", ignore_case=True),
+    RewriteRule("Moreover", "Plus", ignore_case=True),
+    RewriteRule("Additionally", "Also", ignore_case=True),
+    RewriteRule("It is important to note", "Keep in mind", ignore_case=True),
+])
+
 def humanize_text(text: str, tone: str = "neutral", style: str = "professional") -> str:
     """Humanize text using rule-based approach"""
     
-    # Basic contractions
-    contractions = {
-        r'\bI am\b': "I'm",
-        r'\byou are\b': "you're",
-        r'\bwe are\b': "we're",
-        r'\bthey are\b': "they're",
-        r'\bit is\b': "it's",
-        r'\bthat is\b': "that's",
-        r'\bthis is\b': "this's",
-        r'\bthere is\b': "there's",
-        r'\bhere is\b': "here's",
-        r'\bI will\b': "I'll",
-        r'\byou will\b': "you'll",
-        r'\bwe will\b': "we'll",
-        r'\bthey will\b': "they'll",
-        r'\bit will\b': "it'll",
-        r'\bthat will\b': "that'll",
-        r'\bI would\b': "I'd",
-        r'\byou would\b': "you'd",
-        r'\bwe would\b': "we'd",
-        r'\bthey would\b': "they'd",
-        r'\bit would\b': "it'd",
-        r'\bthat would\b': "that'd",
-        r'\bI have\b': "I've",
-        r'\byou have\b': "you've",
-        r'\bwe have\b': "we've",
-        r'\bthey have\b': "they've",
-        r'\bit has\b': "it's",
-        r'\bthat has\b': "that's",
-    }
-    
-    result = text
-    
-    # Apply contractions
-    for pattern, replacement in contractions.items():
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-    
-    # Add natural language patterns based on tone
-    if tone == "casual":
-        # Make it more casual
-        result = re.sub(r'\bvery\b', 'really', result, flags=re.IGNORECASE)
-        result = re.sub(r'\bimportant\b', 'big', result, flags=re.IGNORECASE)
-        result = re.sub(r'\bexcellent\b', 'awesome', result, flags=re.IGNORECASE)
-        result = re.sub(r'\bterrible\b', 'awful', result, flags=re.IGNORECASE)
-    
-    elif tone == "professional":
-        # Keep it professional but natural
-        result = re.sub(r'\bawesome\b', 'excellent', result, flags=re.IGNORECASE)
-        result = re.sub(r'\bawful\b', 'poor', result, flags=re.IGNORECASE)
+    # Apply contractions and tone-specific vocabulary
+    result = WORD_REWRITES.apply(text, groups=("contractions", tone))
     
     # Add conversational elements
     if style == "conversational":
@@ -91,11 +99,7 @@ def humanize_text(text: str, tone: str = "neutral", style: str = "professional")
             result = f"Well, {result.lower()}"
     
     # Fix common AI-generated patterns
-    result = re.sub(r'\bIn conclusion\b', 'So', result, flags=re.IGNORECASE)
-    result = re.sub(r'\bFurthermore\b', 'Also', result, flags=re.IGNORECASE)
-    result = re.sub(r'\bMoreover\b', 'Plus', result, flags=re.IGNORECASE)
-    result = re.sub(r'\bAdditionally\b', 'Also', result, flags=re.IGNORECASE)
-    result = re.sub(r'\bIt is important to note\b', 'Keep in mind', result, flags=re.IGNORECASE)
+    result = AI_PATTERN_REWRITES.apply(result)
     
     # Add natural pauses and flow
     result = re.sub(r'\.(?=\s*[A-Z])', '. ', result)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+CPU precision modes for the paraphraser model with a startup self-check
+"""
+import copy
+import time
+import torch
+
+PRECISION_MODES = ("auto", "float32", "bfloat16", "int8")
+
+# Sentences used to time each precision mode
+BENCHMARK_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog in the forest.",
+    "Machine learning algorithms can process vast amounts of data to identify patterns.",
+]
+
+def bf16_supported() -> bool:
+    """Whether this CPU has native bfloat16 instructions"""
+    try:
+        if torch.cpu._is_avx512_bf16_supported():
+            return True
+    except AttributeError:
+        pass
+
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        return False
+
+def resolve_mode(mode: str) -> str:
+    """Map a configured mode to one this host can run"""
+    mode = (mode or "auto").lower()
+    if mode not in PRECISION_MODES:
+        print(f"Unknown precision mode '{mode}', using float32")
+        return "float32"
+
+    if mode == "auto":
+        # Dynamic int8 is the fastest and smallest option on CPU-only hosts
+        return "int8"
+
+    if mode == "bfloat16" and not bf16_supported():
+        print("CPU has no native bfloat16 support, using float32")
+        return "float32"
+
+    return mode
+
+def convert_model(model, mode: str, inplace: bool = False):
+    """Return a float32 model in the given precision mode.
+
+    The original is left alone unless ``inplace`` is set, in which case it
+    is converted in place (a model nothing else will use saves a full copy).
+    """
+    if mode == "int8":
+        # Quantize Linear weights to int8, activations are quantized on the fly
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=inplace)
+    if mode == "bfloat16":
+        return (model if inplace else copy.deepcopy(model)).to(torch.bfloat16)
+    return model
+
+def benchmark_model(tokenizer, model, runs: int = 2) -> float:
+    """Average seconds per sentence for a short greedy generate; raises on failure"""
+    inputs = tokenizer(
+        [f"paraphrase: {sentence}" for sentence in BENCHMARK_SENTENCES],
+        return_tensors="pt",
+        padding=True
+    )
+
+    # Untimed first run absorbs one-off initialization
+    timings = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=16,
+                num_beams=1,
+                do_sample=False
+            )
+        timings.append(time.perf_counter() - start)
+
+    if outputs.shape[0] != len(BENCHMARK_SENTENCES):
+        raise RuntimeError("Unexpected generate output shape")
+
+    return sum(timings[1:]) / runs / len(BENCHMARK_SENTENCES)
+
+def select_precision(tokenizer, model, mode: str, self_check: bool = True):
+    """Convert a float32 model to the configured mode, falling back if it fails or is slower.
+
+    Returns (model, chosen_mode, report) where report holds the timings.
+    """
+    mode = resolve_mode(mode)
+    report = {"requested": mode}
+
+    if mode == "float32":
+        report["selected"] = "float32"
+        return model, "float32", report
+
+    try:
+        candidate = convert_model(model, mode)
+    except Exception as e:
+        print(f"Precision mode {mode} unavailable ({e}), using float32")
+        report.update({"selected": "float32", "error": str(e)})
+        return model, "float32", report
+
+    if not self_check:
+        report["selected"] = mode
+        return candidate, mode, report
+
+    try:
+        baseline = benchmark_model(tokenizer, model)
+        candidate_time = benchmark_model(tokenizer, candidate)
+    except Exception as e:
+        print(f"Precision self-check for {mode} failed ({e}), using float32")
+        report.update({"selected": "float32", "error": str(e)})
+        return model, "float32", report
+
+    report["float32_seconds_per_sentence"] = round(baseline, 4)
+    report[f"{mode}_seconds_per_sentence"] = round(candidate_time, 4)
+    print(f"Precision self-check: float32 {baseline * 1000:.1f} ms/sentence, {mode} {candidate_time * 1000:.1f} ms/sentence")
+
+    if candidate_time > baseline:
+        print(f"{mode} is slower than float32 on this host, using float32")
+        report["selected"] = "float32"
+        return model, "float32", report
+
+    report["selected"] = mode
+    return candidate, mode, report
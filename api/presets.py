@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Named speed/quality generation presets and their mapping to account tiers
+"""
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+class GenerationPreset(NamedTuple):
+    """Decoding settings for one speed/quality trade-off.
+
+    ``max_new_tokens_per_word`` bounds output length relative to the
+    longest input in a batch (None keeps the global ``max_length``).
+    ``p50_ms_by_words`` maps document length in words to the p50 latency of
+    a whole /humanize request, as measured for the README table (tiny T5,
+    1 vCPU); it shows relative cost. ``python bench_api.py`` measures it on
+    your model and hardware.
+    """
+    name: str
+    num_beams: int
+    do_sample: bool
+    max_new_tokens_per_word: Optional[float]
+    p50_ms_by_words: Dict[int, int]
+    temperature: float = 0.7
+    top_p: float = 0.9
+    repetition_penalty: float = 1.1
+
+PRESETS = {
+    # Greedy decoding with a tight output budget
+    "fast": GenerationPreset("fast", num_beams=1, do_sample=False, max_new_tokens_per_word=1.5, p50_ms_by_words={50: 319, 200: 789}),
+    # A little search and sampling, bounded output
+    "balanced": GenerationPreset("balanced", num_beams=2, do_sample=True, max_new_tokens_per_word=2.0, p50_ms_by_words={50: 679, 200: 1522}),
+    # The original settings: four beams with sampling
+    "quality": GenerationPreset("quality", num_beams=4, do_sample=True, max_new_tokens_per_word=None, p50_ms_by_words={50: 3175, 200: 3909}),
+}
+
+# Cheapest first, so a tier's preset is also the most it may ask for
+PRESET_ORDER: List[str] = ["fast", "balanced", "quality"]
+
+# Account tiers (as used by the frontend) and the best preset each may use.
+# The tier is a request field the client sets, not an authenticated claim, so
+# the cap is advisory: it keeps well-behaved clients within their plan
+TIER_PRESETS = {
+    "basic": "fast",
+    "pro": "balanced",
+    "ultra": "quality",
+}
+
+# Preset for requests without a tier, and the most they may ask for. Defaults
+# to quality, what every request used before presets existed
+DEFAULT_PRESET = os.getenv("DEFAULT_GENERATION_PRESET", "quality").lower()
+if DEFAULT_PRESET not in PRESETS:
+    print(f"Unknown DEFAULT_GENERATION_PRESET '{DEFAULT_PRESET}', using quality")
+    DEFAULT_PRESET = "quality"
+
+def resolve_preset(preset: Optional[str] = None, tier: Optional[str] = None) -> str:
+    """Pick the preset for a request.
+
+    An explicit preset is used as asked, but capped at what the tier allows.
+    With only a tier, the tier's preset is used. Unknown tiers get the
+    cheapest preset; requests without a tier are treated as a tier whose
+    preset is DEFAULT_PRESET.
+    """
+    if tier is None:
+        allowed = DEFAULT_PRESET
+    else:
+        allowed = TIER_PRESETS.get(tier.lower(), PRESET_ORDER[0])
+    if preset is None:
+        return allowed
+    return min(preset, allowed, key=PRESET_ORDER.index)
+
+def preset_generation_kwargs(preset: str, batch: List[str], max_length: int = 512) -> dict:
+    """HF generate() settings for a batch of texts under a preset"""
+    settings = PRESETS[preset]
+    longest = max(len(text.split()) for text in batch)
+    kwargs = {
+        "min_length": int(min(len(text.split()) for text in batch) * 0.8),  # At least 80% of the shortest input
+        "num_beams": settings.num_beams,
+        "do_sample": settings.do_sample,
+        "repetition_penalty": settings.repetition_penalty,
+    }
+    if settings.max_new_tokens_per_word is None:
+        kwargs["max_length"] = max_length
+    else:
+        kwargs["max_new_tokens"] = min(max_length, int(longest * settings.max_new_tokens_per_word) + 8)
+    if settings.num_beams > 1:
+        kwargs["early_stopping"] = True
+        kwargs["length_penalty"] = 1.0
+    if settings.do_sample:
+        kwargs["temperature"] = settings.temperature
+        kwargs["top_p"] = settings.top_p
+    return kwargs
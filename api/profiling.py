@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+On-demand sampling profiler producing collapsed stacks for flamegraphs
+
+Output uses the "folded" format read by flamegraph.pl, speedscope and
+inferno: one ``frame;frame;frame count`` line per distinct stack.
+"""
+import collections
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.005
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is already being captured"""
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse(frame) -> list:
+    """Frame labels from the outermost call to ``frame``"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+class ProfileSession:
+    """Stacks collected during one capture.
+
+    Python stacks are wall-clock samples of every thread, rooted at
+    ``python;<thread name>``. Generate calls profiled with torch are rooted
+    at ``torch.generate`` and converted from microseconds of CPU time into
+    the same unit as samples (one per sampling interval), so both halves of
+    the graph are drawn to scale.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, torch_enabled: bool = True):
+        self.interval = interval
+        self.torch_enabled = torch_enabled
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def sample(self, skip_thread: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            stack = ["python", names.get(thread_id, str(thread_id))] + collapse(frame)
+            with self._lock:
+                self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def add_torch_stacks(self, lines):
+        """Merge ``stack microseconds`` lines exported by the torch profiler"""
+        interval_us = self.interval * 1_000_000
+        with self._lock:
+            for line in lines:
+                stack, _, value = line.strip().rpartition(" ")
+                if not stack or not value.isdigit():
+                    continue
+                samples = round(int(value) / interval_us)
+                if samples:
+                    self.stacks["torch.generate;" + stack.replace(" ", "_")] += samples
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+_session = None
+_session_lock = threading.Lock()
+_torch_profile_lock = threading.Lock()
+
+def capture(seconds: float, interval: float = DEFAULT_INTERVAL, torch_enabled: bool = True) -> ProfileSession:
+    """Sample every thread's stack for ``seconds``; blocks the calling thread.
+
+    Only one capture runs at a time; a second raises ProfilerBusy.
+    """
+    global _session
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        session = ProfileSession(interval, torch_enabled)
+        _session = session
+        me = threading.get_ident()
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            session.sample(me)
+            time.sleep(interval)
+        return session
+    finally:
+        _session = None
+        _session_lock.release()
+
+@contextlib.contextmanager
+def profile_generate():
+    """Run the torch profiler around a generate call while a capture is active.
+
+    Outside a capture, or when another generate is already being profiled
+    (torch allows one profiler per process), this does nothing.
+    """
+    session = _session
+    if session is None or not session.torch_enabled or not _torch_profile_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        try:
+            import torch
+            from torch.profiler import ProfilerActivity, profile
+        except ImportError:
+            yield
+            return
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        # export_stacks writes nothing unless the profiler keeps verbose stacks
+        config = torch._C._profiler._ExperimentalConfig(verbose=True)
+        with profile(activities=activities, with_stack=True, experimental_config=config) as prof:
+            yield
+
+        try:
+            with tempfile.NamedTemporaryFile("r", suffix=".folded") as exported:
+                prof.export_stacks(exported.name, "self_cpu_time_total")
+                session.add_torch_stacks(exported.readlines())
+        except Exception as e:
+            print(f"Torch profile export failed: {e}")
+    finally:
+        _torch_profile_lock.release()
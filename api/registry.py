@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Registry of named models loaded on demand under a memory budget
+"""
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+def parse_model_sources(spec: str) -> Dict[str, str]:
+    """Model name to repo or snapshot directory from ``name=source,name=source``"""
+    sources = {}
+    for item in spec.split(","):
+        name, separator, source = (part.strip() for part in item.partition("="))
+        if not item.strip():
+            continue
+        if not separator or not name or not source:
+            print(f"Ignoring model registry entry '{item.strip()}', expected name=source")
+            continue
+        sources[name] = source
+    return sources
+
+def tensor_bytes(values) -> Dict[int, int]:
+    """Bytes per distinct storage among tensors, nested in tuples as quantized layers keep them"""
+    sizes = {}
+    for value in values:
+        if isinstance(value, (tuple, list)):
+            sizes.update(tensor_bytes(value))
+        elif hasattr(value, "element_size") and hasattr(value, "numel"):
+            # Tied weights share a storage and are counted once
+            key = value.data_ptr() if value.numel() else id(value)
+            sizes[key] = max(sizes.get(key, 0), value.numel() * value.element_size())
+    return sizes
+
+def model_size(model) -> int:
+    """Bytes held by a torch model's weights and buffers, including quantized packed weights"""
+    if model is None or not hasattr(model, "state_dict"):
+        return 0
+    return sum(tensor_bytes(model.state_dict(keep_vars=True).values()).values())
+
+class ModelRegistry:
+    """Named models loaded on first use and evicted least recently used.
+
+    ``loader(name)`` builds a model, ``size_fn(model)`` reports its bytes and
+    ``estimate_fn(name)`` may predict them before loading (None if unknown).
+    Before every load, room is made by evicting idle models until the loaded
+    models, the estimates of loads in progress and ``reserved()`` bytes
+    (memory the registry doesn't manage) fit in ``budget_bytes``
+    (0 = unlimited). Models leased by a request are never evicted. Concurrent
+    requests for the same cold model share one load.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], budget_bytes: int = 0,
+                 size_fn: Callable[[Any], int] = model_size,
+                 estimate_fn: Callable[[str], Optional[int]] = None,
+                 reserved: Callable[[], int] = None,
+                 on_evict: Callable[[str, Any], None] = None):
+        self.loader = loader
+        self.budget_bytes = budget_bytes
+        self.size_fn = size_fn
+        self.estimate_fn = estimate_fn
+        self.reserved = reserved or (lambda: 0)
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # name -> {"model", "size", "leases", "loaded_at", "used_at"}
+        self._loading = {}  # name -> Future of the load in progress
+        self._reservations = {}  # name -> estimated bytes of the load in progress
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.shared_loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+
+    @property
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["size"] for entry in self._entries.values())
+
+    def peek(self, name: str):
+        """The loaded model, or None, without loading it or marking it used"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry["model"] if entry is not None else None
+
+    def get(self, name: str):
+        """Return a loaded model, loading it (once, however many callers) if needed"""
+        with self.lease(name) as model:
+            return model
+
+    @contextlib.contextmanager
+    def lease(self, name: str):
+        """Hold a model while it's in use so it can't be evicted underneath the request"""
+        model = self._acquire(name)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None and entry["model"] is model:
+                    entry["leases"] -= 1
+
+    def _acquire(self, name: str):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                entry["leases"] += 1
+                entry["used_at"] = time.time()
+                self.hits += 1
+                return entry["model"]
+
+            flight = self._loading.get(name)
+            leader = flight is None
+            if leader:
+                flight = self._loading[name] = Future()
+            else:
+                self.shared_loads += 1
+
+        if not leader:
+            # Another request is loading this model; wait for its result
+            flight.result()
+            return self._acquire(name)
+
+        try:
+            model = self._load(name)
+        except BaseException as e:
+            with self._lock:
+                self.load_failures += 1
+                del self._loading[name]
+            flight.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[name]
+        flight.set_result(model)
+        return model
+
+    def _load(self, name: str):
+        """Make room, load and insert ``name`` leased to the caller (the one leader of its load)"""
+        estimate = self.estimate_fn(name) if self.estimate_fn is not None else None
+        # Held until the model is inserted, so concurrent loads make room for each other
+        self._evict_to_fit(estimate or 0, keep=name, reserve=name)
+
+        try:
+            started = time.perf_counter()
+            model = self.loader(name)
+            size = self.size_fn(model)
+            print(f"Loaded model '{name}' ({size / 2 ** 20:.0f} MiB) in {time.perf_counter() - started:.2f}s")
+        except BaseException:
+            with self._lock:
+                self._reservations.pop(name, None)
+            raise
+
+        now = time.time()
+        with self._lock:
+            self._reservations.pop(name, None)
+            self.loads += 1
+            self._entries[name] = {"model": model, "size": size, "leases": 1, "loaded_at": now, "used_at": now}
+        self._evict_to_fit(0, keep=name)
+        return model
+
+    def _evict_to_fit(self, incoming: int, keep: str = None, reserve: str = None):
+        """Evict idle models, least recently used first, until ``incoming`` more bytes fit.
+
+        With ``reserve`` the incoming bytes are recorded as that model's load
+        in progress, in the same step as the room is made for them.
+        """
+        evicted = []
+        with self._lock:
+            if reserve is not None:
+                self._reservations[reserve] = incoming
+            if not self.budget_bytes:
+                return
+            used = (sum(entry["size"] for entry in self._entries.values())
+                    + sum(size for name, size in self._reservations.items() if name != reserve)
+                    + self.reserved())
+            for name in list(self._entries):
+                if used + incoming <= self.budget_bytes:
+                    break
+                entry = self._entries[name]
+                if name == keep or entry["leases"] > 0:
+                    continue
+                del self._entries[name]
+                used -= entry["size"]
+                self.evictions += 1
+                evicted.append((name, entry["model"]))
+            over = used + incoming > self.budget_bytes
+
+        for name, model in evicted:
+            print(f"Evicted model '{name}' to stay within the memory budget")
+            if self.on_evict is not None:
+                self.on_evict(name, model)
+        if over:
+            print(f"Models in use need {(used + incoming) / 2 ** 20:.0f} MiB, "
+                  f"over the {self.budget_bytes / 2 ** 20:.0f} MiB budget")
+
+    def evict(self, name: str) -> bool:
+        """Drop a model now if it's loaded and idle; returns whether it was evicted"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry["leases"] > 0:
+                return False
+            del self._entries[name]
+            self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(name, entry["model"])
+        return True
+
+    def clear(self):
+        """Evict every idle model"""
+        with self._lock:
+            names = list(self._entries)
+        for name in names:
+            self.evict(name)
+
+    def stats(self) -> dict:
+        """Loaded models in LRU order (oldest first) and the registry counters"""
+        with self._lock:
+            loaded = [
+                {
+                    "name": name,
+                    "sizeMb": round(entry["size"] / 2 ** 20, 1),
+                    "inUse": entry["leases"],
+                    "idleSeconds": round(time.time() - entry["used_at"], 1),
+                }
+                for name, entry in self._entries.items()
+            ]
+            return {
+                "budgetMb": round(self.budget_bytes / 2 ** 20, 1) if self.budget_bytes else None,
+                "usedMb": round(sum(entry["size"] for entry in self._entries.values()) / 2 ** 20, 1),
+                "reservedMb": round(self.reserved() / 2 ** 20, 1),
+                "loadingMb": round(sum(self._reservations.values()) / 2 ** 20, 1),
+                "loaded": loaded,
+                "loading": sorted(self._loading),
+                "hits": self.hits,
+                "loads": self.loads,
+                "sharedLoads": self.shared_loads,
+                "loadFailures": self.load_failures,
+                "evictions": self.evictions,
+            }
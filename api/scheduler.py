@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cross-request micro-batching scheduler for model inference
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+class InferenceScheduler:
+    """Collect sentences from concurrent requests into shared model batches.
+
+    A single worker thread drains a shared queue and flushes a batch when it
+    reaches ``max_batch_size`` items or the oldest item has waited
+    ``max_wait_ms``. Each submitted sentence gets its own future.
+    """
+
+    def __init__(self, generate_fn: Callable[[List[str]], List[str]],
+                 max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        self.generate_fn = generate_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        # Held while checking the stopped flag and queueing, so nothing is queued after stop()
+        self._submit_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """Queue texts for generation and return one future per text"""
+        futures = []
+        with self._submit_lock:
+            if self._stopped.is_set():
+                raise RuntimeError("Inference scheduler is stopped")
+            for text in texts:
+                future = Future()
+                self._queue.put((text, future))
+                futures.append(future)
+        return futures
+
+    def generate(self, texts: List[str]) -> List[str]:
+        """Queue texts and block until all of their outputs are ready"""
+        return [future.result() for future in self.submit(texts)]
+
+    def queue_depth(self) -> int:
+        """Number of sentences waiting for a batch"""
+        return self._queue.qsize()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker thread after the current batch and fail what is still queued"""
+        with self._submit_lock:
+            self._stopped.set()
+        self._worker.join(timeout)
+        if not self._worker.is_alive():
+            self._fail_queued()
+
+    def _fail_queued(self):
+        """Fail anything still queued so no caller waits forever"""
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Inference scheduler is stopped"))
+
+    def _collect_batch(self) -> list:
+        """Block for the first item, then gather more until size or wait limit"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Worker loop: build batches and resolve their futures"""
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            # Skip sentences whose requests were cancelled while queued
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                outputs = self.generate_fn([text for text, _ in batch])
+                for (_, future), output in zip(batch, outputs):
+                    future.set_result(output)
+            except Exception as e:
+                print(f"Inference scheduler batch error: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+
+        self._fail_queued()
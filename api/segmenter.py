@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Rule-based sentence segmenter returning character spans into the original text
+"""
+import re
+from typing import List, Tuple
+
+# Words that are usually followed by a period without ending the sentence
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'rev', 'gen', 'col', 'lt', 'sgt', 'capt',
+    'gov', 'sen', 'pres', 'hon', 'vs', 'etc', 'cf', 'approx', 'dept', 'univ',
+    'inc', 'ltd', 'corp', 'llc', 'nos', 'vol', 'vols', 'fig', 'figs', 'p', 'pp', 'ch',
+    'eds', 'avg', 'ave', 'blvd', 'rd',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+})
+
+# Also common words, so only abbreviations before a number ("No. 5", "Sec. 4", "est. 1990")
+NUMBER_ABBREVIATIONS = frozenset({'no', 'sec', 'min', 'max', 'est'})
+
+# Also common words, so only abbreviations capitalised as in a name ("Rep. Smith", "Acme Co. Ltd")
+NAME_ABBREVIATIONS = frozenset({'rep', 'co'})
+
+# Sentence-final punctuation, any closing quotes or brackets, then whitespace
+# before the next non-space character
+BOUNDARY_RE = re.compile(r'([.!?…]+)(["\'”’)\]]*)\s+(?=(\S))')
+
+# A blank line always ends a sentence, with or without punctuation
+PARAGRAPH_BREAK_RE = re.compile(r'\n[ \t]*\n\s*')
+
+# Characters stripped from the front of the word before a period
+LEADING_PUNCTUATION = '"\'(“‘['
+
+def _is_abbreviation(word: str, following: str = "", previous: str = "") -> bool:
+    """Whether ``word`` (without its final '.') is an abbreviation or initial.
+
+    ``following`` is the next non-space character and ``previous`` the word
+    before, for abbreviations that are also ordinary words.
+    """
+    word = word.lstrip(LEADING_PUNCTUATION)
+    if not word:
+        return False
+    # Initials ("J. Smith") and dotted forms ("e.g.", "U.S.")
+    if (len(word) == 1 and word.isalpha()) or '.' in word:
+        return True
+    lower = word.lower()
+    if lower in NUMBER_ABBREVIATIONS:
+        return following.isdigit()
+    if lower in NAME_ABBREVIATIONS:
+        return word[0].isupper()
+    if lower == 'al':
+        return previous.lower() == 'et'
+    return lower in ABBREVIATIONS
+
+def _is_boundary(text: str, start: int, match: re.Match) -> bool:
+    """Whether a punctuation match ends the sentence that began at ``start``"""
+    punctuation, _, following = match.groups()
+    # A lowercase continuation means the sentence goes on ("approx. five", "wait... what")
+    if following.islower():
+        return False
+    if punctuation == '.':
+        period = match.start()
+        word_start = max(text.rfind(' ', start, period), text.rfind('\n', start, period),
+                         text.rfind('\t', start, period), start - 1) + 1
+        # A short look back is enough for the word before ("et al.")
+        previous = text[max(start, word_start - 16):word_start].split()
+        return not _is_abbreviation(text[word_start:period], following, previous[-1] if previous else "")
+    return True
+
+def _paragraph_spans(text: str, start: int, end: int, spans: List[Tuple[int, int]]):
+    """Append the sentence spans of ``text[start:end]``"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    for match in BOUNDARY_RE.finditer(text, start, end):
+        if _is_boundary(text, start, match):
+            spans.append((start, match.end(2)))
+            start = match.end()
+    if start < end:
+        spans.append((start, end))
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of each sentence in ``text``.
+
+    ``text[start:end]`` is the sentence with its punctuation and closing
+    quotes, without surrounding whitespace. Sentences never span a blank
+    line. Whitespace-only text has no sentences.
+    """
+    spans = []
+    paragraph_start = 0
+    for paragraph_break in PARAGRAPH_BREAK_RE.finditer(text):
+        _paragraph_spans(text, paragraph_start, paragraph_break.start(), spans)
+        paragraph_start = paragraph_break.end()
+    _paragraph_spans(text, paragraph_start, len(text), spans)
+    return spans
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of ``text`` as strings, see ``sentence_spans``"""
+    return [text[start:end] for start, end in sentence_spans(text)]
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Multi-worker launcher that loads the model once and forks workers sharing its weights
+
+Usage: python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000] [--threads-per-worker N] [--require-preload]
+
+The parent binds the listening socket, loads and converts the model, then
+forks the uvicorn workers onto the socket. While the model loads the parent
+answers /healthz itself and every other path with 503 loading. Nothing writes
+to the weight tensors after loading, so the workers share the parent's pages
+copy-on-write instead of each loading a copy. A worker that dies is replaced
+from the same preloaded model. SIGTERM/SIGINT stop every worker; SIGUSR1
+prints a memory report.
+"""
+import argparse
+import contextlib
+import gc
+import http.server
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Fast tokenizers disable their thread pool after fork anyway; say so up front
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+def read_smaps_rollup(pid: int) -> dict:
+    """RSS, PSS, shared and private memory of a process in bytes (Linux only)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+def memory_report(parent: int, workers) -> dict:
+    """Per-process memory in MiB; PSS splits shared pages between the processes using them"""
+    def mib(usage: dict) -> dict:
+        return {name: round(value / 2 ** 20, 1) for name, value in usage.items()}
+
+    report = {"parent": mib(read_smaps_rollup(parent)), "workers": {}}
+    for pid in sorted(workers):
+        try:
+            report["workers"][pid] = mib(read_smaps_rollup(pid))
+        except OSError:
+            continue
+    processes = [report["parent"], *report["workers"].values()]
+    report["totalPss"] = round(sum(usage["pss"] for usage in processes), 1)
+    report["totalRss"] = round(sum(usage["rss"] for usage in processes), 1)
+    return report
+
+def preload_model(main) -> bool:
+    """Load and convert the model in this process so forked workers inherit it"""
+    import torch
+
+    # A single thread keeps the parent from starting an OpenMP pool that
+    # forked children would inherit in a broken state
+    torch.set_num_threads(1)
+    try:
+        # Workers warm up after fork, in their own thread pools
+        backend = main.load_backend(warmup=False)
+    except Exception as e:
+        print(f"Preloading model failed: {e}")
+        return False
+
+    main._backend_cache = backend
+    main._model_status = "ready"
+    return True
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+class LoadingHandler(http.server.BaseHTTPRequestHandler):
+    """Replies while the parent preloads: /healthz is up, anything else is not ready yet"""
+
+    # A client that never finishes its request can't hold up forking the workers
+    timeout = 5
+
+    def reply(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            status, body = 200, {"status": "ok", "message": "Notecraft Pro Humanizer API is running"}
+        else:
+            status, body = 503, {"status": "loading"}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "5")
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = reply
+
+    def log_message(self, format, *args):
+        pass
+
+@contextlib.contextmanager
+def answer_while_loading(sock: socket.socket):
+    """Serve LoadingHandler on the listening socket until the block exits, leaving it open"""
+    server = http.server.HTTPServer(sock.getsockname()[:2], LoadingHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.1},
+                              name="loading-responder", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        # Requests are handled on this one thread, so none is left half answered
+        server.shutdown()
+        thread.join()
+
+def run_worker(main, sock: socket.socket, threads: int, preloaded: bool, log_level: str):
+    """Body of a forked worker: reset inherited state, warm up and serve until stopped"""
+    import uvicorn
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+    if main._shared_sentence_cache is not None:
+        main._shared_sentence_cache.after_fork()
+
+    if preloaded:
+        import torch
+
+        torch.set_num_threads(threads)
+        # Generation only reads the weights, so this does not copy them
+        main.warmup_model(main._backend_cache)
+
+    config = uvicorn.Config(main.app, log_level=log_level, timeout_graceful_shutdown=30)
+    uvicorn.Server(config).run(sockets=[sock])
+
+class Supervisor:
+    """Fork workers from the preloaded parent and replace any that exit"""
+
+    def __init__(self, main, sock: socket.socket, workers: int, threads: int, preloaded: bool, log_level: str):
+        self.main = main
+        self.sock = sock
+        self.count = workers
+        self.threads = threads
+        self.preloaded = preloaded
+        self.log_level = log_level
+        self.workers = {}
+        self.stopping = False
+
+    def spawn(self):
+        # Otherwise buffered output is inherited and printed again by the child
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.main, self.sock, self.threads, self.preloaded, self.log_level)
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}")
+                status = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(status)
+        self.workers[pid] = time.monotonic()
+        print(f"Started worker {pid}")
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report(self, signum, frame):
+        print(json.dumps(memory_report(os.getpid(), self.workers)), flush=True)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, self.report)
+
+        for _ in range(self.count):
+            self.spawn()
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            # Don't spin if workers die straight away
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)
+            self.spawn()
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVE_WORKERS", "1")))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--threads-per-worker", type=int, default=int(os.getenv("SERVE_THREADS_PER_WORKER", "0")),
+                        help="torch threads per worker (default: CPUs divided by workers)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="let every worker load its own model copy (for comparison)")
+    parser.add_argument("--require-preload", action="store_true",
+                        default=os.getenv("SERVE_REQUIRE_PRELOAD", "false").lower() in ("1", "true", "yes"),
+                        help="exit if preloading fails instead of starting workers that each load a copy")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+    # Import with eager loading off so nothing starts loading before we fork
+    eager = os.getenv("EAGER_MODEL_LOAD", "true")
+    os.environ["EAGER_MODEL_LOAD"] = "false"
+    import main
+
+    # Bound first so the port answers, /healthz included, while the model loads
+    sock = bind_socket(args.host, args.port)
+    preloaded = False
+    if main.NEURAL_MODE and not args.no_preload:
+        print(f"Listening on {args.host}:{args.port}, preloading the model")
+        with answer_while_loading(sock):
+            preloaded = preload_model(main)
+        if not preloaded:
+            if args.require_preload:
+                print("Exiting: --require-preload is set and the model could not be preloaded")
+                sock.close()
+                sys.exit(1)
+            print(f"Warning: no preloaded model; each of the {workers} workers will load its own copy, "
+                  f"using about {workers} times the model's memory (--require-preload exits instead)")
+    if not preloaded:
+        # Workers load their own copies as the plain app would
+        main.EAGER_MODEL_LOAD = eager.lower() in ("1", "true", "yes")
+    print(f"Serving on {args.host}:{args.port} with {workers} workers x {threads} threads "
+          f"({'shared preloaded model' if preloaded else 'no preloaded model'})")
+
+    # Keep the garbage collector from touching (and so copying) inherited objects
+    gc.collect()
+    gc.freeze()
+
+    Supervisor(main, sock, workers, threads, preloaded, args.log_level).run()
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Content similarity scorers used to validate humanized output
+"""
+import difflib
+import re
+from collections import Counter
+from typing import List
+
+# Common words that carry no content, ignored by the key word overlap
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these',
+    'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
+})
+
+WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+SHINGLE_SIZE = 2
+
+def extract_key_words(text: str) -> List[str]:
+    """Content words: lowercase, longer than two letters, not stop words"""
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOP_WORDS and len(w) > 2]
+
+def key_word_overlap(original: str, humanized: str):
+    """Share of the original's key words kept in the output, or None if either has none"""
+    original_words = extract_key_words(original)
+    humanized_words = extract_key_words(humanized)
+    if not original_words or not humanized_words:
+        return None
+
+    original_counter = Counter(original_words)
+    common_words = sum((original_counter & Counter(humanized_words)).values())
+    return common_words / len(original_words)
+
+def sequence_similarity(original: str, humanized: str) -> float:
+    """Character-level difflib ratio (quadratic in the worst case)"""
+    return difflib.SequenceMatcher(None, original.lower(), humanized.lower()).ratio()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Counter:
+    """Multiset of word n-grams; falls back to single words for very short text"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return Counter(tokens)
+    return Counter(zip(*(tokens[i:] for i in range(size))))
+
+def shingle_similarity(original: str, humanized: str, size: int = SHINGLE_SIZE) -> float:
+    """Dice overlap of word n-gram multisets, linear in the text length.
+
+    Like difflib's ratio it is 2 * matches / total, but counts shared word
+    n-grams instead of matching character blocks.
+    """
+    original_shingles = shingles(original, size)
+    humanized_shingles = shingles(humanized, size)
+    total = sum(original_shingles.values()) + sum(humanized_shingles.values())
+    if total == 0:
+        return 0.0
+    return 2 * sum((original_shingles & humanized_shingles).values()) / total
+
+SCORERS = {
+    "difflib": sequence_similarity,
+    "shingle": shingle_similarity,
+}
+
+def content_similarity(original: str, humanized: str, scorer: str = "difflib") -> float:
+    """70% key word overlap plus 30% order-aware similarity from the chosen scorer"""
+    overlap_ratio = key_word_overlap(original, humanized)
+    if overlap_ratio is None:
+        return 0.5  # Neutral score if no content words
+
+    order_similarity = SCORERS.get(scorer, sequence_similarity)(original, humanized)
+    return min((overlap_ratio * 0.7) + (order_similarity * 0.3), 1.0)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Prebuilt model snapshots: convert MODEL_REPO once, load it with mmap and no network
+
+Usage: python snapshot.py build --output DIR [--repo REPO] [--precision auto] [--no-self-check]
+       python snapshot.py load DIR
+
+``build`` downloads the model, picks its precision (running the precision
+self-check here rather than at every startup) and writes the weights as
+safetensors together with the tokenizer, config, generation config and a
+snapshot.json manifest. The server loads a snapshot by mapping the
+safetensors file and handing its tensors to a model built on the meta
+device, so the weights are never copied and pages are read on first use.
+``load`` loads a snapshot the way the server does and prints the timings.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import Dict, Tuple
+
+import torch
+
+from precision import convert_model, select_precision
+
+MANIFEST_NAME = "snapshot.json"
+SNAPSHOT_FORMAT = 1
+
+# Weights are stored in this dtype for each precision mode. Dynamically
+# quantized int8 layers can't be written to safetensors, so int8 snapshots
+# keep float32 weights and are quantized when loaded
+STORED_DTYPES = {"float32": "float32", "bfloat16": "bfloat16", "int8": "float32"}
+
+SAFETENSORS_DTYPES = {
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+def is_snapshot(path: str) -> bool:
+    return bool(path) and os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')} in {path}")
+    return manifest
+
+def build_snapshot(repo: str, output_dir: str, precision: str = "auto", self_check: bool = True,
+                   cache_dir: str = None) -> dict:
+    """Download ``repo``, choose its precision and write a snapshot to ``output_dir``"""
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    started = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(repo, cache_dir=cache_dir)
+    model = AutoModelForSeq2SeqLM.from_pretrained(repo, torch_dtype=torch.float32, low_cpu_mem_usage=True,
+                                                  cache_dir=cache_dir)
+    model.eval()
+    downloaded = time.perf_counter()
+
+    _, selected, report = select_precision(tokenizer, model, precision, self_check=self_check)
+    stored = STORED_DTYPES[selected]
+    if stored != "float32":
+        model = model.to(getattr(torch, stored))
+
+    os.makedirs(output_dir, exist_ok=True)
+    # One file keeps loading to a single mmap
+    model.save_pretrained(output_dir, max_shard_size="1000GB")
+    tokenizer.save_pretrained(output_dir)
+
+    import transformers
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "repo": repo,
+        "precision": selected,
+        "dtype": stored,
+        "precisionReport": report,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "files": {name: os.path.getsize(os.path.join(output_dir, name)) for name in sorted(os.listdir(output_dir))},
+        "buildSeconds": {
+            "download": round(downloaded - started, 2),
+            "total": round(time.perf_counter() - started, 2),
+        },
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def mmap_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """Tensors of a safetensors file backed by a private mapping of it.
+
+    Nothing is read until a tensor is used, processes mapping the same file
+    share its page cache, and a write to a tensor copies only that page.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    (header_size,) = struct.unpack("<Q", buffer[:8])
+    header = json.loads(buffer[8:8 + header_size])
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        if end == start:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        flat = torch.frombuffer(buffer, dtype=dtype, count=(end - start) // dtype.itemsize, offset=data_start + start)
+        tensors[name] = flat.view(info["shape"])
+    return tensors
+
+def snapshot_weight_files(path: str):
+    """The safetensors files of a snapshot, following a shard index if there is one"""
+    index = os.path.join(path, "model.safetensors.index.json")
+    if os.path.exists(index):
+        with open(index) as f:
+            return sorted({os.path.join(path, name) for name in json.load(f)["weight_map"].values()})
+    return [os.path.join(path, "model.safetensors")]
+
+def load_snapshot(path: str, quantize: bool = True) -> Tuple[object, object, dict, dict]:
+    """Load a snapshot without touching the network.
+
+    Returns (tokenizer, model, manifest, timings). The model is in the
+    snapshot's precision; with ``quantize=False`` an int8 snapshot is left
+    in float32 (for backends that do their own conversion).
+    """
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM
+
+    timings = {}
+    started = time.perf_counter()
+    manifest = read_manifest(path)
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    timings["tokenizer"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    state = {}
+    for weight_file in snapshot_weight_files(path):
+        state.update(mmap_safetensors(weight_file))
+    # Build the modules without allocating weights, then adopt the mapped tensors
+    with torch.device("meta"):
+        model = AutoModelForSeq2SeqLM.from_config(config, torch_dtype=getattr(torch, manifest["dtype"]))
+    model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+    missing = [name for name, tensor in [*model.named_parameters(), *model.named_buffers()] if tensor.is_meta]
+    if missing:
+        raise ValueError(f"Snapshot {path} has no weights for {', '.join(missing[:5])}")
+    model.eval()
+    try:
+        from transformers import GenerationConfig
+
+        model.generation_config = GenerationConfig.from_pretrained(path, local_files_only=True)
+    except OSError:
+        pass
+    timings["weights"] = time.perf_counter() - mark
+
+    if quantize and manifest["precision"] == "int8":
+        mark = time.perf_counter()
+        # In place: a copy would move every mapped weight onto the heap
+        model = convert_model(model, "int8", inplace=True)
+        timings["quantize"] = time.perf_counter() - mark
+
+    timings["total"] = time.perf_counter() - started
+    return tokenizer, model, manifest, {name: round(seconds, 3) for name, seconds in timings.items()}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="convert a model repo into a snapshot")
+    build.add_argument("--output", default=os.getenv("MODEL_SNAPSHOT_DIR") or None, required=not os.getenv("MODEL_SNAPSHOT_DIR"))
+    build.add_argument("--repo", default=os.getenv("MODEL_REPO", "Vamsi/T5_Paraphrase_Paws"))
+    build.add_argument("--precision", default=os.getenv("MODEL_PRECISION", "auto"))
+    build.add_argument("--no-self-check", action="store_true", help="keep the requested precision without timing it")
+    build.add_argument("--cache-dir", default=None, help="download cache (default: a temporary directory)")
+
+    load = commands.add_parser("load", help="load a snapshot and report the timings")
+    load.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with tempfile.TemporaryDirectory() as download_dir:
+            manifest = build_snapshot(args.repo, args.output, args.precision, self_check=not args.no_self_check,
+                                      cache_dir=args.cache_dir or download_dir)
+        print(json.dumps(manifest, indent=2))
+        return
+
+    _, model, manifest, timings = load_snapshot(args.path)
+    print(f"Loaded {manifest['repo']} ({manifest['precision']}) in {timings['total']:.3f}s", file=sys.stderr)
+    print(json.dumps(timings, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
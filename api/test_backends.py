@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test the PyTorch and ONNX Runtime inference backends with a tiny offline T5
+"""
+import os
+import tempfile
+import pytest
+from backends import EXPORT_MANIFEST, create_backend, export_path, model_fingerprint
+from main import humanize_batch
+from tiny_model import build_tiny_seq2seq
+
+TEXTS = ["the quick brown fox jumps over the lazy dog .", "machine learning can process data ."]
+
+def greedy_outputs(backend):
+    """Deterministic generate so two backends can be compared"""
+    inputs = backend.encode(TEXTS, max_length=32)
+    outputs = backend.generate(inputs, max_new_tokens=8, num_beams=1, do_sample=False)
+    return backend.decode(outputs)
+
+def test_torch_backend_round_trip():
+    """encode, generate and decode produce one string per input"""
+    tokenizer, model = build_tiny_seq2seq()
+    backend = create_backend("torch", tokenizer, model)
+
+    outputs = greedy_outputs(backend)
+    assert len(outputs) == len(TEXTS)
+    assert len(humanize_batch(TEXTS, backend, max_length=32)) == len(TEXTS)
+
+def test_unknown_backend_is_rejected():
+    """A typo in INFERENCE_BACKEND is reported instead of silently ignored"""
+    tokenizer, model = build_tiny_seq2seq()
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", tokenizer, model)
+
+def test_fingerprint_tells_models_apart():
+    """Exports are keyed by the model, so another repo or fine-tune never reuses one"""
+    _, model = build_tiny_seq2seq(seed=0)
+    _, same = build_tiny_seq2seq(seed=0)
+    _, other = build_tiny_seq2seq(seed=1)
+
+    assert model_fingerprint(model) == model_fingerprint(same)
+    assert model_fingerprint(model)["weights"] != model_fingerprint(other)["weights"]
+    assert export_path("/exports", model_fingerprint(model)) != export_path("/exports", model_fingerprint(other))
+
+def test_onnx_backend_matches_torch():
+    """The exported ONNX model generates the same greedy tokens"""
+    pytest.importorskip("optimum.onnxruntime")
+    tokenizer, model = build_tiny_seq2seq()
+
+    torch_outputs = greedy_outputs(create_backend("torch", tokenizer, model))
+    with tempfile.TemporaryDirectory() as export_dir:
+        onnx_backend = create_backend("onnx", tokenizer, model, export_dir=export_dir)
+        assert greedy_outputs(onnx_backend) == torch_outputs
+
+        # A second start reuses the exported files
+        reloaded = create_backend("onnx", tokenizer, model, export_dir=export_dir)
+        assert greedy_outputs(reloaded) == torch_outputs
+        assert len(os.listdir(export_dir)) == 1
+
+        # A different model gets an export of its own
+        _, other = build_tiny_seq2seq(seed=1)
+        create_backend("onnx", tokenizer, other, export_dir=export_dir)
+        exports = os.listdir(export_dir)
+        assert len(exports) == 2
+        assert all(os.path.exists(os.path.join(export_dir, name, EXPORT_MANIFEST)) for name in exports)
+
+if __name__ == "__main__":
+    test_torch_backend_round_trip()
+    print("[PASS] Torch backend round trip")
+    test_unknown_backend_is_rejected()
+    print("[PASS] Unknown backend rejected")
+    test_fingerprint_tells_models_apart()
+    print("[PASS] Fingerprints tell models apart")
+    test_onnx_backend_matches_torch()
+    print("[PASS] ONNX backend matches torch")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the bulk /humanize/batch endpoint with a tiny offline T5 model
+"""
+from fastapi.testclient import TestClient
+import main
+from backends import TransformersBackend
+from test_batching import CountingModel
+from tiny_model import build_tiny_seq2seq
+
+def test_bad_items_fail_alone_and_sentences_share_batches():
+    """Invalid items get errors, valid ones results, and sentences are generated together"""
+    tokenizer, model = build_tiny_seq2seq()
+    counting = CountingModel(model)
+    main._backend_cache = TransformersBackend(tokenizer, counting)
+    main._model_status = "ready"
+    main._scheduler = None
+    main._document_cache.clear()
+    main._sentence_cache.clear()
+
+    items = [
+        {"text": "The quick brown fox jumps over the lazy dog. Machine learning can process data."},
+        {"tone": "friendly"},
+        {"text": "   "},
+        {"text": "The quick brown fox jumps over the lazy dog.", "style": "casual"},
+    ]
+    try:
+        response = TestClient(main.app).post("/humanize/batch", json={"items": items})
+    finally:
+        if main._scheduler is not None:
+            main._scheduler.stop()
+        main._scheduler = None
+        main._backend_cache = None
+        main._model_status = "not_loaded"
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 4
+    assert body["succeeded"] == 2
+    assert body["failed"] == 2
+
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[0]["success"] and "qualityMetrics" in results[0]
+    assert "text" in results[1]["error"]
+    assert results[2]["error"] == "Text is required"
+    assert results[3]["settings"]["style"] == "casual"
+
+    # Two unique sentences across both documents, generated in one batch
+    assert sum(counting.batch_sizes) == 2
+
+def test_empty_batch_is_rejected():
+    response = TestClient(main.app).post("/humanize/batch", json={"items": []})
+    assert response.status_code == 400
+
+if __name__ == "__main__":
+    test_bad_items_fail_alone_and_sentences_share_batches()
+    print("[PASS] Per-item errors and shared batches")
+    test_empty_batch_is_rejected()
+    print("[PASS] Empty batch rejected")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test batched sentence generation against a tiny offline T5 model
+"""
+import main
+from backends import TransformersBackend
+from main import humanize_batch, sentence_by_sentence_humanization
+from tiny_model import build_tiny_seq2seq
+
+class CountingModel:
+    """Wrap a model and count generate calls and their batch sizes"""
+
+    def __init__(self, model):
+        self.model = model
+        self.batch_sizes = []
+
+    def generate(self, input_ids, **kwargs):
+        self.batch_sizes.append(input_ids.shape[0])
+        return self.model.generate(input_ids, **kwargs)
+
+def test_batch_returns_one_output_per_input():
+    """Outputs keep the order and count of the inputs"""
+    tokenizer, model = build_tiny_seq2seq()
+    counting = CountingModel(model)
+
+    texts = [
+        "the quick brown fox jumps over the lazy dog .",
+        "machine learning can process data .",
+        "this is a very important sentence for the model .",
+    ]
+    outputs = humanize_batch(texts, TransformersBackend(tokenizer, counting), max_length=32, batch_size=2)
+
+    assert len(outputs) == len(texts)
+    assert all(isinstance(output, str) for output in outputs)
+    assert counting.batch_sizes == [2, 1]
+
+def test_sentences_share_one_generate_call():
+    """All eligible sentences of a document go through a single batch"""
+    tokenizer, model = build_tiny_seq2seq()
+    counting = CountingModel(model)
+
+    text = "The quick brown fox jumps over the lazy dog. Ok. Machine learning can process data fast."
+    budget = main.CHUNK_TOKEN_BUDGET
+    main.CHUNK_TOKEN_BUDGET = 0  # one sentence per sequence
+    try:
+        sentence_by_sentence_humanization(text, TransformersBackend(tokenizer, counting))
+    finally:
+        main.CHUNK_TOKEN_BUDGET = budget
+
+    # "Ok." is under 10 characters and is skipped
+    assert counting.batch_sizes == [2]
+
+def test_sentences_pack_into_one_sequence():
+    """With a token budget, short neighbouring sentences become one sequence"""
+    tokenizer, model = build_tiny_seq2seq()
+    counting = CountingModel(model)
+
+    text = "The quick brown fox jumps over the lazy dog. Ok. Machine learning can process data fast."
+    sentence_by_sentence_humanization(text, TransformersBackend(tokenizer, counting))
+
+    assert counting.batch_sizes == [1]
+
+def test_packed_progress_counts_sentences():
+    """Job progress reports the document's sentences even when they share a chunk"""
+    tokenizer, model = build_tiny_seq2seq()
+    counting = CountingModel(model)
+    reports = []
+
+    text = " ".join(["The quick brown fox jumps over the lazy dog.", "Ok.", "Machine learning can process data fast."] * 4)
+    assert main.CHUNK_TOKEN_BUDGET > 0
+    sentence_by_sentence_humanization(text, TransformersBackend(tokenizer, counting),
+                                      progress=lambda done, total: reports.append((done, total)))
+
+    assert len(counting.batch_sizes) == 1 and counting.batch_sizes[0] < 12
+    assert {total for _, total in reports} == {12}
+    assert reports[-1] == (12, 12)
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+
+if __name__ == "__main__":
+    test_batch_returns_one_output_per_input()
+    print("[PASS] Batch output order and size")
+    test_sentences_share_one_generate_call()
+    print("[PASS] Single batched generate per document")
+    test_sentences_pack_into_one_sequence()
+    print("[PASS] Sentences packed into one sequence")
+    test_packed_progress_counts_sentences()
+    print("[PASS] Packed progress counts sentences")
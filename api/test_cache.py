@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the LRU/TTL result caches
+"""
+import time
+from cache import LRUCache, normalize_text
+
+def test_lru_eviction_by_entries():
+    """The least recently used entry goes first"""
+    cache = LRUCache(max_entries=2, max_bytes=10**6, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_budget_and_accounting():
+    """Byte totals track inserts, replacements and evictions"""
+    cache = LRUCache(max_entries=100, max_bytes=200, ttl_seconds=60, size_fn=len)
+    cache.set("a", "x" * 80)
+    cache.set("b", "y" * 80)
+    assert cache.current_bytes == 160
+
+    cache.set("a", "z" * 40)
+    assert cache.current_bytes == 120
+
+    cache.set("c", "w" * 100)
+    assert cache.current_bytes <= 200
+    assert cache.get("b") is None
+
+    # Values larger than the whole budget are never stored
+    cache.set("huge", "h" * 500)
+    assert cache.get("huge") is None
+
+def test_ttl_expiry():
+    """Expired entries count as misses"""
+    cache = LRUCache(max_entries=10, max_bytes=10**6, ttl_seconds=0.05)
+    cache.set("a", "1")
+    assert cache.get("a") == "1"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 0
+
+def test_normalize_text():
+    """Whitespace differences share a key"""
+    assert normalize_text("  Hello   world.\n") == normalize_text("Hello world.")
+
+def test_paragraph_breaks_are_part_of_the_key():
+    """Texts that differ only in paragraph breaks don't share a cached response"""
+    import main
+
+    one_paragraph = "The results are good. We are happy."
+    two_paragraphs = "The results are good.\n\nWe are happy."
+    assert normalize_text(one_paragraph) != normalize_text(two_paragraphs)
+    assert normalize_text("The results  are good. \n\n  We are happy.\n") == two_paragraphs
+    assert (main.document_cache_key(main.Payload(text=one_paragraph))
+            != main.document_cache_key(main.Payload(text=two_paragraphs)))
+
+def test_document_cache_skips_the_model():
+    """A resubmitted document is answered without running the pipeline"""
+    from fastapi.testclient import TestClient
+    import main
+
+    calls = []
+
+    def fake_humanize_document(payload, deadline=None):
+        calls.append(payload.text)
+        return {"success": True, "originalText": payload.text, "humanizedText": "cached result"}
+
+    original = main.humanize_document
+    main.humanize_document = fake_humanize_document
+    main._document_cache.clear()
+    try:
+        client = TestClient(main.app)
+        first = client.post("/humanize", json={"text": "Cache me please."})
+        second = client.post("/humanize", json={"text": "Cache   me please. "})
+    finally:
+        main.humanize_document = original
+        main._document_cache.clear()
+
+    assert first.json()["humanizedText"] == second.json()["humanizedText"]
+    assert second.json()["cached"] is True
+    assert second.json()["originalText"] == "Cache   me please. "
+    assert len(calls) == 1
+
+if __name__ == "__main__":
+    test_lru_eviction_by_entries()
+    print("[PASS] LRU eviction")
+    test_byte_budget_and_accounting()
+    print("[PASS] Byte accounting")
+    test_ttl_expiry()
+    print("[PASS] TTL expiry")
+    test_normalize_text()
+    print("[PASS] Text normalization")
+    test_paragraph_breaks_are_part_of_the_key()
+    print("[PASS] Paragraph breaks are part of the key")
+    test_document_cache_skips_the_model()
+    print("[PASS] Document cache hit")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test the shared paraphrase cache backends
+"""
+import os
+import socketserver
+import tempfile
+import threading
+from cache import LRUCache, ParaphraseCache
+from cache_backends import (NullCacheBackend, RedisCacheBackend, RedisProtocolError, SQLiteCacheBackend,
+                            create_cache_backend)
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol (PING, SET, MGET) to test the client"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, read_only_keys=()):
+        self.data = {}
+        self.commands = []
+        # SET on these keys gets an error reply, as a server would send mid-pipeline
+        self.read_only_keys = set(read_only_keys)
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            self.server.commands.append(command[0])
+            name = command[0].upper()
+            if name == "PING":
+                self.wfile.write(b"+PONG\r\n")
+            elif name == "SET" and command[1] in self.server.read_only_keys:
+                self.wfile.write(b"-READONLY You can't write against a read only replica.\r\n")
+            elif name == "SET":
+                self.server.data[command[1]] = command[2]
+                self.wfile.write(b"+OK\r\n")
+            elif name == "MGET":
+                reply = [f"*{len(command) - 1}\r\n".encode()]
+                for key in command[1:]:
+                    value = self.server.data.get(key)
+                    if value is None:
+                        reply.append(b"$-1\r\n")
+                    else:
+                        data = value.encode()
+                        reply.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+                self.wfile.write(b"".join(reply))
+            else:
+                self.wfile.write(f"-ERR unknown command '{name}'\r\n".encode())
+
+def test_sqlite_is_shared_between_workers():
+    """Two backends on the same file see each other's writes"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "paraphrases.sqlite")
+        worker_a = SQLiteCacheBackend(path)
+        worker_b = SQLiteCacheBackend(path)
+
+        worker_a.set_many({"k1": "first", "k2": "second"})
+        assert worker_b.get_many(["k1", "k2", "k3"]) == {"k1": "first", "k2": "second"}
+
+        worker_a.close()
+        worker_b.close()
+
+def test_sqlite_expires_entries():
+    """Rows past their TTL are not returned"""
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteCacheBackend(os.path.join(directory, "cache.sqlite"), ttl_seconds=-1)
+        backend.set_many({"k": "v"})
+        assert backend.get_many(["k"]) == {}
+        backend.close()
+
+def test_redis_client_round_trip():
+    """MGET and pipelined SET work against a Redis-protocol server"""
+    server = RedisStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        backend = RedisCacheBackend(f"redis://{host}:{port}/0", ttl_seconds=0)
+
+        backend.set_many({"a": "alpha", "b": "beta"})
+        assert backend.get_many(["a", "b", "missing"]) == {"a": "alpha", "b": "beta"}
+        assert server.commands == ["SET", "SET", "MGET"]
+        backend.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_redis_error_mid_pipeline_reads_every_reply():
+    """An error reply in the middle of a pipeline doesn't leave later replies on the connection"""
+    server = RedisStandIn(read_only_keys={"bad"})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        backend = RedisCacheBackend(f"redis://{host}:{port}/0", ttl_seconds=0, key_prefix="")
+        backend._connect()
+        try:
+            backend._pipeline([("SET", "a", "alpha"), ("SET", "bad", "x"), ("SET", "c", "gamma")])
+            assert False, "expected the error reply to be raised"
+        except RedisProtocolError as e:
+            assert "READONLY" in str(e)
+        # The same connection answers the next command with its own reply
+        assert backend._pipeline([("MGET", "a", "c")]) == [["alpha", "gamma"]]
+
+        # Through the public API the connection is dropped after the error
+        try:
+            backend.set_many({"bad": "x"})
+            assert False, "expected the error reply to be raised"
+        except RedisProtocolError:
+            pass
+        assert backend._sock is None
+        assert backend.get_many(["a", "c"]) == {"a": "alpha", "c": "gamma"}
+        backend.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_redis_failed_auth_disconnects():
+    """A rejected AUTH closes the connection instead of keeping it half set up"""
+    server = RedisStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        backend = RedisCacheBackend(f"redis://:secret@{host}:{port}/0")
+        try:
+            backend.get_many(["a"])
+            assert False, "expected AUTH to be rejected"
+        except RedisProtocolError:
+            pass
+        assert backend._sock is None and server.commands == ["AUTH"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_paraphrase_cache_batches_shared_lookups():
+    """A document costs one shared read, and shared hits fill the local tier"""
+    class CountingBackend(NullCacheBackend):
+        def __init__(self):
+            self.data = {}
+            self.reads = 0
+
+        def get_many(self, keys):
+            self.reads += 1
+            return {key: self.data[key] for key in keys if key in self.data}
+
+        def set_many(self, items):
+            self.data.update(items)
+
+    shared = CountingBackend()
+    writer = ParaphraseCache(LRUCache(), shared=shared)
+    writer.set_many({"One sentence.": "A sentence.", "Two sentence.": "Second sentence."}, "model")
+
+    reader = ParaphraseCache(LRUCache(), shared=shared)
+    found = reader.get_many(["One sentence.", "Two sentence.", "New sentence."], "model")
+    assert found == {"One sentence.": "A sentence.", "Two sentence.": "Second sentence."}
+    assert shared.reads == 1
+
+    # Second lookup is served from the local tier
+    reader.get_many(["One sentence.", "Two sentence."], "model")
+    assert shared.reads == 1
+
+def test_shared_errors_are_misses():
+    """An unreachable shared backend never fails the request"""
+    cache = ParaphraseCache(LRUCache(), shared=RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1))
+    assert cache.get_many(["Anything at all."], "model") == {}
+    cache.set_many({"Anything at all.": "Something."}, "model")
+    assert cache.stats()["shared"]["errors"] == 2
+
+def test_create_cache_backend_none():
+    assert isinstance(create_cache_backend("none"), NullCacheBackend)
+
+if __name__ == "__main__":
+    test_sqlite_is_shared_between_workers()
+    print("[PASS] SQLite shared between workers")
+    test_sqlite_expires_entries()
+    print("[PASS] SQLite TTL")
+    test_redis_client_round_trip()
+    print("[PASS] Redis protocol round trip")
+    test_redis_error_mid_pipeline_reads_every_reply()
+    print("[PASS] Redis error mid-pipeline reads every reply")
+    test_redis_failed_auth_disconnects()
+    print("[PASS] Redis failed AUTH disconnects")
+    test_paraphrase_cache_batches_shared_lookups()
+    print("[PASS] Batched shared lookups")
+    test_shared_errors_are_misses()
+    print("[PASS] Shared errors are misses")
+    test_create_cache_backend_none()
+    print("[PASS] No-op backend")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test packing sentences into token-budgeted chunks
+"""
+from chunker import Chunk, pack_sentences, split_oversized
+
+def count_words(texts):
+    """Stand-in tokenizer: one token per word"""
+    return [len(text.split()) for text in texts]
+
+def test_adjacent_sentences_pack_up_to_budget():
+    sentences = ["one two three.", "four five.", "six seven eight nine.", "ten."]
+    chunks = pack_sentences(sentences, count_words, budget=6)
+
+    assert chunks == [
+        Chunk("one two three. four five.", 0, 1),
+        Chunk("six seven eight nine. ten.", 2, 3),
+    ]
+
+def test_chunks_do_not_cross_paragraph_breaks():
+    sentences = ["one two.", "three.", "four five.", "six."]
+    chunks = pack_sentences(sentences, count_words, budget=10, breaks={2})
+
+    assert chunks == [Chunk("one two. three.", 0, 1), Chunk("four five. six.", 2, 3)]
+
+def test_zero_budget_keeps_one_sentence_per_chunk():
+    sentences = ["one two.", "three four."]
+    assert [chunk.text for chunk in pack_sentences(sentences, count_words, budget=0)] == sentences
+
+def test_oversized_sentence_is_split_not_truncated():
+    """Long sentences break at clauses first and nothing is lost"""
+    sentence = "alpha beta gamma, delta epsilon zeta, eta theta iota kappa lambda mu nu."
+    chunks = pack_sentences(["short one.", sentence, "after."], count_words, budget=4)
+
+    pieces = [chunk for chunk in chunks if chunk.first == 1]
+    assert all(chunk.last == 1 for chunk in pieces)
+    assert [chunk.part for chunk in pieces] == list(range(len(pieces)))
+    assert all(chunk.parts == len(pieces) for chunk in pieces)
+    assert all(count_words([chunk.text])[0] <= 4 for chunk in pieces)
+    assert " ".join(chunk.text for chunk in pieces).split() == sentence.split()
+    assert pieces[0].text == "alpha beta gamma,"
+
+    # Neighbours stay in their own chunks, in order
+    assert chunks[0] == Chunk("short one.", 0, 0)
+    assert chunks[-1] == Chunk("after.", 2, 2)
+
+def test_single_huge_word_is_sliced():
+    """A word heavier than the budget is cut by characters"""
+    def count_chars(texts):
+        return [len(text) for text in texts]
+
+    pieces = split_oversized("abcdefghij", count_chars, budget=4)
+    assert "".join(pieces) == "abcdefghij"
+    assert all(len(piece) <= 4 for piece in pieces)
+
+if __name__ == "__main__":
+    test_adjacent_sentences_pack_up_to_budget()
+    print("[PASS] Adjacent sentences pack up to the budget")
+    test_chunks_do_not_cross_paragraph_breaks()
+    print("[PASS] Chunks stop at paragraph breaks")
+    test_zero_budget_keeps_one_sentence_per_chunk()
+    print("[PASS] Zero budget keeps one sentence per chunk")
+    test_oversized_sentence_is_split_not_truncated()
+    print("[PASS] Oversized sentences split, not truncated")
+    test_single_huge_word_is_sliced()
+    print("[PASS] Huge words sliced")
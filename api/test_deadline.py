@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test per-request deadlines with a slow tiny offline T5 model
+"""
+import time
+from fastapi.testclient import TestClient
+import main
+from backends import TransformersBackend
+from tiny_model import build_tiny_seq2seq
+
+TEXT = "The quick brown fox jumps over the lazy dog. Machine learning can process data fast."
+
+class SlowModel:
+    """Wrap a model so every generate call takes a while"""
+
+    def __init__(self, model, delay: float):
+        self.model = model
+        self.delay = delay
+
+    def generate(self, input_ids, **kwargs):
+        time.sleep(self.delay)
+        return self.model.generate(input_ids, **kwargs)
+
+def use_slow_model(delay: float):
+    tokenizer, model = build_tiny_seq2seq()
+    main._backend_cache = TransformersBackend(tokenizer, SlowModel(model, delay))
+    main._model_status = "ready"
+    main._scheduler = None
+    main._document_cache.clear()
+    main._sentence_cache.clear()
+
+def reset_model():
+    if main._scheduler is not None:
+        main._scheduler.stop()
+    main._scheduler = None
+    main._backend_cache = None
+    main._model_status = "not_loaded"
+    main._document_cache.clear()
+    main._sentence_cache.clear()
+
+def test_expired_deadline_keeps_finished_sentences():
+    """Cached sentences are kept, the one still generating falls back to rules"""
+    use_slow_model(delay=2.0)
+    budget = main.CHUNK_TOKEN_BUDGET
+    main.CHUNK_TOKEN_BUDGET = 0  # one sentence per chunk
+    try:
+        first = "The quick brown fox jumps over the lazy dog."
+        main._sentence_cache.set_many({first: "A fast brown fox leaps over a lazy dog."}, f"{main.current_model_key()}:{main.DEFAULT_PRESET}")
+
+        payload = main.Payload(text=TEXT, deadline_ms=200)
+        started = time.monotonic()
+        result = main.humanize_document(payload, deadline=main.request_deadline(payload=payload))
+        elapsed = time.monotonic() - started
+    finally:
+        main.CHUNK_TOKEN_BUDGET = budget
+        reset_model()
+
+    assert elapsed < 1.5
+    assert result["success"]
+    assert result["degradedSentences"] in ([1], [0, 1])  # [0, 1] if validation replaced the whole text
+    assert result["note"].startswith("Deadline reached: 1 of 2 sentences")
+
+def test_header_deadline_on_endpoint():
+    """X-Deadline-Ms applies to /humanize and is reported in the response"""
+    use_slow_model(delay=0.0)
+    try:
+        response = TestClient(main.app).post("/humanize", json={"text": TEXT}, headers={"X-Deadline-Ms": "60000"})
+        bad = TestClient(main.app).post("/humanize", json={"text": TEXT}, headers={"X-Deadline-Ms": "soon"})
+    finally:
+        reset_model()
+
+    assert response.status_code == 200
+    assert "note" not in response.json()
+    assert isinstance(response.json()["degradedSentences"], list)
+    assert bad.status_code == 400
+
+def test_cache_hit_reports_deadline_fields():
+    """A cached response lists no degraded sentences when the request had a deadline, and omits the field otherwise"""
+    use_slow_model(delay=0.0)
+    try:
+        client = TestClient(main.app)
+        first = client.post("/humanize", json={"text": TEXT}, headers={"X-Deadline-Ms": "60000"})
+        with_deadline = client.post("/humanize", json={"text": TEXT, "deadline_ms": 60000})
+        without_deadline = client.post("/humanize", json={"text": TEXT})
+    finally:
+        reset_model()
+
+    assert "degradedSentences" in first.json()
+    assert with_deadline.json()["cached"] is True
+    assert with_deadline.json()["degradedSentences"] == []
+    assert without_deadline.json()["cached"] is True
+    assert "degradedSentences" not in without_deadline.json()
+
+def test_batch_item_deadlines():
+    """Each batch item gets its own deadline_ms; items without one aren't cut short"""
+    use_slow_model(delay=1.0)
+    items = [
+        {"text": "The committee reviewed the quarterly budget and approved new funding."},
+        {"text": TEXT, "deadline_ms": 200},
+    ]
+    try:
+        response = TestClient(main.app).post("/humanize/batch", json={"items": items})
+    finally:
+        reset_model()
+
+    assert response.status_code == 200
+    unlimited, limited = response.json()["results"]
+    assert limited["success"] and limited["degradedSentences"]
+    assert limited["note"].startswith("Deadline reached")
+    assert unlimited["success"] and "degradedSentences" not in unlimited and "note" not in unlimited
+
+if __name__ == "__main__":
+    test_expired_deadline_keeps_finished_sentences()
+    print("[PASS] Deadline keeps finished sentences")
+    test_header_deadline_on_endpoint()
+    print("[PASS] Deadline header")
+    test_cache_hit_reports_deadline_fields()
+    print("[PASS] Cache hits report deadline fields")
+    test_batch_item_deadlines()
+    print("[PASS] Batch item deadlines")
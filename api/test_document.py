@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the span-based Document and that humanization keeps paragraph breaks
+"""
+import random
+
+import main
+from chunker import Chunk
+from document import Document, find_spans, split_terminal
+
+TEXT = "First paragraph here. It has two sentences.\n\nSecond paragraph!\nWith a line break."
+
+def test_sentences_and_separators_come_from_one_buffer():
+    document = Document(TEXT)
+    assert document.sentences == ["First paragraph here.", "It has two sentences.", "Second paragraph!", "With a line break."]
+    assert document.separators == [" ", "\n\n", "\n"]
+    assert document.paragraph_starts == {2}
+    assert document.word_count == len(TEXT.split())
+    assert document.join(document.sentences) == TEXT
+
+def test_join_keeps_breaks_between_chunks():
+    document = Document(TEXT)
+    # Two sentences in one chunk, then one sentence split into two parts
+    assert document.join(["A.", "B", "C.", "D."], [1, 2, 2, 3]) == "A.\n\nB C.\nD."
+
+def test_word_edits_keep_line_breaks():
+    document = Document("one two\n\nthree")
+    assert document.remove_word(1) == "one\n\nthree"
+    assert document.remove_word(0) == "two\n\nthree"
+    assert document.insert_word(2, "new") == "one two\n\nnew three"
+
+def test_helpers():
+    assert split_terminal('He said "Stop."') == ('He said "Stop', '."')
+    assert split_terminal("No punctuation") == ("No punctuation", "")
+    assert find_spans("A b.  C d.", ["A b.", "C d."]) == [(0, 4), (6, 10)]
+
+def test_rule_pipeline_keeps_paragraphs():
+    random.seed(0)
+    text = "\n\n".join(["The results are very good, and the team is proud of the work it did this year."] * 4)
+    humanized = main.advanced_humanization_pipeline(text, "friendly", "casual")
+    assert humanized.count("\n\n") == 3
+
+def test_assembled_model_output_keeps_paragraphs():
+    document = Document(TEXT)
+    chunks = [Chunk("First paragraph here. It has two sentences.", 0, 1),
+              Chunk("Second paragraph!", 2, 2), Chunk("With a line break.", 3, 3)]
+    paraphrases = {chunk.text: chunk.text.upper() for chunk in chunks}
+    assembled = main.assemble_humanized_text(document, chunks, paraphrases, "neutral", "academic")
+    assert assembled.split("\n\n")[0] == chunks[0].text.upper()
+    assert assembled.split("\n\n")[1] == "SECOND PARAGRAPH!\nWITH A LINE BREAK."
+
+def test_chunks_stop_at_single_line_breaks():
+    """A line break inside a paragraph ends a chunk, so the assembled output keeps it"""
+    from types import SimpleNamespace
+    from tiny_model import build_tiny_seq2seq
+
+    tokenizer, _ = build_tiny_seq2seq()
+    document = Document("The results are in.\nThey look good. We are all happy.\nThanks to everyone involved.")
+    assert document.line_starts == {1, 3}
+
+    chunks = main.chunk_sentences(document, SimpleNamespace(tokenizer=tokenizer))
+    assert [(chunk.first, chunk.last) for chunk in chunks] == [(0, 0), (1, 2), (3, 3)]
+    paraphrases = {chunk.text: chunk.text.upper() for chunk in chunks}
+    assembled = main.assemble_humanized_text(document, chunks, paraphrases, "neutral", "academic")
+    assert assembled.count("\n") == 2
+
+if __name__ == "__main__":
+    test_sentences_and_separators_come_from_one_buffer()
+    print("[PASS] Sentences and separators come from one buffer")
+    test_join_keeps_breaks_between_chunks()
+    print("[PASS] Join keeps breaks between chunks")
+    test_word_edits_keep_line_breaks()
+    print("[PASS] Word edits keep line breaks")
+    test_helpers()
+    print("[PASS] Helpers")
+    test_rule_pipeline_keeps_paragraphs()
+    print("[PASS] Rule pipeline keeps paragraphs")
+    test_assembled_model_output_keeps_paragraphs()
+    print("[PASS] Assembled model output keeps paragraphs")
+    test_chunks_stop_at_single_line_breaks()
+    print("[PASS] Chunks stop at single line breaks")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the bounded inference executor
+"""
+import asyncio
+import threading
+from executor import BoundedExecutor, InferenceQueueFull
+
+def test_rejects_when_queue_is_full():
+    """Jobs beyond workers + queue depth are refused, not queued"""
+    release = threading.Event()
+
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        rejected = False
+        try:
+            await executor.run(lambda: None)
+        except InferenceQueueFull:
+            rejected = True
+
+        pending = executor.pending()
+        release.set()
+        await asyncio.gather(*running)
+        executor.shutdown()
+        return rejected, pending, executor.pending()
+
+    rejected, pending_while_full, pending_after = asyncio.run(scenario())
+    assert rejected
+    assert pending_while_full == 2
+    assert pending_after == 0
+
+def test_event_loop_stays_responsive():
+    """The loop keeps running other coroutines while a job blocks"""
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue=0)
+        job = asyncio.ensure_future(executor.run(threading.Event().wait, 0.3))
+        ticks = 0
+        while not job.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        executor.shutdown()
+        return ticks
+
+    assert asyncio.run(scenario()) > 5
+
+if __name__ == "__main__":
+    test_rejects_when_queue_is_full()
+    print("[PASS] Full queue is rejected")
+    test_event_loop_stays_responsive()
+    print("[PASS] Event loop stays responsive")
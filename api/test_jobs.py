@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the asynchronous job store and worker pool
+"""
+import os
+import tempfile
+import time
+from jobs import JobManager, JobQueueFull, JobStore, job_status
+
+def wait_for(store, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not reach {status}: {store.get(job_id)}")
+
+def fake_pipeline(payload, progress):
+    """Pretend to humanize three sentences"""
+    for done in range(1, 4):
+        progress(done, 3)
+    return {"success": True, "humanizedText": payload["text"].upper()}
+
+def test_job_runs_and_reports_progress():
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite"))
+        manager = JobManager(store, fake_pipeline, workers=2, poll_interval=0.05)
+        manager.start()
+        try:
+            job_id = manager.submit({"text": "hello"})
+            job = wait_for(store, job_id, "completed")
+        finally:
+            manager.stop()
+
+        status = job_status(job)
+        assert status["result"]["humanizedText"] == "HELLO"
+        assert status["progress"] == {"sentencesDone": 3, "sentencesTotal": 3}
+
+def test_failed_job_records_error():
+    def broken_pipeline(payload, progress):
+        raise RuntimeError("model exploded")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite"))
+        manager = JobManager(store, broken_pipeline, poll_interval=0.05)
+        manager.start()
+        try:
+            job = wait_for(store, manager.submit({"text": "hello"}), "failed")
+        finally:
+            manager.stop()
+
+        assert job_status(job)["error"] == "model exploded"
+
+def test_interrupted_job_resumes_after_restart():
+    """A job left running by a dead worker is picked up by the next one"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jobs.sqlite")
+
+        # First process claims the job and dies without finishing
+        crashed = JobStore(path)
+        job_id = crashed.create({"text": "resume me"})
+        assert crashed.claim_next("crashed-worker")["id"] == job_id
+        crashed.close()
+
+        store = JobStore(path)
+        manager = JobManager(store, fake_pipeline, stale_seconds=0, poll_interval=0.05)
+        manager.start()
+        try:
+            job = wait_for(store, job_id, "completed")
+        finally:
+            manager.stop()
+
+        assert job["attempts"] == 2
+
+def test_queue_limit_and_retention():
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite"))
+        manager = JobManager(store, fake_pipeline, max_queued=1)
+
+        # Workers not started, so the first job stays queued
+        manager.submit({"text": "one"})
+        try:
+            manager.submit({"text": "two"})
+            assert False, "expected JobQueueFull"
+        except JobQueueFull:
+            pass
+
+        finished = [store.create({"text": str(i)}) for i in range(3)]
+        for job_id in finished:
+            store.complete(job_id, {"success": True})
+        assert store.prune(retention_seconds=3600, max_finished=1) == 2
+        assert store.prune(retention_seconds=-1, max_finished=10) == 1
+
+if __name__ == "__main__":
+    test_job_runs_and_reports_progress()
+    print("[PASS] Job runs with progress")
+    test_failed_job_records_error()
+    print("[PASS] Failed job records error")
+    test_interrupted_job_resumes_after_restart()
+    print("[PASS] Interrupted job resumes")
+    test_queue_limit_and_retention()
+    print("[PASS] Queue limit and retention")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus metrics and their text exposition
+"""
+from metrics import Counter, Gauge, Histogram, Registry
+
+def render(*metrics) -> str:
+    registry = Registry()
+    for metric in metrics:
+        registry.register(metric)
+    return registry.render()
+
+def test_counter_renders_per_label_set():
+    fallbacks = Counter("fallbacks_total", "Fallbacks by reason", ["reason"])
+    fallbacks.inc(reason="too_short")
+    fallbacks.inc(2, reason="exception")
+    text = render(fallbacks)
+    assert "# TYPE fallbacks_total counter" in text
+    assert 'fallbacks_total{reason="exception"} 2' in text
+    assert 'fallbacks_total{reason="too_short"} 1' in text
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("stage_seconds", "Stage latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage="generate")
+    text = render(latency)
+    assert 'stage_seconds_bucket{stage="generate",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="generate",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="generate",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="generate"} 5.55' in text
+    assert 'stage_seconds_count{stage="generate"} 3' in text
+
+def test_histogram_time_works_as_decorator():
+    latency = Histogram("split_seconds", "Split latency", ["stage"])
+
+    @latency.time(stage="split")
+    def split(text):
+        return text.split()
+
+    split("a b")
+    split("c d")
+    assert 'split_seconds_count{stage="split"} 2' in render(latency)
+
+def test_gauge_skips_missing_and_failing_callbacks():
+    depth = Gauge("queue_depth", "Queue depth", ["queue"])
+    depth.set_function(lambda: 3, queue="executor")
+    depth.set_function(lambda: None, queue="scheduler")
+    depth.set_function(lambda: 1 / 0, queue="jobs")
+    text = render(depth)
+    assert 'queue_depth{queue="executor"} 3' in text
+    assert "scheduler" not in text and "jobs" not in text
+
+def test_wrong_labels_are_rejected():
+    fallbacks = Counter("errors_total", "Errors", ["reason"])
+    try:
+        fallbacks.inc(kind="x")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"[PASS] {name}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test eager model loading, readiness and negative caching of load failures
+"""
+import time
+from fastapi.testclient import TestClient
+import main
+from tiny_model import build_tiny_seq2seq
+
+def reset_model_state():
+    """Forget any cached model between tests"""
+    main._backend_cache = None
+    main._model_status = "not_loaded"
+    main._model_error = None
+    main._model_load_failures = 0
+    main._model_retry_at = None
+
+def test_failed_load_is_not_retried_per_request():
+    """After a failure, get_model returns immediately without reloading"""
+    reset_model_state()
+    attempts = []
+
+    def failing_load():
+        attempts.append(1)
+        raise OSError("model repo unreachable")
+
+    original_load, original_base = main.load_model, main.MODEL_RETRY_BASE_SECONDS
+    main.load_model = failing_load
+    main.MODEL_RETRY_BASE_SECONDS = 3600
+    try:
+        assert main.get_model() == (None, None)
+        assert main.get_model() == (None, None)
+        assert main.get_model() == (None, None)
+        assert len(attempts) == 1
+        assert main._model_status == "failed"
+
+        client = TestClient(main.app)
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["failedAttempts"] == 1
+    finally:
+        main.load_model = original_load
+        main.MODEL_RETRY_BASE_SECONDS = original_base
+        reset_model_state()
+
+def test_ready_after_eager_load():
+    """The lifespan loads the model and /readyz flips to ready"""
+    reset_model_state()
+    original_load = main.load_model
+    main.load_model = build_tiny_seq2seq
+    try:
+        with TestClient(main.app) as client:
+            # Wait for the background loader to finish
+            for _ in range(200):
+                if main._model_status == "ready":
+                    break
+                time.sleep(0.05)
+
+            assert client.get("/healthz").status_code == 200
+            response = client.get("/readyz")
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+    finally:
+        main.load_model = original_load
+        reset_model_state()
+
+if __name__ == "__main__":
+    test_failed_load_is_not_retried_per_request()
+    print("[PASS] Failed loads are negatively cached")
+    test_ready_after_eager_load()
+    print("[PASS] Readiness after eager load")
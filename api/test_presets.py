@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test generation presets and their tier caps
+"""
+import os
+import re
+from fastapi.testclient import TestClient
+import main
+from presets import DEFAULT_PRESET, preset_generation_kwargs, resolve_preset
+
+BATCH = ["the quick brown fox jumps over the lazy dog .", "short one here ."]
+
+def test_tier_caps_requested_preset():
+    """Lower tiers cannot ask for more expensive decoding"""
+    assert resolve_preset("quality", "basic") == "fast"
+    assert resolve_preset("quality", "pro") == "balanced"
+    assert resolve_preset("fast", "ultra") == "fast"
+
+def test_tier_default_and_unknown_tier():
+    assert resolve_preset(None, "ultra") == "quality"
+    assert resolve_preset(None, "free") == "fast"
+
+def test_missing_tier_gets_the_default_preset():
+    """Requests without a tier, like the Dashboard's, keep the original quality default"""
+    assert resolve_preset(None, None) == DEFAULT_PRESET
+    assert resolve_preset("fast", None) == "fast"
+    if "DEFAULT_GENERATION_PRESET" not in os.environ:
+        assert DEFAULT_PRESET == "quality"
+        assert resolve_preset("quality", None) == "quality"
+
+def test_presets_endpoint_matches_readme_table():
+    """GET /presets serves the p50 figures documented in the README"""
+    body = TestClient(main.app).get("/presets").json()
+    with open(os.path.join(os.path.dirname(__file__), "README.md")) as readme:
+        rows = re.findall(r"^\| `(\w+)` \|.*?\| (\d+) ms \| (\d+) ms \|", readme.read(), re.MULTILINE)
+
+    assert rows
+    assert {name: {"50": int(short), "200": int(long)} for name, short, long in rows} == {
+        preset["name"]: preset["p50MsByWords"] for preset in body["presets"]
+    }
+
+def test_quality_keeps_original_settings():
+    """The quality preset is what every request used before presets existed"""
+    assert preset_generation_kwargs("quality", BATCH, max_length=512) == {
+        "max_length": 512,
+        "min_length": 3,
+        "num_beams": 4,
+        "early_stopping": True,
+        "do_sample": True,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "repetition_penalty": 1.1,
+        "length_penalty": 1.0
+    }
+
+def test_fast_is_greedy_with_tight_budget():
+    kwargs = preset_generation_kwargs("fast", BATCH)
+    assert kwargs["num_beams"] == 1
+    assert kwargs["do_sample"] is False
+    assert "temperature" not in kwargs and "max_length" not in kwargs
+    assert kwargs["max_new_tokens"] == int(10 * 1.5) + 8
+
+if __name__ == "__main__":
+    test_tier_caps_requested_preset()
+    print("[PASS] Tier caps the requested preset")
+    test_tier_default_and_unknown_tier()
+    print("[PASS] Tier default and unknown tier")
+    test_missing_tier_gets_the_default_preset()
+    print("[PASS] Missing tier gets the default preset")
+    test_presets_endpoint_matches_readme_table()
+    print("[PASS] /presets matches the README table")
+    test_quality_keeps_original_settings()
+    print("[PASS] Quality keeps the original settings")
+    test_fast_is_greedy_with_tight_budget()
+    print("[PASS] Fast is greedy with a tight budget")
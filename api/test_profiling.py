@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the sampling profiler's folded-stack output
+"""
+import threading
+
+from profiling import ProfileSession, ProfilerBusy, capture, profile_generate
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_capture_samples_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="worker")
+    worker.start()
+    try:
+        session = capture(0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = session.folded().splitlines()
+    assert session.samples > 0
+    assert any(line.startswith("python;worker;") and "busy_loop (test_profiling.py:" in line for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+def test_only_one_capture_at_a_time():
+    errors = []
+    first = threading.Thread(target=capture, args=(0.3,))
+    first.start()
+    try:
+        threading.Event().wait(0.05)
+        capture(0.01)
+    except ProfilerBusy:
+        errors.append("busy")
+    first.join()
+    assert errors == ["busy"]
+
+def test_torch_stacks_are_scaled_to_samples():
+    session = ProfileSession(interval=0.005)
+    session.add_torch_stacks(["generate;aten::mm 10000\n", "generate;tiny 10\n", "garbage\n"])
+    assert session.folded() == "torch.generate;generate;aten::mm 2\n"
+
+def test_generate_is_not_profiled_outside_a_capture():
+    with profile_generate():
+        pass
+
+def test_generate_inside_a_capture_adds_torch_stacks():
+    """A real generate during a capture shows up under torch.generate"""
+    import torch
+    from tiny_model import build_tiny_seq2seq
+
+    tokenizer, model = build_tiny_seq2seq()
+    inputs = tokenizer(["paraphrase: the quick brown fox jumps over the lazy dog ."], return_tensors="pt")
+    captured = []
+    profiler = threading.Thread(target=lambda: captured.append(capture(1.0, interval=0.001)))
+    profiler.start()
+    threading.Event().wait(0.1)
+    with profile_generate(), torch.no_grad():
+        model.generate(inputs.input_ids, max_new_tokens=8, num_beams=1, do_sample=False)
+    profiler.join()
+
+    assert any(line.startswith("torch.generate;") for line in captured[0].folded().splitlines())
+
+if __name__ == "__main__":
+    test_capture_samples_other_threads()
+    print("[PASS] Capture samples other threads")
+    test_only_one_capture_at_a_time()
+    print("[PASS] Only one capture at a time")
+    test_torch_stacks_are_scaled_to_samples()
+    print("[PASS] Torch stacks are scaled to samples")
+    test_generate_is_not_profiled_outside_a_capture()
+    print("[PASS] Generate is not profiled outside a capture")
+    test_generate_inside_a_capture_adds_torch_stacks()
+    print("[PASS] Generate inside a capture adds torch stacks")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Test the model registry: single-flight loads, LRU eviction under a budget and per-request model choice
+"""
+import os
+import tempfile
+import threading
+import time
+from fastapi.testclient import TestClient
+import main
+from precision import convert_model
+from registry import ModelRegistry, model_size, parse_model_sources
+from snapshot import build_snapshot
+from tiny_model import build_tiny_seq2seq
+
+MB = 2 ** 20
+
+def sized_registry(sizes: dict, budget_mb: float, **kwargs) -> ModelRegistry:
+    """Registry whose models are their names, sized from ``sizes`` (in MiB)"""
+    return ModelRegistry(lambda name: name, budget_bytes=int(budget_mb * MB),
+                         size_fn=lambda name: int(sizes[name] * MB), **kwargs)
+
+def test_concurrent_requests_share_one_load():
+    """A burst of requests for a cold model triggers a single load"""
+    calls = []
+    release = threading.Event()
+
+    def slow_loader(name):
+        calls.append(name)
+        release.wait(5)
+        return f"model-{name}"
+
+    registry = ModelRegistry(slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("a"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == ["model-a"] * 8
+    assert registry.loads == 1 and registry.shared_loads == 7
+
+def test_failed_load_reaches_every_waiter_and_is_retried():
+    attempts = []
+
+    def failing_loader(name):
+        attempts.append(name)
+        raise OSError("repo unreachable")
+
+    registry = ModelRegistry(failing_loader)
+    for _ in range(2):
+        try:
+            registry.get("a")
+            assert False, "expected the load to fail"
+        except OSError:
+            pass
+    assert len(attempts) == 2 and registry.load_failures == 2
+    assert registry.stats()["loaded"] == []
+
+def test_least_recently_used_idle_model_is_evicted():
+    evicted = []
+    registry = sized_registry({"a": 40, "b": 40, "c": 40}, budget_mb=100,
+                              on_evict=lambda name, model: evicted.append(name))
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # b is now the least recently used
+    registry.get("c")
+
+    assert evicted == ["b"]
+    assert [entry["name"] for entry in registry.stats()["loaded"]] == ["a", "c"]
+    assert registry.used_bytes == 80 * MB
+
+def test_leased_models_are_not_evicted():
+    registry = sized_registry({"a": 60, "b": 60, "c": 10}, budget_mb=100)
+    with registry.lease("a"):
+        registry.get("b")
+        # Over budget, but "a" is in use and "b" was just loaded
+        assert [entry["name"] for entry in registry.stats()["loaded"]] == ["a", "b"]
+        assert registry.evictions == 0
+
+    # Once idle, "a" is the least recently used and goes first
+    registry.get("c")
+    assert [entry["name"] for entry in registry.stats()["loaded"]] == ["b", "c"]
+
+def test_estimate_and_reserved_bytes_make_room_before_loading():
+    loaded_while = []
+
+    def loader(name):
+        loaded_while.append([entry["name"] for entry in registry.stats()["loaded"]])
+        return name
+
+    # 40 MiB reserved for the default model leaves room for two 30 MiB models
+    registry = ModelRegistry(loader, budget_bytes=100 * MB, size_fn=lambda name: 30 * MB,
+                             estimate_fn=lambda name: 30 * MB, reserved=lambda: 40 * MB)
+    registry.get("a")
+    registry.get("b")
+    registry.get("c")
+    # "a" was evicted before "c" started loading, not after
+    assert loaded_while == [[], ["a"], ["b"]]
+
+def test_loads_in_progress_count_against_the_budget():
+    """Two concurrent loads make room for each other rather than both fitting in the same space"""
+    sizes = {"a": 40, "b": 40, "c": 40, "d": 40}
+    release = threading.Event()
+
+    def loader(name):
+        if name == "c":
+            release.wait(5)
+        return name
+
+    evicted = []
+    registry = ModelRegistry(loader, budget_bytes=100 * MB, size_fn=lambda name: sizes[name] * MB,
+                             estimate_fn=lambda name: sizes[name] * MB,
+                             on_evict=lambda name, model: evicted.append(name))
+    registry.get("a")
+    registry.get("b")
+
+    loading_c = threading.Thread(target=registry.get, args=("c",))
+    loading_c.start()
+    while not registry.stats()["loadingMb"]:
+        time.sleep(0.01)
+    # "c" is still loading, so its 40 MiB are counted and "b" has to go too
+    registry.get("d")
+    release.set()
+    loading_c.join()
+
+    assert sorted(evicted) == ["a", "b"]
+    assert registry.used_bytes <= registry.budget_bytes
+    assert registry.stats()["loadingMb"] == 0
+
+def test_registered_repo_is_estimated_from_its_config():
+    """A source without a snapshot manifest is sized before loading from its config"""
+    with tempfile.TemporaryDirectory() as directory:
+        tokenizer, model = build_tiny_seq2seq()
+        model.save_pretrained(directory)
+        original_sources = dict(main.MODEL_SOURCES)
+        main.MODEL_SOURCES["plain"] = directory
+        try:
+            assert main.estimate_registered_model("plain") == model_size(model)
+        finally:
+            main.MODEL_SOURCES.clear()
+            main.MODEL_SOURCES.update(original_sources)
+
+def test_model_size_counts_tied_and_quantized_weights_once():
+    _, model = build_tiny_seq2seq()
+    parameters = {p.data_ptr(): p.numel() * p.element_size() for p in model.parameters()}
+    assert model_size(model) == sum(parameters.values())
+
+    quantized = convert_model(model, "int8")
+    assert 0 < model_size(quantized) < model_size(model)
+
+def test_parse_model_sources():
+    sources = parse_model_sources(" t5=Vamsi/T5_Paraphrase_Paws, pegasus = /models/pegasus ,broken,")
+    assert sources == {"t5": "Vamsi/T5_Paraphrase_Paws", "pegasus": "/models/pegasus"}
+
+def test_requests_pick_registered_models():
+    """Requests name a registered model, unknown names are rejected, and /models reports them"""
+    with tempfile.TemporaryDirectory() as directory:
+        repo = os.path.join(directory, "repo")
+        tokenizer, model = build_tiny_seq2seq()
+        model.save_pretrained(repo)
+        tokenizer.save_pretrained(repo)
+        build_snapshot(repo, os.path.join(directory, "small"), "float32", self_check=False)
+
+        original_sources = dict(main.MODEL_SOURCES)
+        main.MODEL_SOURCES.clear()
+        main.MODEL_SOURCES.update({"small": os.path.join(directory, "small"), "plain": repo})
+        main._document_cache.clear()
+        try:
+            client = TestClient(main.app)
+            text = "The quick brown fox jumps over the lazy dog. Machine learning can process data."
+            response = client.post("/humanize", json={"text": text, "model": "small", "preset": "fast"})
+            assert response.status_code == 200
+            body = response.json()
+            assert body["success"] and body["settings"]["model"] == "small"
+            assert "note" not in body
+
+            response = client.post("/humanize", json={"text": text, "model": "missing"})
+            assert response.status_code == 422
+
+            listing = client.get("/models").json()
+            assert [entry["name"] for entry in listing["models"]] == [main.DEFAULT_MODEL_NAME, "small", "plain"]
+            small = listing["models"][1]
+            assert small["loaded"] and small["sizeMb"] is not None
+            assert not listing["models"][2]["loaded"]
+            assert listing["registry"]["loads"] == 1
+        finally:
+            main._model_registry.clear()
+            main.MODEL_SOURCES.clear()
+            main.MODEL_SOURCES.update(original_sources)
+            main._document_cache.clear()
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_one_load()
+    print("[PASS] Concurrent requests share one load")
+    test_failed_load_reaches_every_waiter_and_is_retried()
+    print("[PASS] Failed loads propagate and are retried")
+    test_least_recently_used_idle_model_is_evicted()
+    print("[PASS] Least recently used idle model is evicted")
+    test_leased_models_are_not_evicted()
+    print("[PASS] Leased models are not evicted")
+    test_estimate_and_reserved_bytes_make_room_before_loading()
+    print("[PASS] Estimates and reserved memory make room before loading")
+    test_loads_in_progress_count_against_the_budget()
+    print("[PASS] Loads in progress count against the budget")
+    test_registered_repo_is_estimated_from_its_config()
+    print("[PASS] Repo sources are estimated from their config")
+    test_model_size_counts_tied_and_quantized_weights_once()
+    print("[PASS] Model size counts tied and quantized weights once")
+    test_parse_model_sources()
+    print("[PASS] MODEL_REGISTRY parsing")
+    test_requests_pick_registered_models()
+    print("[PASS] Requests pick registered models")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass rewrite engine
+"""
+import random
+import re
+from rewrite import RewriteEngine, RewriteRule
+
+def sequential(rules, text):
+    """Reference: one re.sub per rule, as the old pipelines did"""
+    for rule in rules:
+        pattern = re.escape(rule.text)
+        if rule.whole_word:
+            pattern = rf"\b{pattern}\b"
+        text = re.sub(pattern, rule.replacement, text, count=rule.count,
+                      flags=re.IGNORECASE if rule.ignore_case else 0)
+    return text
+
+def test_matches_sequential_substitution():
+    """One scan gives the same text as applying every rule in turn"""
+    rules = [
+        RewriteRule("it is", "it's", ignore_case=True),
+        RewriteRule("do not", "don't", ignore_case=True),
+        RewriteRule("cannot", "can't"),
+        RewriteRule("utilize", "use", whole_word=False),
+        RewriteRule("In conclusion,", "Overall,", whole_word=False),
+    ]
+    text = "In conclusion, It is clear we do not utilize what we cannot see. it is DO NOT utilized. Cannot"
+    assert RewriteEngine(rules).apply(text) == sequential(rules, text)
+
+def test_mixed_flags_and_literals_match_sequential_substitution():
+    """Grouped regex rules and plain str.replace rules keep sequential results"""
+    rules = [
+        RewriteRule("very", "quite", ignore_case=True),
+        RewriteRule("Furthermore", "Also", whole_word=False),
+        RewriteRule("good", "solid"),
+        RewriteRule("ok", "fine", ignore_case=True, whole_word=False),
+        RewriteRule("bad", "poor", ignore_case=True),
+        RewriteRule("To summarize,", "In short,", whole_word=False),
+    ]
+    text = "Furthermore, VERY good. goods are very Bad; OK, To summarize, token bad Furthermore"
+    assert RewriteEngine(rules).apply(text) == sequential(rules, text)
+
+def test_count_limits_replacements_per_call():
+    """count=1 swaps only the first occurrence, like re.sub(count=1)"""
+    engine = RewriteEngine([RewriteRule("very", "quite", ignore_case=True, count=1)])
+    assert engine.apply("Very good, very very good") == "quite good, very very good"
+
+def test_probability_is_drawn_once_per_rule():
+    """A rule is either on for the whole call or off for the whole call"""
+    engine = RewriteEngine([RewriteRule("it is", "it's", probability=0.5)])
+    rng = random.Random(1)
+    outputs = {engine.apply("it is and it is", rng=rng) for _ in range(50)}
+    assert outputs == {"it is and it is", "it's and it's"}
+
+def test_groups_select_rules():
+    """Rules outside the requested groups leave their text alone"""
+    engine = RewriteEngine([
+        RewriteRule("gonna", "going to", group="professional"),
+        RewriteRule("do not", "don't", group="casual"),
+    ])
+    assert engine.apply("I do not wanna, gonna", groups=["professional"]) == "I do not wanna, going to"
+    assert engine.apply("I do not wanna, gonna", groups=["casual"]) == "I don't wanna, gonna"
+
+def test_earlier_rule_wins_at_same_position():
+    """Overlapping phrases resolve in rule order, as sequential passes would"""
+    engine = RewriteEngine([
+        RewriteRule("it is", "it's", ignore_case=True),
+        RewriteRule("It is important to note", "Keep in mind", ignore_case=True),
+    ])
+    assert engine.apply("It is important to note this") == "it's important to note this"
+
+def test_replacement_list_picks_one_choice_per_call():
+    """Synonym lists choose once, so every swap in a call agrees"""
+    engine = RewriteEngine([RewriteRule("big", ["large", "huge"])])
+    result = engine.apply("big big", rng=random.Random(3))
+    assert result in ("large large", "huge huge")
+
+if __name__ == "__main__":
+    test_matches_sequential_substitution()
+    print("[PASS] Single scan matches sequential substitution")
+    test_mixed_flags_and_literals_match_sequential_substitution()
+    print("[PASS] Mixed flags and literal rules match sequential substitution")
+    test_count_limits_replacements_per_call()
+    print("[PASS] Count limits replacements per call")
+    test_probability_is_drawn_once_per_rule()
+    print("[PASS] Probability drawn once per rule")
+    test_groups_select_rules()
+    print("[PASS] Groups select rules")
+    test_earlier_rule_wins_at_same_position()
+    print("[PASS] Earlier rule wins at the same position")
+    test_replacement_list_picks_one_choice_per_call()
+    print("[PASS] Replacement lists pick one choice per call")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the cross-request micro-batching scheduler
+"""
+import threading
+import time
+from scheduler import InferenceScheduler
+
+def test_concurrent_submissions_share_a_batch():
+    """Sentences from several threads are flushed together"""
+    batch_sizes = []
+
+    def fake_generate(texts):
+        batch_sizes.append(len(texts))
+        return [text.upper() for text in texts]
+
+    scheduler = InferenceScheduler(fake_generate, max_batch_size=8, max_wait_ms=200)
+    results = {}
+
+    def request(name, texts):
+        results[name] = scheduler.generate(texts)
+
+    threads = [
+        threading.Thread(target=request, args=("a", ["one", "two"])),
+        threading.Thread(target=request, args=("b", ["three"])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.stop()
+
+    assert results["a"] == ["ONE", "TWO"]
+    assert results["b"] == ["THREE"]
+    assert batch_sizes == [3]
+
+def test_flushes_at_max_batch_size():
+    """A full batch is flushed without waiting"""
+    batch_sizes = []
+
+    def fake_generate(texts):
+        batch_sizes.append(len(texts))
+        return texts
+
+    scheduler = InferenceScheduler(fake_generate, max_batch_size=2, max_wait_ms=1000)
+    assert scheduler.generate(["a", "b", "c", "d"]) == ["a", "b", "c", "d"]
+    scheduler.stop()
+
+    assert batch_sizes == [2, 2]
+
+def test_batch_errors_reach_every_caller():
+    """An exception in generate fails each future of the batch"""
+    def failing_generate(texts):
+        raise ValueError("boom")
+
+    scheduler = InferenceScheduler(failing_generate, max_batch_size=4, max_wait_ms=1)
+    futures = scheduler.submit(["x", "y"])
+    scheduler_errors = [type(future.exception(timeout=5)) for future in futures]
+    scheduler.stop()
+
+    assert scheduler_errors == [ValueError, ValueError]
+
+def test_submit_racing_stop_never_hangs():
+    """Every future from a submit that races stop() resolves, with an output or an error"""
+    for _ in range(20):
+        scheduler = InferenceScheduler(lambda texts: texts, max_batch_size=4, max_wait_ms=1)
+        futures, errors = [], []
+        start = threading.Event()
+
+        def submitter():
+            start.wait()
+            for _ in range(50):
+                try:
+                    futures.extend(scheduler.submit(["x"]))
+                except RuntimeError:
+                    errors.append("stopped")
+                    return
+
+        threads = [threading.Thread(target=submitter) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        scheduler.stop()
+        for thread in threads:
+            thread.join()
+
+        for future in futures:
+            assert future.exception(timeout=5) is None or "stopped" in str(future.exception())
+
+def test_stop_fails_queued_futures():
+    """Sentences still queued when the worker exits get an error instead of waiting forever"""
+    release = threading.Event()
+
+    def blocking_generate(texts):
+        release.wait(5)
+        return texts
+
+    scheduler = InferenceScheduler(blocking_generate, max_batch_size=1, max_wait_ms=1)
+    running, queued = scheduler.submit(["running", "queued"])
+    while not running.running():
+        time.sleep(0.001)
+    stopping = threading.Thread(target=scheduler.stop)
+    stopping.start()
+    release.set()
+    stopping.join()
+
+    assert running.result(timeout=5) == "running"
+    assert isinstance(queued.exception(timeout=5), RuntimeError)
+
+if __name__ == "__main__":
+    test_concurrent_submissions_share_a_batch()
+    print("[PASS] Concurrent submissions share a batch")
+    test_flushes_at_max_batch_size()
+    print("[PASS] Flush at max batch size")
+    test_batch_errors_reach_every_caller()
+    print("[PASS] Batch errors propagate")
+    test_submit_racing_stop_never_hangs()
+    print("[PASS] Submit racing stop never hangs")
+    test_stop_fails_queued_futures()
+    print("[PASS] Stop fails queued futures")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test the native sentence segmenter
+"""
+from segmenter import sentence_spans, split_sentences
+
+def test_spans_slice_the_original_text():
+    text = "  First one.  Second one!\nThird?  "
+    spans = sentence_spans(text)
+    assert [text[start:end] for start, end in spans] == ["First one.", "Second one!", "Third?"]
+    assert spans[0][0] == 2 and spans[-1][1] == len(text.rstrip())
+
+def test_abbreviations_initials_and_numbers_do_not_split():
+    text = "Dr. Smith met J. R. Tolkien at 3.30 p.m. on Jan. 5. They talked approx. two hours."
+    assert split_sentences(text) == [
+        "Dr. Smith met J. R. Tolkien at 3.30 p.m. on Jan. 5.",
+        "They talked approx. two hours.",
+    ]
+
+def test_abbreviations_that_are_also_words():
+    """"no", "max", "rep" and the like end sentences unless a number or a name follows"""
+    assert split_sentences("I said no. Then I left.") == ["I said no.", "Then I left."]
+    assert split_sentences("It was the max. We stopped.") == ["It was the max.", "We stopped."]
+    assert split_sentences("One more rep. Then we rest.") == ["One more rep.", "Then we rest."]
+    assert split_sentences("See No. 5 and Sec. 4 for details.") == ["See No. 5 and Sec. 4 for details."]
+    assert split_sentences("Smith et al. (2020) agree. Rep. Jones did too. I gave it all. Then I rested.") == [
+        "Smith et al. (2020) agree.", "Rep. Jones did too.", "I gave it all.", "Then I rested."]
+
+def test_punctuation_and_closing_quotes_are_kept():
+    text = 'He said "Stop." Then he left... and came back (see Fig. 2.) Done'
+    assert split_sentences(text) == ['He said "Stop."', "Then he left... and came back (see Fig. 2.)", "Done"]
+
+def test_empty_text_has_no_sentences():
+    assert sentence_spans("") == []
+    assert sentence_spans(" \n ") == []
+    assert split_sentences("no final punctuation") == ["no final punctuation"]
+
+if __name__ == "__main__":
+    test_spans_slice_the_original_text()
+    print("[PASS] Spans slice the original text")
+    test_abbreviations_initials_and_numbers_do_not_split()
+    print("[PASS] Abbreviations, initials and numbers do not split")
+    test_abbreviations_that_are_also_words()
+    print("[PASS] Abbreviations that are also words split unless a number or name follows")
+    test_punctuation_and_closing_quotes_are_kept()
+    print("[PASS] Punctuation and closing quotes are kept")
+    test_empty_text_has_no_sentences()
+    print("[PASS] Empty text has no sentences")
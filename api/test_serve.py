@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the multi-worker launcher: forked workers, shared caches and shutdown
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from cache_backends import SQLiteCacheBackend
+from serve import answer_while_loading, bind_socket, memory_report
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(url: str):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.status, json.loads(response.read())
+
+def post(url: str, body: dict):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.status, json.loads(response.read())
+
+def test_sqlite_backend_after_fork():
+    """A forked child reopens the cache instead of reusing the parent's connection"""
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteCacheBackend(os.path.join(directory, "cache.sqlite"))
+        backend.set_many({"parent": "written before fork"})
+        pid = os.fork()
+        if pid == 0:
+            backend.after_fork()
+            backend.set_many({"child": "written after fork"})
+            ok = backend.get_many(["parent"]) == {"parent": "written before fork"}
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert backend.get_many(["parent", "child"]) == {"parent": "written before fork", "child": "written after fork"}
+        backend.close()
+
+def test_memory_report_of_this_process():
+    report = memory_report(os.getpid(), [])
+    assert report["parent"]["rss"] > 0
+    assert report["parent"]["pss"] <= report["parent"]["rss"]
+    assert report["totalPss"] == report["parent"]["pss"]
+
+def test_port_answers_while_loading():
+    """During the preload /healthz is up, the rest is 503, and the socket stays open for the workers"""
+    sock = bind_socket("127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    try:
+        with answer_while_loading(sock):
+            assert get(f"{base_url}/healthz") == (200, {"status": "ok", "message": "Notecraft Pro Humanizer API is running"})
+            try:
+                get(f"{base_url}/readyz")
+                assert False, "expected 503 while loading"
+            except urllib.error.HTTPError as e:
+                assert e.code == 503 and json.loads(e.read()) == {"status": "loading"}
+        with socket.create_connection(sock.getsockname(), timeout=5):
+            pass
+    finally:
+        sock.close()
+
+def test_require_preload_exits_when_preload_fails():
+    directory = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "MODEL_REPO": os.path.join(directory, "no-such-model"),
+        "MODEL_SNAPSHOT_DIR": "",
+        "HF_HUB_OFFLINE": "1",
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(directory, "jobs.sqlite"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(free_port()), "--require-preload"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 1
+    assert "Preloading model failed" in completed.stdout
+    assert "Started worker" not in completed.stdout
+
+def test_workers_serve_from_preloaded_model():
+    """Two workers share one preloaded model, answer requests and stop on SIGTERM"""
+    from tiny_model import build_tiny_seq2seq
+
+    directory = tempfile.mkdtemp()
+    tokenizer, model = build_tiny_seq2seq()
+    model.save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "MODEL_REPO": directory,
+        "MODEL_PRECISION": "float32",
+        "HF_HUB_OFFLINE": "1",
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(directory, "jobs.sqlite"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "2", "--host", "127.0.0.1", "--port", str(port),
+         "--threads-per-worker", "1", "--log-level", "warning"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, text=True)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                status, body = get(f"{base_url}/readyz")
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "serve.py did not start"
+                time.sleep(0.25)
+        assert status == 200 and body["status"] == "ready"
+
+        status, body = post(f"{base_url}/humanize", {"text": "The results are good. We are happy.", "preset": "fast"})
+        assert status == 200 and body["success"]
+
+        server.send_signal(signal.SIGTERM)
+        output, _ = server.communicate(timeout=60)
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+
+    assert server.returncode == 0
+    assert "shared preloaded model" in output
+    assert output.count("Started worker") == 2
+
+if __name__ == "__main__":
+    test_sqlite_backend_after_fork()
+    print("[PASS] SQLite cache reopens after fork")
+    test_memory_report_of_this_process()
+    print("[PASS] Memory report reads smaps_rollup")
+    test_port_answers_while_loading()
+    print("[PASS] Port answers while the model loads")
+    test_require_preload_exits_when_preload_fails()
+    print("[PASS] --require-preload exits when preloading fails")
+    test_workers_serve_from_preloaded_model()
+    print("[PASS] Workers serve from a preloaded model and stop on SIGTERM")
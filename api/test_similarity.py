@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the content similarity scorers
+"""
+import os
+import main
+from similarity import content_similarity, extract_key_words, shingle_similarity
+
+ORIGINAL = "The committee reviewed the quarterly budget and approved additional funding for research."
+# A typical model paraphrase: difflib scores it 0.67, shingle 0.59
+PARAPHRASE = "The committee looked over the quarterly budget and approved extra money for research."
+
+def test_identical_text_scores_one():
+    assert shingle_similarity(ORIGINAL, ORIGINAL) == 1.0
+    assert content_similarity(ORIGINAL, ORIGINAL, "shingle") == 1.0
+
+def test_no_content_words_is_neutral():
+    """Texts made only of stop words keep the old neutral 0.5"""
+    assert content_similarity("it is the", "they were", "shingle") == 0.5
+
+def test_shingle_ranking_follows_difflib():
+    """Both scorers rank a light edit above a heavy one above unrelated text"""
+    light = "The committee examined the quarterly budget and approved additional funding for research."
+    heavy = "Additional research funding was approved after the budget review."
+    unrelated = "Local farmers are planting drought resistant crops this season."
+
+    for scorer in ("difflib", "shingle"):
+        scores = [content_similarity(ORIGINAL, candidate, scorer) for candidate in (light, heavy, unrelated)]
+        assert scores == sorted(scores, reverse=True), scorer
+
+def test_key_words_skip_stop_words():
+    assert extract_key_words("It is the budget for THE research") == ["budget", "research"]
+
+def test_default_scorer_keeps_paraphrase_verdict():
+    """The validation thresholds are calibrated on difflib, so the default scorer passes what difflib passes"""
+    default = main.validate_humanization_quality(ORIGINAL, PARAPHRASE)
+    if "SIMILARITY_SCORER" not in os.environ:
+        assert main.SIMILARITY_SCORER == "difflib"
+        assert default["content_similarity"] >= 0.6
+
+    original_scorer = main.SIMILARITY_SCORER
+    main.SIMILARITY_SCORER = "difflib"
+    try:
+        difflib = main.validate_humanization_quality(ORIGINAL, PARAPHRASE)
+    finally:
+        main.SIMILARITY_SCORER = original_scorer
+    assert default["passes_validation"] == difflib["passes_validation"]
+    assert (content_similarity(ORIGINAL, PARAPHRASE) >= 0.6) == (difflib["content_similarity"] >= 0.6)
+
+if __name__ == "__main__":
+    test_identical_text_scores_one()
+    print("[PASS] Identical text scores one")
+    test_no_content_words_is_neutral()
+    print("[PASS] No content words is neutral")
+    test_shingle_ranking_follows_difflib()
+    print("[PASS] Shingle ranking follows difflib")
+    test_key_words_skip_stop_words()
+    print("[PASS] Key words skip stop words")
+    test_default_scorer_keeps_paraphrase_verdict()
+    print("[PASS] Default scorer keeps the paraphrase verdict")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test building model snapshots and loading them with mmap and no network
+"""
+import os
+import tempfile
+import torch
+from fastapi.testclient import TestClient
+import main
+from snapshot import build_snapshot, is_snapshot, load_snapshot
+from tiny_model import build_tiny_seq2seq
+
+def save_tiny_repo(directory: str) -> str:
+    """A local model directory standing in for a Hugging Face repo"""
+    tokenizer, model = build_tiny_seq2seq()
+    model.save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+    return directory
+
+def mapped_file(address: int) -> str:
+    """Path of the mapping holding ``address`` in this process ("[heap]", a file, or "")"""
+    with open("/proc/self/maps") as maps:
+        for line in maps:
+            fields = line.split()
+            start, end = (int(part, 16) for part in fields[0].split("-"))
+            if start <= address < end:
+                return fields[5] if len(fields) > 5 else ""
+    return ""
+
+def generate(tokenizer, model, text: str):
+    inputs = tokenizer([f"paraphrase: {text}"], return_tensors="pt")
+    with torch.no_grad():
+        return model.generate(inputs.input_ids, max_new_tokens=8, num_beams=1, do_sample=False).tolist()
+
+def test_snapshot_round_trip():
+    """A float32 snapshot loads mapped weights that generate like the original"""
+    with tempfile.TemporaryDirectory() as directory:
+        repo = save_tiny_repo(os.path.join(directory, "repo"))
+        output = os.path.join(directory, "snapshot")
+        manifest = build_snapshot(repo, output, "float32", self_check=False)
+        assert is_snapshot(output)
+        assert manifest["precision"] == "float32" and "model.safetensors" in manifest["files"]
+
+        tokenizer, model, loaded, timings = load_snapshot(output)
+        assert loaded["repo"] == repo and timings["total"] > 0
+        # Mapped from the file rather than copied into an allocation of its own
+        assert not model.shared.weight.untyped_storage().resizable()
+        assert model.lm_head.weight.data_ptr() == model.shared.weight.data_ptr()
+
+        original_tokenizer, original_model = build_tiny_seq2seq()
+        text = "The quick brown fox jumps over the lazy dog."
+        assert generate(tokenizer, model, text) == generate(original_tokenizer, original_model, text)
+
+def test_int8_snapshot_is_quantized_on_load():
+    with tempfile.TemporaryDirectory() as directory:
+        repo = save_tiny_repo(os.path.join(directory, "repo"))
+        output = os.path.join(directory, "snapshot")
+        manifest = build_snapshot(repo, output, "int8", self_check=False)
+        assert manifest["precision"] == "int8" and manifest["dtype"] == "float32"
+
+        _, model, _, timings = load_snapshot(output)
+        assert "quantize" in timings
+        assert type(model.encoder.block[0].layer[0].SelfAttention.q).__module__.startswith("torch.ao.nn.quantized")
+
+        # Quantized in place, so weights that stay float are still mapped from the file
+        for weight in (model.shared.weight, model.encoder.final_layer_norm.weight):
+            assert mapped_file(weight.data_ptr()).endswith("model.safetensors")
+
+        _, float_model, _, _ = load_snapshot(output, quantize=False)
+        assert isinstance(float_model.encoder.block[0].layer[0].SelfAttention.q, torch.nn.Linear)
+
+def test_bfloat16_snapshot_falls_back_without_cpu_support():
+    """A snapshot built on a bfloat16 host still serves on a CPU without it"""
+    import precision
+
+    tokenizer, model = build_tiny_seq2seq()
+    original = precision.bf16_supported
+    precision.bf16_supported = lambda: False
+    try:
+        backend, selected = main.wrap_model(tokenizer, model.to(torch.bfloat16), {"precision": "bfloat16"})
+    finally:
+        precision.bf16_supported = original
+    assert selected == "float32"
+    assert backend.model.shared.weight.dtype == torch.float32
+
+def test_server_loads_snapshot_without_repo():
+    """With MODEL_SNAPSHOT_DIR set the server never looks at MODEL_REPO"""
+    with tempfile.TemporaryDirectory() as directory:
+        repo = save_tiny_repo(os.path.join(directory, "repo"))
+        output = os.path.join(directory, "snapshot")
+        build_snapshot(repo, output, "float32", self_check=False)
+
+        original_dir, original_repo = main.MODEL_SNAPSHOT_DIR, os.environ.get("MODEL_REPO")
+        main.MODEL_SNAPSHOT_DIR = output
+        os.environ["MODEL_REPO"] = os.path.join(directory, "no-such-model")
+        main._backend_cache = None
+        main._model_status = "not_loaded"
+        try:
+            assert main.initialize_model()
+            assert main._model_precision == "float32"
+
+            response = TestClient(main.app).get("/readyz")
+            assert response.status_code == 200
+            body = response.json()
+            assert body["model"] == repo
+            assert body["startup"]["source"] == "snapshot"
+            assert body["startup"]["totalSeconds"] >= body["startup"]["loadSeconds"]
+        finally:
+            main.MODEL_SNAPSHOT_DIR = original_dir
+            if original_repo is None:
+                os.environ.pop("MODEL_REPO", None)
+            else:
+                os.environ["MODEL_REPO"] = original_repo
+            main._backend_cache = None
+            main._model_status = "not_loaded"
+            main._model_snapshot = None
+            main._model_startup = None
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    print("[PASS] Snapshot round trip with mapped weights")
+    test_int8_snapshot_is_quantized_on_load()
+    print("[PASS] int8 snapshots quantize on load")
+    test_bfloat16_snapshot_falls_back_without_cpu_support()
+    print("[PASS] bfloat16 snapshots fall back without CPU support")
+    test_server_loads_snapshot_without_repo()
+    print("[PASS] Server loads the snapshot without MODEL_REPO")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test that the app starts and serves the rule path without heavy imports
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, sys
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = client.get("/readyz")
+    response = client.post("/humanize", json={"text": "It is important to note that the results are good."})
+print(json.dumps({
+    "ready": [ready.status_code, ready.json()],
+    "humanize": [response.status_code, response.json()],
+    "modules": [name for name in ("torch", "transformers", "nltk") if name in sys.modules],
+}))
+"""
+
+def run_probe(**env) -> dict:
+    env = {
+        **os.environ,
+        "SENTENCE_CACHE_BACKEND": "none",
+        "JOB_STORE_PATH": os.path.join(tempfile.mkdtemp(), "jobs.sqlite"),
+        **env,
+    }
+    completed = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def test_rules_mode_never_imports_the_model_stack():
+    result = run_probe(HUMANIZE_MODE="rules")
+    assert result["modules"] == []
+    assert result["ready"] == [200, {"status": "ready", "mode": "rules"}]
+    status, body = result["humanize"]
+    assert status == 200 and body["success"]
+    assert "HUMANIZE_MODE=rules" in body["note"]
+
+def test_neural_mode_imports_torch_only_when_loading():
+    result = run_probe(HUMANIZE_MODE="neural", EAGER_MODEL_LOAD="false", MODEL_REPO="/nonexistent/model",
+                       HF_HUB_OFFLINE="1")
+    # The first request tried (and failed) to load the model, then fell back
+    assert "torch" in result["modules"]
+    status, body = result["humanize"]
+    assert status == 200 and "T5 not available" in body["note"]
+
+if __name__ == "__main__":
+    test_rules_mode_never_imports_the_model_stack()
+    print("[PASS] Rules mode starts without torch, transformers or nltk")
+    test_neural_mode_imports_torch_only_when_loading()
+    print("[PASS] Neural mode imports torch on first load")
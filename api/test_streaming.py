@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the streaming /humanize/stream endpoint with a tiny offline T5 model
+"""
+import json
+from fastapi.testclient import TestClient
+import main
+from backends import TransformersBackend
+from tiny_model import build_tiny_seq2seq
+
+TEXT = "The quick brown fox jumps over the lazy dog. Ok. Machine learning can process data fast."
+
+def use_tiny_model():
+    """Install a tiny backend as the loaded model"""
+    tokenizer, model = build_tiny_seq2seq()
+    main._backend_cache = TransformersBackend(tokenizer, model)
+    main._model_status = "ready"
+    main._scheduler = None
+    main._sentence_cache.clear()
+
+def reset_model():
+    if main._scheduler is not None:
+        main._scheduler.stop()
+    main._scheduler = None
+    main._backend_cache = None
+    main._model_status = "not_loaded"
+
+def stream_events(client, **params):
+    with client.stream("POST", "/humanize/stream", json={"text": TEXT}, params=params) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+def test_sentences_stream_in_order_then_done():
+    """One event per sentence, in order, then the aggregate response"""
+    use_tiny_model()
+    try:
+        events = stream_events(TestClient(main.app))
+    finally:
+        reset_model()
+
+    assert events[0] == {"type": "start", "sentenceCount": 3}
+    sentence_events = [event for event in events if event["type"] == "sentence"]
+    assert [event["index"] for event in sentence_events] == [0, 1, 2]
+    assert sentence_events[1] == {"type": "sentence", "index": 1, "text": "Ok.", "source": "original"}
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert "qualityMetrics" in done
+    assert done["originalText"] == TEXT
+
+def test_token_events_precede_their_sentence():
+    """With tokens=true, token pieces arrive before the sentence they build"""
+    use_tiny_model()
+    try:
+        events = stream_events(TestClient(main.app), tokens="true")
+    finally:
+        reset_model()
+
+    kinds = [(event["type"], event.get("index")) for event in events]
+    first_sentence = kinds.index(("sentence", 0))
+    tokens_for_first = [i for i, kind in enumerate(kinds) if kind == ("token", 0)]
+    assert all(i < first_sentence for i in tokens_for_first)
+    assert events[-1]["type"] == "done"
+
+def test_stream_without_model_uses_rules():
+    """While the model is unavailable the stream still finishes with a result"""
+    main._model_status = "failed"
+    try:
+        events = stream_events(TestClient(main.app))
+    finally:
+        main._model_status = "not_loaded"
+
+    assert events[-1]["type"] == "done"
+    assert events[-1]["note"].startswith("Using rule-based fallback")
+
+if __name__ == "__main__":
+    test_sentences_stream_in_order_then_done()
+    print("[PASS] Sentences stream in order")
+    test_token_events_precede_their_sentence()
+    print("[PASS] Token events")
+    test_stream_without_model_uses_rules()
+    print("[PASS] Rule-based stream fallback")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test per-request trace spans
+"""
+import asyncio
+
+from executor import BoundedExecutor
+from tracing import current_trace, span, start_trace
+
+def test_spans_outside_a_trace_are_ignored():
+    with span("split"):
+        pass
+    assert current_trace() is None
+
+def test_repeated_spans_are_totalled_in_server_timing():
+    with start_trace("/humanize") as trace:
+        with span("validation"):
+            pass
+        with span("validation"):
+            pass
+    header = trace.server_timing()
+    assert 'validation;dur=' in header and 'desc="x2"' in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+    assert [s["name"] for s in trace.record()["spans"]] == ["validation", "validation"]
+
+def test_executor_threads_join_the_callers_trace():
+    """Stages run in the inference pool are recorded on the request's trace"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+
+    def work():
+        with span("generate"):
+            return current_trace().name
+
+    async def handle():
+        with start_trace("/humanize") as trace:
+            name = await executor.run(work)
+        return name, trace
+
+    try:
+        name, trace = asyncio.run(handle())
+    finally:
+        executor.shutdown()
+    assert name == "/humanize"
+    assert list(trace.totals()) == ["generate"]
+
+if __name__ == "__main__":
+    test_spans_outside_a_trace_are_ignored()
+    print("[PASS] Spans outside a trace are ignored")
+    test_repeated_spans_are_totalled_in_server_timing()
+    print("[PASS] Repeated spans are totalled")
+    test_executor_threads_join_the_callers_trace()
+    print("[PASS] Executor threads join the caller's trace")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tiny randomly initialized T5 model and tokenizer for offline tests
+"""
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers, processors, decoders
+from transformers import PreTrainedTokenizerFast, T5Config, T5ForConditionalGeneration
+
+SPECIAL_TOKENS = ["<pad>", "</s>", "<unk>"]
+
+# Small fixed vocabulary so outputs are deterministic for a given seed
+WORDS = [
+    "paraphrase", ":", ".", ",", "!", "?", "'",
+    "the", "a", "an", "and", "or", "but", "is", "are", "was", "it", "this", "that",
+    "we", "you", "they", "i", "do", "not", "will", "can", "to", "of", "in", "on",
+    "for", "with", "by", "as", "very", "good", "bad", "big", "small", "important",
+    "many", "text", "model", "sentence", "word", "data", "user", "fast", "slow",
+    "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "machine", "learning",
+    "artificial", "intelligence", "process", "patterns", "make", "predictions",
+]
+
+def build_tiny_tokenizer() -> PreTrainedTokenizerFast:
+    """Build a whitespace word-level tokenizer that needs no downloads"""
+    vocab = {token: i for i, token in enumerate(SPECIAL_TOKENS + WORDS)}
+
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="$A </s>",
+        special_tokens=[("</s>", vocab["</s>"])]
+    )
+    tokenizer.decoder = decoders.WordPiece()
+
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        model_max_length=512
+    )
+
+def build_tiny_seq2seq(seed: int = 0, d_model: int = 32, d_ff: int = 64, num_layers: int = 2):
+    """Return a (tokenizer, model) pair backed by a tiny random T5.
+
+    The default size loads instantly; larger ``d_model``/``d_ff``/``num_layers``
+    give weights big enough to show up in memory measurements.
+    """
+    tokenizer = build_tiny_tokenizer()
+
+    config = T5Config(
+        vocab_size=len(tokenizer),
+        d_model=d_model,
+        d_kv=d_model // 4,
+        d_ff=d_ff,
+        num_layers=num_layers,
+        num_decoder_layers=num_layers,
+        num_heads=4,
+        pad_token_id=tokenizer.pad_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.pad_token_id
+    )
+
+    torch.manual_seed(seed)
+    model = T5ForConditionalGeneration(config)
+    model.eval()
+
+    return tokenizer, model
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-request trace spans, carried through worker threads by contextvars
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Dict, List, Tuple
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+class Trace:
+    """Timed spans recorded while handling one request.
+
+    Spans are (name, start offset ms, duration ms) tuples. A stage that runs
+    several times (e.g. validation before and after a fallback) keeps one
+    span per run.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float):
+        """Record a span from a perf_counter() start and a duration in seconds"""
+        with self._lock:
+            self.spans.append((name, (start - self.started) * 1000, duration * 1000))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        """Total milliseconds and number of runs per span name, in first-seen order"""
+        totals = {}
+        with self._lock:
+            for name, _, duration in self.spans:
+                total, count = totals.get(name, (0.0, 0))
+                totals[name] = (total + duration, count + 1)
+        return totals
+
+    def server_timing(self) -> str:
+        """Value for a Server-Timing response header (shown in browser dev tools)"""
+        entries = []
+        for name, (total, count) in self.totals().items():
+            entry = f"{name};dur={total:.1f}"
+            if count > 1:
+                entry += f';desc="x{count}"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+    def record(self) -> dict:
+        """JSON-friendly log record of the whole trace"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace": self.name,
+            "totalMs": round(self.elapsed_ms(), 1),
+            "spans": [
+                {"name": name, "startMs": round(start, 1), "durationMs": round(duration, 1)}
+                for name, start, duration in spans
+            ]
+        }
+
+@contextlib.contextmanager
+def start_trace(name: str):
+    """Make a new Trace current for this context (and threads it is copied to)"""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+def current_trace():
+    return _current_trace.get()
+
+@contextlib.contextmanager
+def span(name: str):
+    """Time a block into the current trace; does nothing outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter() - start)